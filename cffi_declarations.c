@@ -566,6 +566,9 @@ typedef void (*uv_after_work_cb)(uv_work_t*, int);
 
 int uv_queue_work(uv_loop_t*, uv_work_t*, uv_work_cb, uv_after_work_cb);
 
+int cross_stat_batch(uv_loop_t*, uv_work_t*, char**, int64_t*, int*, unsigned int,
+                     uv_after_work_cb);
+
 
 /* DNS */
 typedef struct {
@@ -770,12 +773,31 @@ int cross_uv_tty_init(uv_loop_t*, uv_tty_t*, int, int);
 int cross_uv_pipe_open(uv_pipe_t*, int);
 int cross_uv_tcp_open(uv_tcp_t*, int);
 int cross_uv_udp_open(uv_udp_t*, int);
+int cross_uv_loop_fork_supported(void);
+int cross_uv_loop_fork(uv_loop_t*);
 void cross_set_process_uid_gid(uv_process_options_t*, int, int);
 
 struct sockaddr* interface_address_get_address(uv_interface_address_t*);
 struct sockaddr* interface_address_get_netmask(uv_interface_address_t*);
 
 int cross_uv_fs_close(uv_loop_t*, uv_fs_t*, int, uv_fs_cb);
+int cross_uv_fs_read(uv_loop_t*, uv_fs_t*, int, const uv_buf_t[], unsigned int, int64_t,
+                     uv_fs_cb);
+int cross_uv_fs_write(uv_loop_t*, uv_fs_t*, int, const uv_buf_t[], unsigned int, int64_t,
+                      uv_fs_cb);
+int cross_uv_fs_fstat(uv_loop_t*, uv_fs_t*, int, uv_fs_cb);
+int cross_uv_fs_fsync(uv_loop_t*, uv_fs_t*, int, uv_fs_cb);
+int cross_uv_fs_fdatasync(uv_loop_t*, uv_fs_t*, int, uv_fs_cb);
+int cross_uv_fs_ftruncate(uv_loop_t*, uv_fs_t*, int, int64_t, uv_fs_cb);
+int cross_uv_fs_sendfile(uv_loop_t*, uv_fs_t*, int, int, int64_t, size_t, uv_fs_cb);
+int cross_uv_fs_fchmod(uv_loop_t*, uv_fs_t*, int, int, uv_fs_cb);
+int cross_uv_fs_futime(uv_loop_t*, uv_fs_t*, int, double, double, uv_fs_cb);
+int cross_uv_fs_chown(uv_loop_t*, uv_fs_t*, const char*, int, int, uv_fs_cb);
+int cross_uv_fs_fchown(uv_loop_t*, uv_fs_t*, int, int, int, uv_fs_cb);
+char* cross_uv_fs_scandir_blob(uv_fs_t*, size_t*);
+void cross_free(void*);
+void* cross_aligned_alloc(size_t, size_t);
+void cross_aligned_free(void*);
 
 void py_uv_buf_set(uv_buf_t*, char*, unsigned long);
 char* py_uv_buf_get(uv_buf_t*, unsigned long*);
\ No newline at end of file
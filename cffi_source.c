@@ -13,6 +13,15 @@
  * with this program. If not, see <http://www.gnu.org/licenses/>.
  */
 
+#include <errno.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/stat.h>
+
+#ifdef _WIN32
+#include <malloc.h>
+#endif
+
 #include <uv.h>
 
 /* Python */
@@ -60,6 +69,19 @@ int cross_uv_udp_open(uv_udp_t* udp, int fd) {
 }
 
 
+int cross_uv_loop_fork_supported(void) {
+    return UV_VERSION_HEX >= 0x010C00;
+}
+
+int cross_uv_loop_fork(uv_loop_t* loop) {
+#if UV_VERSION_HEX >= 0x010C00
+    return uv_loop_fork(loop);
+#else
+    return UV_ENOSYS;
+#endif
+}
+
+
 void cross_set_process_uid_gid(uv_process_options_t* options, int uid, int gid) {
     options->uid = (uv_uid_t) uid;
     options->gid = (uv_gid_t) gid;
@@ -68,6 +90,200 @@ void cross_set_process_uid_gid(uv_process_options_t* options, int uid, int gid)
 int cross_uv_fs_close(uv_loop_t* loop, uv_fs_t* request, int fd, uv_fs_cb callback) {
     return uv_fs_close(loop, request, (uv_file) fd, callback);
 }
+int cross_uv_fs_read(uv_loop_t* loop, uv_fs_t* request, int fd, const uv_buf_t bufs[],
+                     unsigned int nbufs, int64_t offset, uv_fs_cb callback) {
+    return uv_fs_read(loop, request, (uv_file) fd, bufs, nbufs, offset, callback);
+}
+int cross_uv_fs_write(uv_loop_t* loop, uv_fs_t* request, int fd, const uv_buf_t bufs[],
+                      unsigned int nbufs, int64_t offset, uv_fs_cb callback) {
+    return uv_fs_write(loop, request, (uv_file) fd, bufs, nbufs, offset, callback);
+}
+int cross_uv_fs_fstat(uv_loop_t* loop, uv_fs_t* request, int fd, uv_fs_cb callback) {
+    return uv_fs_fstat(loop, request, (uv_file) fd, callback);
+}
+int cross_uv_fs_fsync(uv_loop_t* loop, uv_fs_t* request, int fd, uv_fs_cb callback) {
+    return uv_fs_fsync(loop, request, (uv_file) fd, callback);
+}
+int cross_uv_fs_fdatasync(uv_loop_t* loop, uv_fs_t* request, int fd, uv_fs_cb callback) {
+    return uv_fs_fdatasync(loop, request, (uv_file) fd, callback);
+}
+int cross_uv_fs_ftruncate(uv_loop_t* loop, uv_fs_t* request, int fd, int64_t offset,
+                          uv_fs_cb callback) {
+    return uv_fs_ftruncate(loop, request, (uv_file) fd, offset, callback);
+}
+int cross_uv_fs_sendfile(uv_loop_t* loop, uv_fs_t* request, int out_fd, int in_fd,
+                         int64_t offset, size_t length, uv_fs_cb callback) {
+    return uv_fs_sendfile(loop, request, (uv_file) out_fd, (uv_file) in_fd, offset,
+                          length, callback);
+}
+int cross_uv_fs_fchmod(uv_loop_t* loop, uv_fs_t* request, int fd, int mode,
+                       uv_fs_cb callback) {
+    return uv_fs_fchmod(loop, request, (uv_file) fd, mode, callback);
+}
+int cross_uv_fs_futime(uv_loop_t* loop, uv_fs_t* request, int fd, double atime,
+                       double mtime, uv_fs_cb callback) {
+    return uv_fs_futime(loop, request, (uv_file) fd, atime, mtime, callback);
+}
+int cross_uv_fs_chown(uv_loop_t* loop, uv_fs_t* request, const char* path, int uid,
+                      int gid, uv_fs_cb callback) {
+    return uv_fs_chown(loop, request, path, (uv_uid_t) uid, (uv_gid_t) gid, callback);
+}
+int cross_uv_fs_fchown(uv_loop_t* loop, uv_fs_t* request, int fd, int uid, int gid,
+                       uv_fs_cb callback) {
+    return uv_fs_fchown(loop, request, (uv_file) fd, (uv_uid_t) uid, (uv_gid_t) gid,
+                        callback);
+}
+
+/* Packs all remaining entries of a scandir request into one blob of
+ * NUL-terminated records, each starting with the entry type as an ASCII
+ * digit. The blob has to be released with cross_free. */
+char* cross_uv_fs_scandir_blob(uv_fs_t* request, size_t* length) {
+    uv_dirent_t dirent;
+    size_t size = 0, capacity = 4096, name_length;
+    char *blob = malloc(capacity), *grown;
+    *length = 0;
+    if (blob == NULL) return NULL;
+    while (uv_fs_scandir_next(request, &dirent) == 0) {
+        name_length = strlen(dirent.name);
+        if (size + name_length + 2 > capacity) {
+            while (size + name_length + 2 > capacity) capacity *= 2;
+            grown = realloc(blob, capacity);
+            if (grown == NULL) {
+                free(blob);
+                return NULL;
+            }
+            blob = grown;
+        }
+        blob[size++] = (char) ('0' + dirent.type);
+        memcpy(blob + size, dirent.name, name_length);
+        size += name_length;
+        blob[size++] = 0;
+    }
+    *length = size;
+    return blob;
+}
+
+void cross_free(void* pointer) {
+    free(pointer);
+}
+
+/* Aligned allocations for unbuffered file I/O, released with
+ * cross_aligned_free. */
+void* cross_aligned_alloc(size_t alignment, size_t size) {
+#ifdef _WIN32
+    return _aligned_malloc(size, alignment);
+#else
+    void* pointer;
+    if (posix_memalign(&pointer, alignment, size) != 0) return NULL;
+    return pointer;
+#endif
+}
+
+void cross_aligned_free(void* pointer) {
+#ifdef _WIN32
+    _aligned_free(pointer);
+#else
+    free(pointer);
+#endif
+}
+
+/* Stats a batch of paths with a single work request on the threadpool.
+ * For every path the status and a record of five integers is stored:
+ * inode, size, modification and change time in nanoseconds and mode.
+ * On Windows the inode is zero and the times have a resolution of one
+ * second.
+ * The work request passed in is queued itself, while it is pending its
+ * data field points to the batch and is restored before the callback. */
+typedef struct {
+    void* data;
+    uv_after_work_cb callback;
+    char** paths;
+    int64_t* records;
+    int* statuses;
+    unsigned int count;
+} cross_stat_batch_t;
+
+#ifdef _WIN32
+static int cross_stat_record(const char* path, int64_t* record) {
+    WCHAR wide[32768];
+    struct _stat64 info;
+    if (!MultiByteToWideChar(CP_UTF8, 0, path, -1, wide, 32768)) return UV_EINVAL;
+    if (_wstat64(wide, &info) != 0) {
+        switch (errno) {
+            case ENOENT: return UV_ENOENT;
+            case EACCES: return UV_EACCES;
+            case EINVAL: return UV_EINVAL;
+            default: return UV_EIO;
+        }
+    }
+    record[0] = 0;
+    record[1] = (int64_t) info.st_size;
+    record[2] = (int64_t) info.st_mtime * 1000000000;
+    record[3] = (int64_t) info.st_ctime * 1000000000;
+    record[4] = (int64_t) info.st_mode;
+    return 0;
+}
+#else
+#ifdef __APPLE__
+#define CROSS_ST_MTIM st_mtimespec
+#define CROSS_ST_CTIM st_ctimespec
+#else
+#define CROSS_ST_MTIM st_mtim
+#define CROSS_ST_CTIM st_ctim
+#endif
+
+static int cross_stat_record(const char* path, int64_t* record) {
+    struct stat info;
+    if (stat(path, &info) != 0) return -errno;
+    record[0] = (int64_t) info.st_ino;
+    record[1] = (int64_t) info.st_size;
+    record[2] = (int64_t) info.CROSS_ST_MTIM.tv_sec * 1000000000
+                + info.CROSS_ST_MTIM.tv_nsec;
+    record[3] = (int64_t) info.CROSS_ST_CTIM.tv_sec * 1000000000
+                + info.CROSS_ST_CTIM.tv_nsec;
+    record[4] = (int64_t) info.st_mode;
+    return 0;
+}
+#endif
+
+/* Runs on the threadpool, so it must not touch the loop. */
+static void cross_stat_batch_work(uv_work_t* work) {
+    cross_stat_batch_t* batch = (cross_stat_batch_t*) work->data;
+    unsigned int index;
+    for (index = 0; index < batch->count; index++) {
+        batch->statuses[index] = cross_stat_record(batch->paths[index],
+                                                   batch->records + 5 * index);
+    }
+}
+
+static void cross_stat_batch_done(uv_work_t* work, int status) {
+    cross_stat_batch_t* batch = (cross_stat_batch_t*) work->data;
+    uv_after_work_cb callback = batch->callback;
+    work->data = batch->data;
+    free(batch);
+    callback(work, status);
+}
+
+int cross_stat_batch(uv_loop_t* loop, uv_work_t* request, char** paths,
+                     int64_t* records, int* statuses, unsigned int count,
+                     uv_after_work_cb callback) {
+    int code;
+    cross_stat_batch_t* batch = malloc(sizeof(cross_stat_batch_t));
+    if (batch == NULL) return UV_ENOMEM;
+    batch->data = request->data;
+    batch->callback = callback;
+    batch->paths = paths;
+    batch->records = records;
+    batch->statuses = statuses;
+    batch->count = count;
+    request->data = batch;
+    code = uv_queue_work(loop, request, cross_stat_batch_work, cross_stat_batch_done);
+    if (code < 0) {
+        request->data = batch->data;
+        free(batch);
+    }
+    return code;
+}
 
 void py_uv_buf_set(uv_buf_t* buffer, char* base, unsigned long length) {
     buffer->base = base;
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Echo throughput of :class:`uv.aio.EventLoop` compared to the selector
+based event loop of the standard library. Both ends of every connection
+run on the event loop under test, a number of clients ping-pong fixed
+size messages with an echo server over loopback TCP.
+
+Usage: python benchmark_aio.py [clients] [seconds] [message size]
+"""
+
+from __future__ import print_function
+
+import asyncio
+import sys
+import time
+
+import uv.aio
+
+
+class EchoServer(asyncio.Protocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.transport.write(data)
+
+
+class EchoClient(asyncio.Protocol):
+    def __init__(self, message, counter):
+        self.message = message
+        self.counter = counter
+        self.pending = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.send()
+
+    def send(self):
+        self.pending = len(self.message)
+        self.transport.write(self.message)
+
+    def data_received(self, data):
+        self.pending -= len(data)
+        if self.pending <= 0:
+            self.counter[0] += 1
+            self.send()
+
+
+def benchmark(name, loop, clients, seconds, size):
+    message = b'x' * size
+    counter = [0]
+    server = loop.run_until_complete(loop.create_server(EchoServer, '127.0.0.1', 0))
+    port = server.sockets[0].getsockname()[1]
+    transports = []
+    for _ in range(clients):
+        transport, _ = loop.run_until_complete(
+            loop.create_connection(lambda: EchoClient(message, counter),
+                                   '127.0.0.1', port))
+        transports.append(transport)
+    start = time.time()
+    loop.run_until_complete(asyncio.sleep(seconds, loop=loop))
+    duration = time.time() - start
+    for transport in transports:
+        transport.close()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+    print('{:<10} {:>10.0f} round trips/s {:>8.1f} MiB/s'.format(
+        name, counter[0] / duration, counter[0] * size * 2 / duration / 2**20))
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 1024
+    benchmark('asyncio', asyncio.SelectorEventLoop(), clients, seconds, size)
+    benchmark('uv.aio', uv.aio.EventLoop(), clients, seconds, size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Overhead of :mod:`uv.coro` compared to raw callbacks and asyncio streams.
+A client performs sequential request/response round trips against an
+echo server running on the same loop. Requires Python 3.5 or newer.
+
+Usage: python benchmark_coro.py [round trips]
+"""
+
+from __future__ import print_function
+
+import asyncio
+import sys
+import time
+
+import uv
+import uv.coro
+
+ADDRESS = ('127.0.0.1', 4447)
+MESSAGE = b'x' * 64
+
+
+def echo_server(loop):
+    def on_read(stream, status, data):
+        if status != uv.StatusCodes.SUCCESS:
+            stream.close()
+        elif data:
+            stream.write(data)
+
+    def on_connection(server, _):
+        server.accept(loop=loop).read_start(on_read=on_read)
+
+    server = uv.TCP(loop=loop)
+    server.bind(ADDRESS)
+    server.listen(20, on_connection=on_connection)
+    return server
+
+
+def report(name, count, duration):
+    print('{:<10} {:>10.0f} round trips/s'.format(name, count / duration))
+
+
+def benchmark_callbacks(count):
+    loop = uv.Loop()
+    server = echo_server(loop)
+    state = {'left': count}
+
+    def on_read(stream, status, data):
+        state['left'] -= 1
+        if state['left']:
+            stream.write(MESSAGE)
+        else:
+            stream.close()
+            server.close()
+
+    def on_connect(request, status):
+        request.stream.read_start(on_read=on_read)
+        request.stream.write(MESSAGE)
+
+    client = uv.TCP(loop=loop)
+    client.connect(ADDRESS, on_connect=on_connect)
+    start = time.perf_counter()
+    loop.run()
+    report('callbacks', count, time.perf_counter() - start)
+    loop.close()
+
+
+async def coro_client(loop, server, count):
+    client = uv.TCP(loop=loop)
+    await uv.coro.connect(client, ADDRESS)
+    for _ in range(count):
+        await uv.coro.write(client, MESSAGE)
+        await uv.coro.read(client)
+    client.close()
+    server.close()
+
+
+def benchmark_coro(count):
+    loop = uv.Loop()
+    server = echo_server(loop)
+    start = time.perf_counter()
+    uv.coro.run(coro_client(loop, server, count), loop)
+    report('uv.coro', count, time.perf_counter() - start)
+    loop.run()
+    loop.close()
+
+
+async def asyncio_echo(reader, writer):
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            break
+        writer.write(data)
+    writer.close()
+
+
+async def asyncio_client(count):
+    reader, writer = await asyncio.open_connection(*ADDRESS)
+    for _ in range(count):
+        writer.write(MESSAGE)
+        await reader.read(65536)
+    writer.close()
+
+
+def benchmark_asyncio(count):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(asyncio.start_server(asyncio_echo, *ADDRESS))
+    start = time.perf_counter()
+    loop.run_until_complete(asyncio_client(count))
+    report('asyncio', count, time.perf_counter() - start)
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    benchmark_callbacks(count)
+    benchmark_coro(count)
+    benchmark_asyncio(count)
+
+
+if __name__ == '__main__':
+    main()
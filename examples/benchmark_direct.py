@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Sequential write and read throughput of :class:`uv.fs.File` through the
+page cache compared to direct I/O with :data:`os.O_DIRECT`. The file is
+created in the given directory, which has to be on a local file system
+supporting direct I/O. Before the buffered read the file's pages are
+dropped from the page cache, if the platform allows it, so both modes
+read from the device.
+
+Usage: python benchmark_direct.py [directory] [size in MiB] [chunk size in KiB]
+"""
+
+from __future__ import print_function, division
+
+import os
+import sys
+import tempfile
+
+import uv
+
+
+def write_file(path, size, chunk_size, direct):
+    loop = uv.Loop.get_current()
+    chunk = uv.fs.AlignedAllocator(chunk_size).acquire()
+    memoryview(chunk)[:] = os.urandom(len(chunk))
+    file = uv.fs.File.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, direct=direct)
+    state = {'offset': 0}
+
+    def on_write(file, status, written):
+        if status != uv.StatusCodes.SUCCESS:
+            raise uv.error.UVError(status)
+        state['offset'] += written
+        if state['offset'] < size:
+            file.write(chunk, state['offset'], callback=on_write)
+        else:
+            file.sync(callback=lambda *arguments: file.close())
+
+    start = uv.misc.hrtime()
+    file.write(chunk, 0, callback=on_write)
+    loop.run()
+    return uv.misc.hrtime() - start
+
+
+def read_file(path, chunk_size, direct):
+    loop = uv.Loop.get_current()
+    if not direct and hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        os.close(fd)
+    pool = uv.fs.AlignedAllocator(chunk_size) if direct else uv.fs.BufferPool(chunk_size)
+    file = uv.fs.File.open(path, pool=pool, direct=direct)
+    state = {'read': 0}
+
+    def on_read(file, status, data):
+        state['read'] += len(data)
+        if status == uv.StatusCodes.EOF:
+            file.close()
+        elif status != uv.StatusCodes.SUCCESS:
+            raise uv.error.UVError(status)
+
+    start = uv.misc.hrtime()
+    file.read_start(on_read, offset=0, chunk_size=chunk_size)
+    loop.run()
+    return uv.misc.hrtime() - start, state['read']
+
+
+def report(mode, operation, size, elapsed):
+    print('{:<9} {:<6} {:9.1f} MiB/s'.format(mode, operation,
+                                             size / 2**20 / (elapsed / 1e9)))
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else '.'
+    size = int(sys.argv[2]) * 2**20 if len(sys.argv) > 2 else 2**30
+    chunk_size = int(sys.argv[3]) * 2**10 if len(sys.argv) > 3 else 2**20
+    fd, path = tempfile.mkstemp(dir=directory)
+    os.close(fd)
+    try:
+        for mode, direct in (('buffered', False), ('direct', True)):
+            report(mode, 'write', size, write_file(path, size, chunk_size, direct))
+            elapsed, length = read_file(path, chunk_size, direct)
+            report(mode, 'read', length, elapsed)
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
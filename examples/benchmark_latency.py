@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Round-trip latency over loopback TCP and UDP with the default run mode
+compared to :func:`uv.Loop.run_low_latency`. The echo server runs in a
+child process using the same run mode as the client.
+
+Usage: python benchmark_latency.py [round trips] [spin window in µs]
+"""
+
+from __future__ import print_function
+
+import subprocess
+import sys
+import time
+
+import uv
+
+TCP_ADDRESS = ('127.0.0.1', 4445)
+UDP_ADDRESS = ('127.0.0.1', 4446)
+
+MESSAGE = b'x' * 64
+
+
+def run(loop, mode, spin_us):
+    if mode == 'default':
+        loop.run()
+    else:
+        loop.run_low_latency(spin_us=spin_us)
+
+
+def serve(mode, spin_us):
+    loop = uv.Loop.get_current()
+
+    def on_read(stream, status, data):
+        if status != uv.StatusCodes.SUCCESS:
+            stream.close()
+        elif data:
+            stream.write(data)
+
+    def on_connection(server, _):
+        connection = server.accept()
+        connection.set_nodelay(True)
+        connection.read_start(on_read=on_read)
+
+    def on_receive(udp, status, address, data, flags):
+        if data == b'quit':
+            loop.close_all_handles()
+        elif data:
+            udp.send(data, address)
+
+    server = uv.TCP()
+    server.bind(TCP_ADDRESS)
+    server.listen(20, on_connection=on_connection)
+
+    udp = uv.UDP()
+    udp.bind(UDP_ADDRESS)
+    udp.receive_start(on_receive=on_receive)
+
+    sys.stdout.write('ready\n')
+    sys.stdout.flush()
+
+    run(loop, mode, spin_us)
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def report(transport, mode, samples):
+    samples.sort()
+    print('{:<4} {:<12} p50 {:8.1f}µs   p99 {:8.1f}µs'.format(
+        transport, mode, percentile(samples, 0.5) / 1000,
+        percentile(samples, 0.99) / 1000))
+
+
+def measure_tcp(loop, mode, spin_us, count):
+    samples = []
+    state = {'sent': 0}
+
+    def send(stream):
+        state['sent'] = uv.misc.hrtime()
+        stream.write(MESSAGE)
+
+    def on_read(stream, status, data):
+        samples.append(uv.misc.hrtime() - state['sent'])
+        if len(samples) == count:
+            stream.close()
+        else:
+            send(stream)
+
+    def on_connect(request, status):
+        request.stream.set_nodelay(True)
+        request.stream.read_start(on_read=on_read)
+        send(request.stream)
+
+    client = uv.TCP()
+    client.connect(TCP_ADDRESS, on_connect=on_connect)
+    run(loop, mode, spin_us)
+    report('tcp', mode, samples)
+
+
+def measure_udp(loop, mode, spin_us, count):
+    samples = []
+    state = {'sent': 0}
+
+    def send(udp):
+        state['sent'] = uv.misc.hrtime()
+        udp.send(MESSAGE, UDP_ADDRESS)
+
+    def on_receive(udp, status, address, data, flags):
+        samples.append(uv.misc.hrtime() - state['sent'])
+        if len(samples) == count:
+            udp.close()
+        else:
+            send(udp)
+
+    client = uv.UDP()
+    client.bind(('127.0.0.1', 0))
+    client.receive_start(on_receive=on_receive)
+    send(client)
+    run(loop, mode, spin_us)
+    report('udp', mode, samples)
+
+
+def benchmark(mode, spin_us, count):
+    arguments = [sys.executable, __file__, 'serve', mode, str(spin_us)]
+    server = subprocess.Popen(arguments, stdout=subprocess.PIPE)
+    server.stdout.readline()
+    try:
+        loop = uv.Loop.get_current()
+        measure_tcp(loop, mode, spin_us, count)
+        measure_udp(loop, mode, spin_us, count)
+        quit_udp = uv.UDP()
+        quit_udp.send(b'quit', UDP_ADDRESS, on_send=lambda request, _: quit_udp.close())
+        loop.run()
+    finally:
+        time.sleep(0.1)
+        server.terminate()
+        server.wait()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2], int(sys.argv[3]))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    spin_us = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    benchmark('default', spin_us, count)
+    benchmark('low-latency', spin_us, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -151,6 +151,7 @@ class TestCase(unittest.TestCase):
     assert_less_equal = unittest.TestCase.assertLessEqual
 
     assert_in = unittest.TestCase.assertIn
+    assert_not_in = unittest.TestCase.assertNotIn
 
     assert_is = unittest.TestCase.assertIs
     assert_is_not = unittest.TestCase.assertIsNot
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import socket
+import sys
+import unittest
+
+import common
+
+import uv
+
+try:
+    import asyncio
+    import uv.aio as aio
+except ImportError:
+    aio = None
+
+
+if aio is not None:
+    class EchoProtocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            self.transport = transport
+
+        def data_received(self, data):
+            self.transport.write(data)
+
+        def eof_received(self):
+            self.transport.close()
+
+
+    class ClientProtocol(asyncio.Protocol):
+        def __init__(self, done):
+            self.done = done
+            self.data = b''
+
+        def data_received(self, data):
+            self.data += data
+
+        def connection_lost(self, exc):
+            self.done.set_result(self.data)
+
+
+@unittest.skipIf(aio is None, 'asyncio is not available')
+class TestAIO(common.TestCase):
+    def set_up(self):
+        self.aio = aio.EventLoop(self.loop)
+
+    def tear_down(self):
+        self.aio.close()
+
+    def test_call_soon_and_later(self):
+        calls = []
+        self.aio.call_later(0.02, calls.append, 'later')
+        self.aio.call_later(0.01, calls.append, 'sooner')
+        self.aio.call_later(0.01, calls.append, 'cancelled').cancel()
+        self.aio.call_soon(calls.append, 'soon')
+        self.aio.call_later(0.03, self.aio.stop)
+        self.aio.run_forever()
+        self.assert_equal(calls, ['soon', 'sooner', 'later'])
+
+    def test_call_soon_threadsafe(self):
+        import threading
+        result = []
+
+        def worker():
+            self.aio.call_soon_threadsafe(result.append, threading.current_thread())
+            self.aio.call_soon_threadsafe(self.aio.stop)
+
+        thread = threading.Thread(target=worker)
+        self.aio.call_soon(thread.start)
+        self.aio.run_forever()
+        thread.join()
+        self.assert_equal(result, [thread])
+
+    def test_run_until_complete(self):
+        future = self.aio.create_future()
+        self.aio.call_later(0.01, future.set_result, 42)
+        self.assert_equal(self.aio.run_until_complete(future), 42)
+        self.assert_equal(self.aio.run_until_complete(asyncio.sleep(0.01, 'slept',
+                                                                    loop=self.aio)),
+                          'slept')
+        self.assert_false(self.aio.is_running())
+
+    def test_exception_handler(self):
+        contexts = []
+        self.aio.set_exception_handler(lambda loop, context: contexts.append(context))
+
+        def fail():
+            raise ValueError('test')
+
+        self.aio.call_soon(fail)
+        self.aio.call_soon(self.aio.stop)
+        self.aio.run_forever()
+        self.assert_equal(len(contexts), 1)
+        self.assert_is_instance(contexts[0]['exception'], ValueError)
+
+    def test_tcp_echo(self):
+        server = self.aio.run_until_complete(
+            self.aio.create_server(EchoProtocol, common.TEST_IPV4, 0))
+        port = server.sockets[0].getsockname()[1]
+        done = self.aio.create_future()
+        transport, _ = self.aio.run_until_complete(
+            self.aio.create_connection(lambda: ClientProtocol(done),
+                                       common.TEST_IPV4, port))
+        self.assert_equal(transport.get_extra_info('peername')[1], port)
+        transport.write(b'hello ')
+        transport.writelines([b'world', b'!' * 100000])
+        transport.write_eof()
+        self.assert_equal(self.aio.run_until_complete(done),
+                          b'hello world' + b'!' * 100000)
+        server.close()
+        self.aio.run_until_complete(server.wait_closed())
+
+    def test_connection_refused(self):
+        sock = socket.socket()
+        sock.bind((common.TEST_IPV4, 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        connect = self.aio.create_connection(asyncio.Protocol, common.TEST_IPV4, port)
+        with self.should_raise(ConnectionRefusedError):
+            self.aio.run_until_complete(connect)
+
+    def test_datagram(self):
+        received = self.aio.create_future()
+
+        class Receiver(asyncio.DatagramProtocol):
+            def datagram_received(self, data, address):
+                received.set_result((data, address))
+
+        receiver, _ = self.aio.run_until_complete(
+            self.aio.create_datagram_endpoint(Receiver, local_addr=(common.TEST_IPV4, 0)))
+        address = receiver.get_extra_info('sockname')
+        sender, _ = self.aio.run_until_complete(
+            self.aio.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                              remote_addr=address))
+        sender.sendto(b'ping')
+        data, peer = self.aio.run_until_complete(received)
+        self.assert_equal(data, b'ping')
+        self.assert_equal(peer[1], sender.get_extra_info('sockname')[1])
+        sender.close()
+        receiver.close()
+
+    def test_reader(self):
+        reader, writer = socket.socketpair()
+        received = self.aio.create_future()
+
+        def on_readable():
+            self.aio.remove_reader(reader)
+            received.set_result(reader.recv(10))
+
+        self.aio.add_reader(reader, on_readable)
+        self.aio.call_soon(writer.send, b'data')
+        self.assert_equal(self.aio.run_until_complete(received), b'data')
+        self.assert_false(self.aio.remove_reader(reader))
+        reader.close()
+        writer.close()
+
+    def test_sock_operations(self):
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        writer.setblocking(False)
+        receive = self.aio.sock_recv(reader, 100)
+        self.aio.run_until_complete(self.aio.sock_sendall(writer, b'payload'))
+        self.assert_equal(self.aio.run_until_complete(receive), b'payload')
+        reader.close()
+        writer.close()
+
+    def test_getaddrinfo(self):
+        infos = self.aio.run_until_complete(self.aio.getaddrinfo('localhost', 80,
+                                                                 type=socket.SOCK_STREAM))
+        self.assert_true(infos)
+        self.assert_equal(infos[0][4][1], 80)
+
+    @common.skip_platform('win32')
+    def test_subprocess(self):
+        create = asyncio.create_subprocess_exec(
+            sys.executable, '-c', 'import sys; sys.stdout.write(sys.stdin.read())',
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            loop=self.aio)
+        process = self.aio.run_until_complete(create)
+        stdout, _ = self.aio.run_until_complete(process.communicate(b'echo'))
+        self.assert_equal(stdout, b'echo')
+        self.assert_equal(self.aio.run_until_complete(process.wait()), 0)
+
+    @common.skip_platform('win32')
+    def test_signal_handler(self):
+        import os
+        import signal
+        received = []
+        self.aio.add_signal_handler(signal.SIGUSR1, received.append, 'signal')
+        self.aio.call_soon(os.kill, os.getpid(), signal.SIGUSR1)
+        self.aio.call_later(0.5, self.aio.stop)
+        self.aio.call_later(0.01, lambda: received and self.aio.stop())
+        self.aio.run_forever()
+        self.assert_equal(received, ['signal'])
+        self.assert_true(self.aio.remove_signal_handler(signal.SIGUSR1))
+        self.assert_false(self.aio.remove_signal_handler(signal.SIGUSR1))
+
+    def test_close_shared_loop(self):
+        self.aio.close()
+        excepthook = self.loop.excepthook
+        event_loop = aio.EventLoop(self.loop)
+        timer = uv.Timer(loop=self.loop)
+        timer.start(10000, on_timeout=lambda timer: None)
+        event_loop.run_until_complete(asyncio.sleep(0.01, loop=event_loop))
+        event_loop.close()
+        self.assert_false(timer.closing)
+        self.assert_equal(self.loop.handles, {timer})
+        self.assert_is(self.loop.excepthook, excepthook)
+        timer.close()
+
+    def test_create_server_reuse_address(self):
+        for reuse_address in (False, True):
+            server = self.aio.run_until_complete(
+                self.aio.create_server(asyncio.Protocol, common.TEST_IPV4, 0,
+                                       reuse_address=reuse_address))
+            option = server.sockets[0].getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+            self.assert_equal(bool(option), reuse_address)
+            server.close()
+            self.aio.run_until_complete(server.wait_closed())
+
+    def test_policy(self):
+        policy = aio.EventLoopPolicy()
+        event_loop = policy.new_event_loop()
+        self.assert_is_instance(event_loop, aio.EventLoop)
+        event_loop.close()
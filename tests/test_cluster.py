@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections
+import os
+import signal
+import socket
+import unittest
+
+import common
+
+import uv
+
+
+def serve_pid(worker):
+    def on_connection(worker, connection):
+        def on_closed(connection):
+            worker.release()
+
+        connection.write(str(os.getpid()).encode())
+        connection.close(on_closed)
+
+    worker.report_load(os.getpid() % 7)
+    worker.on_connection = on_connection
+
+
+def serve_pid_per_core(listener):
+    def on_connection(listener, status):
+        connection = listener.accept()
+        connection.write(str(os.getpid()).encode())
+        connection.close()
+
+    listener.on_connection = on_connection
+
+
+def crash(worker):
+    os._exit(1)
+
+
+FakeWorker = collections.namedtuple('FakeWorker', ['name', 'connections', 'load'])
+
+
+class FakeCluster(object):
+    def __init__(self, workers, accepted=0):
+        self.workers = workers
+        self.accepted = accepted
+
+
+class TestDistribution(common.TestCase):
+    def test_distribution(self):
+        workers = [FakeWorker('a', 2, 5), FakeWorker('b', 1, 5), FakeWorker('c', 1, 3)]
+        self.assert_equal(uv.cluster.round_robin(FakeCluster(workers, 4)).name, 'b')
+        self.assert_equal(uv.cluster.least_connections(FakeCluster(workers, 0)).name, 'b')
+        self.assert_equal(uv.cluster.least_connections(FakeCluster(workers, 2)).name, 'c')
+        self.assert_equal(uv.cluster.least_load(FakeCluster(workers, 0)).name, 'c')
+
+
+@unittest.skipIf(uv.common.is_win32, 'clusters are only supported on POSIX')
+class TestCluster(common.TestCase):
+    def test_cluster(self):
+        cluster = uv.Cluster(serve_pid, (common.TEST_IPV4, 0), workers=2, loop=self.loop)
+        self.assert_equal(cluster.target, 'test_cluster:serve_pid')
+        address = cluster.sockname
+        pids = []
+
+        def on_read(client, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                pids.append(int(data))
+            client.close()
+            if len(pids) == 4:
+                cluster.close()
+
+        def on_connect(request, status):
+            request.stream.read_start(on_read)
+
+        for _ in range(4):
+            uv.TCP(loop=self.loop).connect(address, on_connect=on_connect)
+        self.loop.run()
+        self.assert_equal(len(pids), 4)
+        self.assert_equal(len(set(pids)), 2)
+        self.assert_not_in(os.getpid(), pids)
+        self.assert_equal(cluster.accepted, 4)
+        self.assert_equal(cluster.workers, [])
+
+    def test_max_restarts(self):
+        cluster = uv.Cluster(crash, (common.TEST_IPV4, 0), workers=1, max_restarts=2,
+                             loop=self.loop)
+        self.loop.run()
+        self.assert_true(cluster.closed)
+        self.assert_equal(cluster.spawned, 3)
+        self.assert_equal(cluster.workers, [])
+
+    def test_serve_per_core(self):
+        cluster = uv.serve_per_core(serve_pid_per_core, (common.TEST_IPV4, 0), workers=2,
+                                    loop=self.loop)
+        address = cluster.sockname
+        self.assert_not_equal(address[1], 0)
+        self.assert_equal(cluster.address, tuple(address))
+        pids = []
+
+        def on_read(client, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                pids.append(int(data))
+            client.close()
+            if len(pids) == 4:
+                cluster.close()
+
+        def on_connect(request, status):
+            request.stream.read_start(on_read)
+
+        def on_ready(cluster):
+            for _ in range(4):
+                uv.TCP(loop=self.loop).connect(address, on_connect=on_connect)
+
+        cluster.on_ready = on_ready
+        self.loop.run()
+        self.assert_equal(len(pids), 4)
+        self.assert_not_in(os.getpid(), pids)
+        self.assert_equal(len(cluster.workers), 0)
+        self.assert_equal(cluster.spawned, 2)
+
+
+@unittest.skipIf(not hasattr(os, 'fork'), 'forking is not supported')
+class TestForkWorkers(common.TestCase):
+    def test_fork_workers(self):
+        server = uv.TCP(loop=self.loop)
+        server.bind((common.TEST_IPV4, 0))
+        address = server.sockname
+
+        def on_connection(server, status):
+            connection = server.accept()
+            connection.write(str(os.getpid()).encode())
+            connection.close()
+
+        def on_child(index):
+            server.listen(on_connection=on_connection)
+
+        workers = uv.fork_workers(2, on_child, loop=self.loop)
+        self.assert_equal(workers.pids, {})
+        self.loop.run(uv.RunModes.NOWAIT)
+        self.assert_equal(len(workers.pids), 2)
+        pid = None
+        while pid is None:
+            try:
+                client = socket.create_connection(tuple(address))
+            except socket.error:
+                continue
+            pid = int(client.recv(16))
+            client.close()
+        self.assert_in(pid, workers.pids.values())
+        killed = workers.pids[0]
+        os.kill(killed, signal.SIGKILL)
+
+        def on_timeout(timer):
+            if workers.restarts:
+                timer.close()
+                workers.close()
+                server.close()
+
+        uv.Timer(loop=self.loop).start(10, 10, on_timeout=on_timeout)
+        self.loop.run()
+        self.assert_equal(workers.restarts, 1)
+        self.assert_equal(workers.pids, {})
+
+    def test_fork_workers_max_restarts(self):
+        workers = uv.fork_workers(1, lambda index: None, loop=self.loop, max_restarts=2)
+        self.loop.run()
+        self.assert_true(workers.closed)
+        self.assert_equal(workers.restarts, 2)
+        self.assert_equal(workers.pids, {})
+
+    def test_loop_fork(self):
+        self.loop.fork()
+        self.loop.call_later(self.loop.stop)
+        self.loop.run()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import sys
+import unittest
+
+import common
+
+import uv
+import uv.coro
+
+
+NATIVE_ECHO = '''
+async def native_echo(address, message):
+    tcp = uv.TCP()
+    await uv.coro.connect(tcp, address)
+    await uv.coro.write(tcp, message)
+    data = await uv.coro.read(tcp)
+    tcp.close()
+    return data
+'''
+
+NATIVE_ITERATE = '''
+async def native_iterate(reader):
+    chunks = []
+    async for chunk in reader:
+        chunks.append(chunk)
+    return b''.join(chunks)
+'''
+
+if sys.version_info >= (3, 5):
+    exec(NATIVE_ECHO)
+    exec(NATIVE_ITERATE)
+
+
+class TestCoro(common.TestCase):
+    def on_read(self, stream, status, data):
+        if status != uv.StatusCodes.SUCCESS:
+            stream.close()
+        elif data:
+            stream.write(data)
+
+    def on_connection(self, server, status):
+        connection = server.accept()
+        connection.read_start(on_read=self.on_read)
+
+    def set_up(self):
+        self.address = (common.TEST_IPV4, common.TEST_PORT1)
+        self.server = uv.TCP()
+        self.server.bind(self.address)
+        self.server.listen(5, on_connection=self.on_connection)
+
+    def test_generator_echo(self):
+        def echo():
+            tcp = uv.TCP()
+            yield uv.coro.connect(tcp, self.address)
+            replies = []
+            for number in range(10):
+                yield uv.coro.write(tcp, str(number).encode())
+                replies.append((yield uv.coro.read(tcp)))
+            yield uv.coro.shutdown(tcp)
+            replies.append((yield uv.coro.read(tcp)))
+            tcp.close()
+            self.server.close()
+            raise uv.coro.Return(replies)
+
+        replies = uv.coro.run(echo())
+        self.assert_equal(replies, [str(number).encode() for number in range(10)] + [b''])
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'native coroutines are not available')
+    def test_native_echo(self):
+        task = uv.coro.spawn(native_echo(self.address, b'native'))
+        task.add_done_callback(lambda _: self.server.close())
+        self.loop.run()
+        self.assert_equal(task.result, b'native')
+
+    def test_exception(self):
+        def connect():
+            tcp = uv.TCP()
+            try:
+                yield uv.coro.connect(tcp, (common.TEST_IPV4, common.TEST_PORT2))
+            finally:
+                tcp.close()
+                self.server.close()
+
+        with self.should_raise(uv.error.ConnectionRefusedError):
+            uv.coro.run(connect())
+
+    def test_immediate_exception(self):
+        self.server.close()
+        reported = []
+
+        def fail():
+            raise ValueError()
+            yield
+
+        self.loop.excepthook = lambda loop, exc_type, *_: reported.append(exc_type)
+        with self.should_raise(ValueError):
+            uv.coro.run(fail(), loop=self.loop)
+        self.assert_equal(reported, [])
+
+    def test_sleep_and_cancel(self):
+        self.server.close()
+        events = []
+
+        def sleeper():
+            try:
+                yield uv.coro.sleep(10)
+            except uv.coro.CancelledError:
+                events.append('cancelled')
+
+        def canceller(task):
+            result = yield uv.coro.sleep(0.01, 'slept')
+            events.append(result)
+            task.cancel()
+
+        task = uv.coro.spawn(sleeper())
+        uv.coro.run(canceller(task))
+        self.assert_equal(events, ['slept', 'cancelled'])
+        self.assert_true(task.done)
+        self.loop.close_all_handles()
+        self.loop.run()
+
+    def test_getaddrinfo(self):
+        self.server.close()
+
+        def resolve():
+            addrinfo = yield uv.coro.getaddrinfo('localhost', 80)
+            raise uv.coro.Return(addrinfo)
+
+        addrinfo = uv.coro.run(resolve())
+        self.assert_true(addrinfo)
+        self.assert_equal(addrinfo[0].address.port, 80)
+
+
+class TestStreamReader(common.TestCase):
+    def on_connection(self, server, status):
+        connection = server.accept()
+        connection.write(self.data, on_write=lambda request, _: request.stream.close())
+        server.close()
+
+    def set_up(self):
+        self.data = b'x' * 2**22
+        self.server = uv.TCP()
+        self.server.bind((common.TEST_IPV4, common.TEST_PORT1))
+        self.server.listen(5, on_connection=self.on_connection)
+        self.client = uv.TCP()
+        self.client.connect((common.TEST_IPV4, common.TEST_PORT1))
+
+    def test_water_marks(self):
+        self.assert_raises(ValueError, uv.coro.StreamReader, self.client, 10, 20)
+        reader = uv.coro.StreamReader(self.client, high_water=2**16, low_water=2**14)
+        for _ in range(20):
+            self.loop.run(uv.RunModes.NOWAIT)
+        self.assert_false(reader.reading)
+        # bounded by the high water mark plus one read buffer
+        self.assert_less(reader.size, 2**16 + self.loop.allocator.buffer_size + 1)
+        self.assert_equal(b''.join(reader), self.data)
+        self.assert_true(reader.eof)
+        self.client.close()
+
+    def test_coroutine(self):
+        reader = uv.coro.StreamReader(self.client, high_water=2**15)
+
+        def consume():
+            chunks = []
+            while True:
+                chunk = yield reader.read()
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            raise uv.coro.Return(b''.join(chunks))
+
+        self.assert_equal(uv.coro.run(consume()), self.data)
+        self.client.close()
+
+    @unittest.skipIf(sys.version_info < (3, 6),
+                     'asynchronous iterators are not available')
+    def test_async_iterator(self):
+        reader = uv.coro.StreamReader(self.client, high_water=2**15)
+        self.assert_equal(uv.coro.run(native_iterate(reader)), self.data)
+        self.client.close()
@@ -0,0 +1,718 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import functools
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import common
+
+import uv
+import uv.coro
+
+
+class TestFS(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'file')
+        self.fd = uv.fs.open(self.path, os.O_RDWR | os.O_CREAT, 0o644, loop=self.loop)
+
+    def tear_down(self):
+        uv.fs.close(self.fd, loop=self.loop)
+        shutil.rmtree(self.directory)
+
+    def test_read_write_sync(self):
+        written = uv.fs.write(self.fd, [b'hello ', bytearray(b'world')], 0,
+                              loop=self.loop)
+        self.assert_equal(written, 11)
+        self.assert_equal(uv.fs.read(self.fd, 100, 0, loop=self.loop), b'hello world')
+        buffer = bytearray(8)
+        read = uv.fs.read(self.fd, memoryview(buffer)[2:], 6, loop=self.loop)
+        self.assert_equal(read, 5)
+        self.assert_equal(bytes(buffer), b'\x00\x00world\x00')
+        self.assert_equal(uv.fs.fstat(self.fd, loop=self.loop).size, 11)
+        uv.fs.ftruncate(self.fd, 5, loop=self.loop)
+        uv.fs.fdatasync(self.fd, loop=self.loop)
+        self.assert_equal(uv.fs.stat(self.path, loop=self.loop).size, 5)
+
+    def test_read_write_async(self):
+        results = []
+
+        def on_read(request, status, data):
+            results.append((status, data))
+
+        def on_write(request, status, written):
+            results.append((status, written))
+            uv.fs.read(self.fd, 4, 1, callback=on_read, loop=self.loop)
+
+        uv.fs.write(self.fd, b'content', callback=on_write, loop=self.loop)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, 7),
+                                    (uv.StatusCodes.SUCCESS, b'onte')])
+
+    def test_errors(self):
+        missing = os.path.join(self.directory, 'missing')
+        with self.should_raise(uv.error.FileNotFoundError):
+            uv.fs.stat(missing, loop=self.loop)
+        results = []
+        uv.fs.unlink(missing, callback=lambda *arguments: results.append(arguments[1:]),
+                     loop=self.loop)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.ENOENT, None)])
+
+    def test_directories(self):
+        subdirectory = os.path.join(self.directory, 'directory')
+        uv.fs.mkdir(subdirectory, loop=self.loop)
+        entries = []
+        uv.fs.scandir(self.directory, loop=self.loop,
+                      callback=lambda request, status, result: entries.extend(result))
+        self.loop.run()
+        self.assert_equal(sorted(entries), [('directory', uv.fs.DirentType.DIR),
+                                            ('file', uv.fs.DirentType.FILE)])
+        renamed = os.path.join(self.directory, 'renamed')
+        uv.fs.rename(subdirectory, renamed, loop=self.loop)
+        uv.fs.rmdir(renamed, loop=self.loop)
+        self.assert_false(os.path.exists(renamed))
+        temporary = uv.fs.mkdtemp(os.path.join(self.directory, 'tmpXXXXXX'),
+                                  loop=self.loop)
+        self.assert_true(os.path.isdir(temporary))
+
+    @common.skip_platform('win32')
+    def test_links(self):
+        link = os.path.join(self.directory, 'link')
+        uv.fs.symlink(self.path, link, loop=self.loop)
+        self.assert_equal(uv.fs.readlink(link, loop=self.loop), self.path)
+        self.assert_not_equal(uv.fs.lstat(link, loop=self.loop).ino,
+                              uv.fs.stat(link, loop=self.loop).ino)
+
+    @common.skip_platform('win32')
+    def test_sendfile(self):
+        uv.fs.write(self.fd, b'0123456789', 0, loop=self.loop)
+        target = os.path.join(self.directory, 'target')
+        out_fd = uv.fs.open(target, os.O_WRONLY | os.O_CREAT, 0o644, loop=self.loop)
+        self.assert_equal(uv.fs.sendfile(out_fd, self.fd, 2, 5, loop=self.loop), 5)
+        uv.fs.close(out_fd, loop=self.loop)
+        with open(target, 'rb') as target_file:
+            self.assert_equal(target_file.read(), b'23456')
+
+    def test_coro(self):
+        def copy():
+            yield uv.coro.fs(uv.fs.write, self.fd, b'coroutine', 0, loop=self.loop)
+            data = yield uv.coro.fs(uv.fs.read, self.fd, 64, 0, loop=self.loop)
+            raise uv.coro.Return(data)
+
+        self.assert_equal(uv.coro.run(copy(), loop=self.loop), b'coroutine')
+
+
+class TestFile(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'file')
+        self.data = os.urandom(2**20 + 123)
+        with open(self.path, 'wb') as data_file:
+            data_file.write(self.data)
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_write(self):
+        results = []
+        pool = uv.fs.BufferPool(buffer_size=64, capacity=1)
+
+        def on_read(file, status, data):
+            results.append(bytes(data))
+
+        def on_write(file, status, written):
+            results.append(written)
+            file.read(5, 0, callback=on_read)
+
+        def on_open(file, status):
+            file.write(b'hello', 0, callback=on_write)
+
+        uv.fs.File.open(self.path, os.O_RDWR, pool=pool, callback=on_open, loop=self.loop)
+        self.loop.run()
+        self.assert_equal(results, [5, b'hello'])
+        self.assert_equal(len(pool.buffers), 1)
+
+        with uv.fs.File.open(self.path, loop=self.loop) as file:
+            buffer = bytearray(10)
+            self.assert_equal(file.read(4, 5, buffer=buffer), 4)
+            self.assert_equal(buffer[:4], self.data[5:9])
+            self.assert_equal(file.read(3, 0), b'hel')
+            self.assert_equal(file.stat().size, len(self.data))
+
+    def test_readahead(self):
+        chunks = []
+        statuses = []
+
+        def on_read(file, status, data):
+            statuses.append(status)
+            chunks.append(bytes(data))
+            if status == uv.StatusCodes.EOF:
+                file.close()
+
+        pool = uv.fs.BufferPool(buffer_size=2**14)
+        file = uv.fs.File.open(self.path, pool=pool, loop=self.loop)
+        file.read_start(on_read, chunk_size=2**14, max_depth=4)
+        self.loop.run()
+        self.assert_equal(b''.join(chunks), self.data)
+        self.assert_equal(statuses[-1], uv.StatusCodes.EOF)
+        self.assert_equal(statuses.count(uv.StatusCodes.EOF), 1)
+        self.assert_less_equal(file.depth, 4)
+
+    def test_readahead_stop(self):
+        chunks = []
+
+        def on_read(file, status, data):
+            chunks.append(bytes(data))
+            if len(chunks) == 2:
+                file.read_stop()
+
+        file = uv.fs.File.open(self.path, loop=self.loop)
+        file.read_start(on_read, chunk_size=2**16)
+        self.loop.run()
+        self.assert_equal(len(chunks), 2)
+        file.read_start(offset=2**19)
+        self.loop.run()
+        self.assert_equal(b''.join(chunks), self.data[:2**17] + self.data[2**19:])
+        file.close()
+
+    def test_aligned_allocator(self):
+        allocator = uv.fs.AlignedAllocator(buffer_size=1000, capacity=1, alignment=512)
+        self.assert_equal(allocator.buffer_size, 1024)
+        for size in (None, 1, 5000):
+            buffer = allocator.acquire(size)
+            address = uv.library.ffi.cast('uintptr_t', uv.library.ffi.from_buffer(buffer))
+            self.assert_equal(int(address) % 512, 0)
+            self.assert_equal(len(buffer) % 512, 0)
+            allocator.release(buffer)
+        self.assert_equal(len(allocator.buffers), 1)
+        self.assert_raises(ValueError, uv.fs.AlignedAllocator, alignment=1000)
+
+    @unittest.skipIf(not hasattr(os, 'O_DIRECT'), 'direct I/O is not available')
+    def test_direct(self):
+        path = os.path.join(self.directory, 'direct')
+        flags = os.O_RDWR | os.O_CREAT
+        try:
+            file = uv.fs.File.open(path, flags, direct=True, loop=self.loop)
+        except uv.error.UVError:
+            self.skipTest('direct I/O is not supported by the file system')
+        results = []
+        chunks = []
+
+        def on_read(file, status, data):
+            chunks.append(bytes(data))
+            if status == uv.StatusCodes.EOF:
+                file.close()
+
+        def on_write(file, status, written):
+            results.append((status, written))
+            results.append(file.read(100, 4000))
+            file.read_start(on_read, offset=0, chunk_size=10000)
+
+        file.write([self.data[:5000], self.data[5000:10123]], 0, callback=on_write)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, 10123),
+                                    self.data[4000:4100]])
+        self.assert_equal(b''.join(chunks), self.data[:10123])
+        self.assert_raises(uv.error.UVError, file.read, 10)
+
+
+class TestMap(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.directory, 'file%d' % index)
+            with open(path, 'wb') as data_file:
+                data_file.write(str(index).encode() * 100000)
+            self.paths.append(path)
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_cache(self):
+        cache = uv.fs.MappingCache(capacity=1)
+        first = uv.fs.map(self.paths[0], cache, loop=self.loop)
+        self.assert_is(uv.fs.map(self.paths[0], cache, loop=self.loop), first)
+        self.assert_equal(first.references, 2)
+        second = uv.fs.map(self.paths[1], cache, loop=self.loop)
+        self.assert_equal(len(cache), 2)
+        first.release()
+        first.release()
+        self.assert_equal(len(cache), 1)
+        self.assert_is_not(uv.fs.map(self.paths[0], cache, loop=self.loop), first)
+        second.release()
+        self.assert_equal(len(cache), 1)
+        cache.invalidate()
+        self.assert_equal(len(cache), 0)
+        self.assert_raises(ValueError, first.slice, 10, len(first))
+
+    def test_write(self):
+        received = []
+        mappings = [None, None]
+
+        def on_read(connection, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                received.append(data)
+            else:
+                connection.close()
+
+        def on_connection(server, status):
+            server.accept().read_start(on_read=on_read)
+            server.close()
+
+        def on_map(index, mapping, status):
+            mappings[index] = mapping
+            if None not in mappings:
+                client.write([b'<', mappings[0], mappings[1].slice(10, 5), b'>'])
+                client.shutdown(on_shutdown=lambda *_: client.close())
+
+        server = uv.TCP(loop=self.loop)
+        server.bind((common.TEST_IPV4, common.TEST_PORT1))
+        server.listen(on_connection=on_connection)
+        client = uv.TCP(loop=self.loop)
+        client.connect((common.TEST_IPV4, common.TEST_PORT1))
+        cache = uv.fs.MappingCache()
+        uv.fs.map(self.paths[0], cache, callback=functools.partial(on_map, 0),
+                  loop=self.loop)
+        uv.fs.map(self.paths[1], None, callback=functools.partial(on_map, 1),
+                  loop=self.loop)
+        self.loop.run()
+        self.assert_equal(b''.join(received), b'<' + b'0' * 100000 + b'11111>')
+        self.assert_equal(len(cache), 1)
+
+    def test_missing(self):
+        results = []
+        missing = os.path.join(self.directory, 'missing')
+        uv.fs.map(missing, callback=lambda *arguments: results.append(arguments),
+                  loop=self.loop)
+        self.loop.run()
+        self.assert_equal(results, [(None, uv.StatusCodes.ENOENT)])
+        with self.should_raise(uv.error.FileNotFoundError):
+            uv.fs.map(missing, loop=self.loop)
+
+
+class TestWalk(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.expected = {}
+        for index in range(5):
+            path = os.path.join(self.directory, 'directory%d' % index, 'nested')
+            os.makedirs(path)
+            for number in range(index * 3):
+                file_path = os.path.join(path, 'file%d' % number)
+                with open(file_path, 'wb') as data_file:
+                    data_file.write(b'x' * number)
+                self.expected[file_path] = number
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_walk(self):
+        entries = {}
+        results = []
+
+        def on_entry(walker, path, dirent, stat_result):
+            self.assert_less_equal(walker.pending, 2)
+            entries[path] = (dirent.type, stat_result)
+
+        uv.fs.walk(self.directory, concurrency=2, on_entry=on_entry,
+                   on_done=lambda walker, status: results.append((status, walker.count)),
+                   loop=self.loop)
+        self.loop.run()
+        expected = set(self.expected)
+        for root, directories, _ in os.walk(self.directory):
+            expected.update(os.path.join(root, directory) for directory in directories)
+        self.assert_equal(set(entries), expected)
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, len(expected))])
+        for path in self.expected:
+            self.assert_equal(entries[path], (uv.fs.DirentType.FILE, None))
+
+    def test_stat(self):
+        sizes = {}
+
+        def on_entry(walker, path, dirent, stat_result):
+            if dirent.type == uv.fs.DirentType.FILE:
+                sizes[path] = stat_result.size
+
+        uv.fs.walk(self.directory, concurrency=4, stat=True, on_entry=on_entry,
+                   loop=self.loop)
+        self.loop.run()
+        self.assert_equal(sizes, self.expected)
+
+    def test_errors(self):
+        results = []
+
+        def on_entry(walker, path, dirent, stat_result):
+            walker.cancel()
+
+        def on_done(walker, status):
+            results.append(status)
+
+        missing = os.path.join(self.directory, 'missing')
+        uv.fs.walk(missing, on_done=on_done, loop=self.loop)
+        uv.fs.walk(self.directory, on_entry=on_entry, on_done=on_done, loop=self.loop)
+        self.loop.run()
+        self.assert_equal(set(results), {uv.StatusCodes.ENOENT, uv.StatusCodes.ECANCELED})
+
+    @unittest.skipIf(uv.common.is_win32, 'filenames are unicode on Windows')
+    def test_undecodable_names(self):
+        directory = os.path.join(self.directory, 'directory0').encode()
+        path = os.path.join(directory, b'\xff')
+        with open(path, 'wb') as data_file:
+            data_file.write(b'data')
+        names = [dirent.name for dirent in uv.fs.scandir(directory, loop=self.loop)]
+        self.assert_in(b'\xff', names)
+        names = [dirent.name for dirent in uv.fs.scandir(directory.decode(),
+                                                          loop=self.loop)]
+        self.assert_in(os.fsdecode(b'\xff'), names)
+
+        sizes = {}
+
+        def on_entry(walker, entry_path, dirent, stat_result):
+            if dirent.type == uv.fs.DirentType.FILE:
+                sizes[entry_path] = stat_result.size
+
+        results = []
+        for root in (self.directory, self.directory.encode()):
+            uv.fs.walk(root, stat=True, on_entry=on_entry,
+                       on_done=lambda walker, status: results.append(status),
+                       loop=self.loop)
+        self.loop.run()
+        self.assert_equal(results, [uv.StatusCodes.SUCCESS] * 2)
+        self.assert_equal(sizes[path], 4)
+        self.assert_equal(sizes[os.fsdecode(path)], 4)
+
+    def test_postprocessor_error(self):
+        def postprocessor(fs_request):
+            raise ValueError()
+
+        results = []
+        arguments = (self.directory.encode(), 0)
+        uv.fs.FSRequest(uv.library.lib.uv_fs_scandir, arguments,
+                        postprocessor=postprocessor,
+                        callback=lambda request, status, result: results.append(status),
+                        loop=self.loop)
+        self.loop.excepthook = lambda *_: None
+        with self.should_raise(ValueError):
+            self.loop.run()
+        self.assert_equal(results, [])
+        self.assert_raises(ValueError, uv.fs.FSRequest, uv.library.lib.uv_fs_scandir,
+                           arguments, postprocessor=postprocessor, loop=self.loop)
+
+
+class TestStatMany(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(20):
+            path = os.path.join(self.directory, 'file%d' % index)
+            with open(path, 'wb') as data_file:
+                data_file.write(b'x' * index)
+            self.paths.append(path)
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_stat_many(self):
+        results = []
+        missing = os.path.join(self.directory, 'missing')
+        paths = self.paths + [missing, self.paths[0]]
+        uv.fs.stat_many(paths, concurrency=3, callback=results.append, loop=self.loop)
+        self.loop.run()
+        self.assert_equal(len(results), 1)
+        statuses = [status for status, _ in results[0]]
+        self.assert_equal(statuses, [uv.StatusCodes.SUCCESS] * 20 +
+                                    [uv.StatusCodes.ENOENT, uv.StatusCodes.SUCCESS])
+        sizes = [stat_result.size for _, stat_result in results[0][:20]]
+        self.assert_equal(sizes, list(range(20)))
+        synchronous = uv.fs.stat_many(paths, loop=self.loop)
+        self.assert_equal([status for status, _ in synchronous], statuses)
+
+    def test_cache(self):
+        cache = uv.fs.StatCache(capacity=10, loop=self.loop)
+        results = []
+        uv.fs.stat_many(self.paths, cache=cache, callback=results.append, loop=self.loop)
+        self.loop.run()
+        self.assert_equal(len(cache), 10)
+        self.assert_in(self.paths[-1], cache)
+        self.assert_not_in(self.paths[0], cache)
+        uv.fs.stat_many(self.paths[-5:], cache=cache, callback=results.append,
+                        loop=self.loop)
+        self.assert_equal(len(results), 2)
+        cache.invalidate(self.paths[-1])
+        self.assert_not_in(self.paths[-1], cache)
+
+        expiring = uv.fs.StatCache(ttl=0.01, loop=self.loop)
+        expiring.put(self.paths[0], results[0][0][1])
+        self.assert_in(self.paths[0], expiring)
+        timer = uv.Timer(loop=self.loop)
+        timer.start(20, on_timeout=lambda handle: handle.close())
+        self.loop.run()
+        self.assert_not_in(self.paths[0], expiring)
+
+    @common.skip_platform('darwin')
+    def test_watch(self):
+        cache = uv.fs.StatCache(watch=True, loop=self.loop)
+        uv.fs.stat_many(self.paths[:2], cache=cache, loop=self.loop)
+        self.assert_equal(len(cache.watchers), 1)
+
+        def on_timeout(timer):
+            with open(self.paths[0], 'ab') as data_file:
+                data_file.write(b'changed')
+            timer.close()
+
+        uv.Timer(loop=self.loop).start(10, on_timeout=on_timeout)
+        self.loop.run()
+        for _ in range(10):
+            self.loop.run(uv.RunModes.NOWAIT)
+        self.assert_not_in(self.paths[0], cache)
+        self.assert_in(self.paths[1], cache)
+        cache.close()
+        self.assert_equal(len(cache.watchers), 0)
+
+
+class TestAppendWriter(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'journal')
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_group_commit(self):
+        writer = uv.fs.AppendWriter.open(self.path, loop=self.loop)
+        records = [('record %d\n' % index).encode() for index in range(500)]
+        completed = []
+
+        def append(index):
+            writer.append(records[index],
+                          lambda _, status: completed.append((index, status)),
+                          durable=index % 2 == 0)
+
+        for index in range(250):
+            append(index)
+
+        def on_timeout(timer):
+            timer.close()
+            for index in range(250, 500):
+                append(index)
+            writer.close(lambda _, status: completed.append(('closed', status)))
+
+        uv.Timer(loop=self.loop).start(1, on_timeout=on_timeout)
+        self.loop.run()
+        self.assert_equal(sorted(completed[:-1]),
+                          [(index, uv.StatusCodes.SUCCESS) for index in range(500)])
+        self.assert_equal(completed[-1], ('closed', uv.StatusCodes.SUCCESS))
+        self.assert_less(writer.syncs_issued, 20)
+        self.assert_equal(writer.written, sum(len(record) for record in records))
+        with open(self.path, 'rb') as journal:
+            self.assert_equal(journal.read(), b''.join(records))
+        self.assert_raises(uv.error.ClosedStructureError, writer.append, b'late')
+
+    def test_flush(self):
+        writer = uv.fs.AppendWriter.open(self.path, loop=self.loop)
+        events = []
+        writer.append(b'data', lambda *_: events.append('written'), durable=False)
+        writer.flush(lambda *_: events.append('flushed'))
+        self.loop.run()
+        self.assert_equal(events, ['written', 'flushed'])
+        self.assert_equal(writer.syncs_issued, 1)
+        writer.close()
+        self.loop.run()
+
+
+class TestFollow(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'log')
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def run_steps(self, follower, received, steps):
+        def on_tick(timer):
+            ready = follower.position is not None
+            if ready and steps and b''.join(received) == steps[0][0]:
+                steps.pop(0)[1]()
+            if not steps or timer.data > 500:
+                timer.close()
+                follower.close()
+            timer.data += 1
+
+        timer = uv.Timer(loop=self.loop)
+        timer.data = 0
+        timer.start(5, repeat=5, on_timeout=on_tick)
+        self.loop.run()
+
+    def append(self, data, path=None):
+        with open(path or self.path, 'ab') as log:
+            log.write(data)
+
+    def test_follow(self):
+        self.append(b'old\n')
+        received = []
+        follower = uv.fs.follow(self.path,
+                                lambda _, status, data: received.append(bytes(data)),
+                                interval=20, loop=self.loop)
+
+        def truncate():
+            with open(self.path, 'wb') as log:
+                log.write(b'tw\n')
+
+        def rotate():
+            os.rename(self.path, self.path + '.1')
+            self.append(b'late\n', self.path + '.1')
+            self.append(b'new\n')
+
+        self.run_steps(follower, received, [
+            (b'', lambda: self.append(b'one\n')),
+            (b'one\n', truncate),
+            (b'one\ntw\n', rotate),
+            (b'one\ntw\nlate\nnew\n', lambda: None)
+        ])
+        self.assert_equal(b''.join(received), b'one\ntw\nlate\nnew\n')
+        self.assert_equal(follower.truncations, 1)
+        self.assert_equal(follower.rotations, 1)
+        self.assert_equal(follower.position, 4)
+
+    def test_truncate_rewrite(self):
+        self.append(b'one\n')
+        received = []
+        follower = uv.fs.follow(self.path,
+                                lambda _, status, data: received.append(bytes(data)),
+                                offset=0, interval=60000, loop=self.loop)
+
+        def rewrite():
+            # rewritten past the position before any event has been handled,
+            # only the poll handle has seen the shrunk file
+            follower.fs_event.stop()
+            before = uv.fs.stat(self.path, loop=self.loop)
+            with open(self.path, 'wb') as log:
+                log.write(b'rewritten\n')
+            follower._on_change(follower.fs_poll, uv.StatusCodes.SUCCESS, before,
+                                before._replace(size=0))
+
+        self.run_steps(follower, received, [
+            (b'one\n', rewrite),
+            (b'one\nrewritten\n', lambda: None)
+        ])
+        self.assert_equal(b''.join(received), b'one\nrewritten\n')
+        self.assert_equal(follower.truncations, 1)
+
+    def test_missing(self):
+        received = []
+        follower = uv.fs.follow(self.path,
+                                lambda _, status, data: received.append(bytes(data)),
+                                interval=20, loop=self.loop)
+        self.run_steps(follower, received, [
+            (b'', lambda: self.append(b'created\n')),
+            (b'created\n', lambda: None)
+        ])
+        self.assert_equal(b''.join(received), b'created\n')
+
+
+class TestTreeWatcher(common.TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.root = self.directory.encode()
+        os.makedirs(os.path.join(self.directory, 'a', 'b'))
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, *names):
+        return os.path.join(self.root, *(name.encode() for name in names))
+
+    def test_watch(self):
+        batches = []
+        watcher = uv.TreeWatcher(self.directory,
+                                 lambda _, changes: batches.append(changes),
+                                 window=20, loop=self.loop)
+
+        def storm():
+            for index in range(200):
+                with open(os.path.join(self.directory, 'a', 'f%d' % index), 'wb'):
+                    pass
+            with open(os.path.join(self.directory, 'a', 'b', 'deep'), 'wb') as deep:
+                deep.write(b'data')
+            os.mkdir(os.path.join(self.directory, 'new'))
+            with open(os.path.join(self.directory, 'new', 'inner'), 'wb'):
+                pass
+
+        watched = []
+
+        def remove():
+            watched.append(len(watcher))
+            shutil.rmtree(os.path.join(self.directory, 'a'))
+
+        def close():
+            watched.append(len(watcher))
+            watched.append(self.path('new') in watcher)
+            watcher.close()
+
+        steps = [storm, remove, close]
+
+        def on_tick(timer):
+            if steps:
+                steps.pop(0)()
+            else:
+                timer.close()
+
+        uv.Timer(loop=self.loop).start(50, repeat=100, on_timeout=on_tick)
+        self.assert_equal(len(watcher), 1)
+        self.loop.run()
+        changes = {}
+        for batch in batches:
+            for path, events in batch.items():
+                changes[path] = changes.get(path, 0) | events
+        self.assert_true(all(self.path('a', 'f%d' % index) in changes
+                             for index in range(200)))
+        self.assert_equal(changes[self.path('a', 'b', 'deep')] & uv.FSEvents.CHANGE,
+                          uv.FSEvents.CHANGE)
+        self.assert_in(self.path('new', 'inner'), changes)
+        self.assert_in(self.path('a'), changes)
+        self.assert_less(len(batches), 10)
+        self.assert_greater(watcher.events_received, 200)
+        self.assert_equal(watched, [4, 2, True])
+
+    @unittest.skipIf(uv.common.is_win32, 'filenames are unicode on Windows')
+    def test_undecodable_names(self):
+        changes = {}
+        watcher = uv.TreeWatcher(self.directory, lambda _, batch: changes.update(batch),
+                                 window=20, decode=True, loop=self.loop)
+
+        def create():
+            os.mkdir(self.path('new'))
+            with open(os.path.join(self.path('new'), b'\xff'), 'wb'):
+                pass
+
+        steps = [create, watcher.close]
+
+        def on_tick(timer):
+            steps.pop(0)()
+            if not steps:
+                timer.close()
+
+        uv.Timer(loop=self.loop).start(20, repeat=200, on_timeout=on_tick)
+        self.loop.run()
+        self.assert_true(all(isinstance(path, str) for path in changes))
+        self.assert_in(os.fsdecode(os.path.join(self.path('new'), b'\xff')), changes)
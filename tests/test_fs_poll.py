@@ -16,6 +16,7 @@
 from __future__ import print_function, unicode_literals, division, absolute_import
 
 import os
+import shutil
 import tempfile
 
 from common import TestCase
@@ -66,3 +67,44 @@ class TestFSPoll(TestCase):
         self.fs_poll = uv.FSPoll()
 
         self.assert_raises(uv.error.ArgumentError, self.fs_poll.start)
+
+
+class TestFSPollGroup(TestCase):
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.directory, name) for name in 'abc']
+        for path in self.paths:
+            with open(path, 'wb') as data_file:
+                data_file.write(b'data')
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def test_changes(self):
+        changes = []
+        group = uv.FSPollGroup(interval=10, max_interval=80,
+                               on_change=lambda _, batch: changes.extend(batch))
+        for path in self.paths:
+            group.add(path)
+        self.assert_equal(len(group), 3)
+
+        def modify(timer):
+            with open(self.paths[0], 'ab') as data_file:
+                data_file.write(b'more')
+            os.unlink(self.paths[2])
+            group.remove(self.paths[1])
+            timer.start(250, on_timeout=finish)
+
+        def finish(timer):
+            timer.close()
+            group.close()
+
+        uv.Timer().start(50, on_timeout=modify)
+        self.loop.run()
+        self.assert_not_in(self.paths[1], group)
+        self.assert_equal(sorted((change.path, change.status, change.size)
+                                 for change in changes),
+                          [(self.paths[0], uv.StatusCodes.SUCCESS, 8),
+                           (self.paths[2], uv.StatusCodes.ENOENT, None)])
+        # polling every path every 10ms would have issued about 90 stats
+        self.assert_less(group.stats_issued, 40)
@@ -167,6 +167,19 @@ class TestLoop(common.TestCase):
 
         self.assert_true(self.callback_called)
 
+    def test_call_after_run(self):
+        calls = []
+
+        def on_timeout(timer):
+            self.loop.call_after_run(calls.append, 'after run')
+            calls.append('callback')
+
+        uv.Timer(loop=self.loop).start(1, on_timeout=on_timeout)
+        self.loop.run()
+        self.assert_equal(calls, ['callback', 'after run'])
+        self.loop.run()
+        self.assert_equal(len(calls), 2)
+
     def test_current_loop(self):
         self.assertEqual(uv.Loop.get_default(), uv.Loop.get_current())
 
@@ -286,3 +299,111 @@ class TestLoop(common.TestCase):
 
     def test_poll_timeout(self):
         self.assert_equal(self.loop.get_timeout(), 0)
+
+    def test_iteration_hooks(self):
+        self.calls = []
+
+        def make_hook(name):
+            def on_hook(loop):
+                self.calls.append(name)
+            return on_hook
+
+        def on_timeout(timer):
+            self.calls.append('timer')
+            if self.calls.count('timer') == 2:
+                timer.close()
+
+        self.loop.add_iteration_hook(uv.IterationPhases.BEFORE_POLL, make_hook('b2'), 2)
+        self.loop.add_iteration_hook(uv.IterationPhases.BEFORE_POLL, make_hook('b1'), 1)
+        hook = self.loop.add_iteration_hook(uv.IterationPhases.AFTER_POLL, make_hook('a'))
+
+        self.timer = uv.Timer(on_timeout=on_timeout)
+        self.timer.start(1, repeat=1)
+
+        self.loop.run()
+
+        hook_calls = [name for name in self.calls if name != 'timer']
+        self.assert_equal(hook_calls[:3], ['b1', 'b2', 'a'])
+        self.assert_equal(self.calls.count('timer'), 2)
+
+        hook.remove()
+        hook.remove()
+        self.assert_false(hook.active)
+
+        self.calls = []
+        self.timer = uv.Timer(on_timeout=on_timeout)
+        self.timer.start(1)
+        self.loop.run()
+
+        self.assert_not_in('a', self.calls)
+        self.assert_in('b1', self.calls)
+
+    def test_iteration_hook_remove_during_dispatch(self):
+        self.calls = []
+
+        def on_first(loop):
+            self.calls.append('first')
+            self.second.remove()
+
+        def on_second(loop):
+            self.calls.append('second')
+
+        def on_prepare(prepare):
+            prepare.close()
+
+        self.loop.add_iteration_hook(uv.IterationPhases.BEFORE_POLL, on_first)
+        self.second = self.loop.add_iteration_hook(uv.IterationPhases.BEFORE_POLL,
+                                                   on_second)
+
+        self.prepare = uv.Prepare(on_prepare=on_prepare)
+        self.prepare.start()
+        self.loop.run()
+
+        self.assert_in('first', self.calls)
+        self.assert_not_in('second', self.calls)
+
+    def test_iteration_hooks_do_not_keep_loop_alive(self):
+        self.loop.add_iteration_hook(uv.IterationPhases.AFTER_POLL, lambda loop: None)
+        self.assert_false(self.loop.alive)
+        self.loop.run()
+
+    def test_run_low_latency(self):
+        self.timer_called = 0
+
+        def on_timeout(timer):
+            self.timer_called += 1
+            if self.timer_called == 5:
+                timer.close()
+
+        self.timer = uv.Timer(on_timeout=on_timeout)
+        self.timer.start(1, repeat=1)
+
+        self.assert_false(self.loop.run_low_latency(spin_us=100))
+        self.assert_equal(self.timer_called, 5)
+        self.assert_false(self.loop.alive)
+        self.assert_greater_equal(self.loop.activity, 5)
+        self.assert_false(self.loop.track_activity)
+
+    def test_activity_not_tracked(self):
+        timer = uv.Timer(on_timeout=lambda timer: timer.close())
+        timer.start(0)
+        self.loop.run()
+        self.assert_equal(self.loop.activity, 0)
+
+    def test_run_low_latency_stop(self):
+        self.timer_called = 0
+
+        def on_timeout(timer):
+            self.timer_called += 1
+            if self.timer_called == 2:
+                self.loop.stop()
+
+        self.timer = uv.Timer(on_timeout=on_timeout)
+        self.timer.start(1, repeat=1)
+
+        self.assert_true(self.loop.run_low_latency(spin_us=0, adaptive=False))
+        self.assert_equal(self.timer_called, 2)
+        self.assert_false(self.loop.stop_requested)
+
+        self.timer.close()
+        self.loop.run()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os
+import socket
+import threading
+import unittest
+
+import common
+
+import uv
+
+
+class TestLoopGroup(common.TestCase):
+    def test_submit(self):
+        group = uv.LoopGroup(2)
+        self.assert_equal(len(group), 2)
+        results = []
+        done = threading.Semaphore(0)
+
+        def record(index):
+            results.append((index, uv.Loop.get_current(), threading.current_thread()))
+            done.release()
+
+        for index in range(4):
+            group.submit(record, index)
+        group.submit_to(1, record, 4)
+        for _ in range(5):
+            done.acquire()
+        group.close()
+        self.assert_equal(sorted(index for index, _, _ in results), list(range(5)))
+        loops = dict((index, loop) for index, loop, _ in results)
+        self.assert_is(loops[0], group.loops[0])
+        self.assert_is(loops[1], group.loops[1])
+        self.assert_is(loops[2], group.loops[0])
+        self.assert_is(loops[4], group.loops[1])
+        self.assert_not_in(threading.current_thread(),
+                           [thread for _, _, thread in results])
+        self.assert_false(any(thread.is_alive() for thread in group.threads))
+        self.assert_raises(RuntimeError, group.submit, abs, 1)
+
+    @common.skip_platform('win32')
+    def test_transfer(self):
+        group = uv.LoopGroup(2)
+        servers = []
+        listening = threading.Event()
+
+        def on_transferred(connection):
+            loop_index = group.loops.index(connection.loop)
+            connection.write(str(loop_index).encode())
+            connection.close()
+
+        def on_connection(server, status):
+            group.transfer(server.accept(), 1, on_transferred)
+
+        def listen():
+            server = uv.TCP()
+            server.bind((common.TEST_IPV4, 0))
+            server.listen(on_connection=on_connection)
+            servers.append(server)
+            listening.set()
+
+        group.submit_to(0, listen)
+        listening.wait()
+        client = socket.create_connection(tuple(servers[0].sockname))
+        self.assert_equal(client.recv(16), b'1')
+        client.close()
+        group.close()
+
+    @unittest.skipIf(not hasattr(os, 'sched_setaffinity'), 'pinning is not supported')
+    def test_pin(self):
+        cpu = sorted(os.sched_getaffinity(0))[0]
+        affinity = []
+        group = uv.LoopGroup(1, cpus=[cpu])
+        group.submit(lambda: affinity.append(os.sched_getaffinity(0)))
+        group.close()
+        self.assert_equal(affinity, [{cpu}])
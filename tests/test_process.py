@@ -15,7 +15,9 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import functools
 import json
+import os
 import sys
 
 import common
@@ -113,3 +115,145 @@ class TestProcess(common.TestCase):
     def test_unknown_file(self):
         arguments = [sys.executable, PROGRAM_HELLO]
         self.assert_raises(uv.error.ArgumentError, uv.Process, arguments, stdout='abc')
+
+
+class TestProcessSpec(common.TestCase):
+    def test_spawn(self):
+        spec = uv.ProcessSpec([sys.executable, PROGRAM_DUMP_ENV], stdout=uv.PIPE,
+                              env={'hello': 'world', 'answer': '41'})
+        self.outputs = {}
+
+        def on_read(index, pipe_handle, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.outputs[index] = self.outputs.get(index, b'') + data
+            else:
+                pipe_handle.close()
+
+        processes = [spec.spawn(loop=self.loop),
+                     spec.spawn(extra_env={'answer': '42', 'extra': 'yes'},
+                                loop=self.loop),
+                     uv.Process(spec, cwd=common.resolve_path(''), loop=self.loop)]
+        for index, process in enumerate(processes):
+            process.stdout.read_start(functools.partial(on_read, index))
+        self.assert_is_not(processes[0].stdout, processes[1].stdout)
+        self.loop.run()
+
+        results = [json.loads(self.outputs[index].decode()) for index in range(3)]
+        self.assert_equal(results[0]['answer'], '41')
+        self.assert_not_in('extra', results[0])
+        self.assert_equal(results[1]['answer'], '42')
+        self.assert_equal(results[1]['extra'], 'yes')
+        self.assert_equal(results[1]['hello'], 'world')
+        self.assert_true(results[2]['cwd'].endswith('tests/data'))
+        self.assert_equal(spec.env, {'hello': 'world', 'answer': '41'})
+
+    def test_with_env_inherited(self):
+        spec = uv.ProcessSpec([sys.executable, PROGRAM_DUMP_ENV], stdout=uv.PIPE)
+        first = spec.with_env({'answer': '42'})
+        inherited_env = spec.inherited_env
+        second = spec.with_env({'answer': '43'})
+        self.assert_is(spec.inherited_env, inherited_env)
+        self.assert_equal(first.env['answer'], '42')
+        self.assert_equal(dict(second.env, answer='42'), first.env)
+        self.buffer = b''
+
+        def on_read(pipe_handle, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.buffer += data
+            else:
+                pipe_handle.close()
+
+        second.spawn(loop=self.loop).stdout.read_start(on_read)
+        self.loop.run()
+        result = json.loads(self.buffer.decode())
+        self.assert_equal(result['answer'], '43')
+        self.assert_equal(result.get('PATH'), os.environ.get('PATH'))
+
+    def test_stdio_override(self):
+        spec = uv.ProcessSpec([sys.executable, PROGRAM_HELLO])
+        self.returncodes = []
+        self.buffer = b''
+
+        def on_exit(process_handle, returncode, signum):
+            self.returncodes.append(returncode)
+
+        def on_read(pipe_handle, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.buffer += data
+            else:
+                pipe_handle.close()
+
+        spec.spawn(on_exit=on_exit, loop=self.loop)
+        process = spec.spawn(stdout=uv.PIPE, on_exit=on_exit, loop=self.loop)
+        process.stdout.read_start(on_read)
+        self.loop.run()
+        self.assert_equal(self.returncodes, [1, 1])
+        self.assert_equal(self.buffer.strip(), b'hello')
+
+
+class TestRunMany(common.TestCase):
+    def test_run_many(self):
+        commands = [[sys.executable, PROGRAM_HELLO] for _ in range(5)]
+        commands.append({'arguments': [sys.executable, PROGRAM_DUMP_ENV],
+                         'env': {'hello': 'world'}})
+        commands.append(['program-which-does-not-exist'])
+        self.running = []
+
+        def on_result(batch, result):
+            self.running.append(batch.running)
+
+        def on_done(batch):
+            self.done = True
+
+        self.done = False
+        batch = uv.process.run_many(commands, concurrency=2, on_result=on_result,
+                                    on_done=on_done, loop=self.loop)
+        self.loop.run()
+        self.assert_true(self.done)
+        self.assert_true(all(running <= 2 for running in self.running))
+        results = batch.results
+        for result in results[:5]:
+            self.assert_equal(result.stdout.value.strip(), b'hello')
+            self.assert_equal(result.returncode, 1)
+            self.assert_false(result.success)
+            self.assert_greater_equal(result.duration, 0)
+        self.assert_true(results[5].success)
+        self.assert_equal(json.loads(results[5].stdout.value.decode())['hello'], 'world')
+        self.assert_is_instance(results[6].error, uv.error.FileNotFoundError)
+
+    def test_run_many_spawn_error(self):
+        batch = uv.process.run_many([['program-which-does-not-exist']], loop=self.loop)
+        self.loop.run()
+        self.assert_is_instance(batch.results[0].error, uv.error.FileNotFoundError)
+        self.assert_equal(self.loop.handles, set())
+
+    def test_run_many_timeout(self):
+        commands = [{'arguments': [sys.executable, PROGRAM_ENDLESS_LOOP], 'timeout': 100},
+                    [sys.executable, PROGRAM_HELLO]]
+        batch = uv.process.run_many(commands, timeout=10000, loop=self.loop)
+        self.loop.run()
+        killed, hello = batch.results
+        self.assert_true(killed.timed_out)
+        self.assert_not_equal(killed.signum, 0)
+        self.assert_greater_equal(killed.duration, 100)
+        self.assert_false(hello.timed_out)
+        self.assert_equal(hello.returncode, 1)
+
+    @common.skip_platform('win32')
+    def test_run_many_timeout_descendants(self):
+        commands = [{'arguments': ['sh', '-c', 'sleep 5 & sleep 5'], 'timeout': 200}]
+        batch = uv.process.run_many(commands, loop=self.loop)
+        self.loop.run()
+        result = batch.results[0]
+        self.assert_true(result.timed_out)
+        self.assert_less(result.duration, 2000)
+
+    def test_output_buffer(self):
+        buffer = uv.process.OutputBuffer(limit=8)
+        buffer.append(b'0123456789')
+        self.assert_equal(buffer.value, b'23456789')
+        self.assert_equal(buffer.dropped, 2)
+        lines = uv.process.OutputBuffer(limit=8, split=True)
+        lines.append(b'abc\ndef\ngh')
+        self.assert_equal(lines.value, [b'def', b'gh'])
+        self.assert_equal(lines.dropped, 4)
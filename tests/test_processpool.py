@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os
+import unittest
+
+import common
+
+import uv
+
+
+@unittest.skipIf(uv.common.is_win32, 'process pools are only supported on POSIX')
+class TestProcessPool(common.TestCase):
+    def test_submit(self):
+        pool = uv.ProcessPool(workers=2, loop=self.loop)
+        results = []
+
+        def on_done(task, status, result):
+            results.append((status, result, task.exception))
+            if len(results) == 4:
+                pool.close()
+
+        pool.submit(pow, 2, 10, on_done=on_done)
+        pool.submit(os.getpid, on_done=on_done)
+        pool.submit(int, '12', base=16, on_done=on_done)
+        pool.submit(int, 'invalid', on_done=on_done)
+        self.loop.run()
+        self.assert_equal([status for status, _, _ in results],
+                          [uv.StatusCodes.SUCCESS] * 4)
+        self.assert_in((uv.StatusCodes.SUCCESS, 1024, None), results)
+        self.assert_in((uv.StatusCodes.SUCCESS, 18, None), results)
+        self.assert_not_in(os.getpid(), [result for _, result, _ in results])
+        self.assert_true(any(isinstance(exception, ValueError)
+                             for _, _, exception in results))
+        self.assert_equal(len(pool), 0)
+        self.assert_raises(RuntimeError, pool.submit, abs, 1)
+
+    def test_failing_callback(self):
+        pool = uv.ProcessPool(workers=1, loop=self.loop)
+        results = []
+
+        def on_failing(task, status, result):
+            raise RuntimeError('callback failed')
+
+        def on_done(task, status, result):
+            results.append(result)
+            pool.close()
+
+        self.loop.excepthook = lambda *_: None
+        pool.submit(abs, -1, on_done=on_failing)
+        pool.submit(abs, -2, on_done=on_done)
+        with self.should_raise(RuntimeError):
+            self.loop.run()
+        self.assert_equal(results, [2])
+
+    def test_recycle(self):
+        pool = uv.ProcessPool(workers=1, max_tasks=2, loop=self.loop)
+        pids = []
+
+        def on_done(task, status, result):
+            pids.append(result)
+            if len(pids) == 5:
+                pool.close()
+
+        for _ in range(5):
+            pool.submit(os.getpid, on_done=on_done)
+        self.loop.run()
+        self.assert_equal(len(set(pids)), 3)
+        self.assert_equal(pool.spawned, 3)
+
+    def test_crash(self):
+        pool = uv.ProcessPool(workers=1, loop=self.loop)
+        results = []
+
+        def on_done(task, status, result):
+            results.append((status, result))
+            if len(results) == 2:
+                pool.close()
+
+        pool.submit(os._exit, 1, on_done=on_done)
+        pool.submit(abs, -3, on_done=on_done)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.EPIPE, None),
+                                    (uv.StatusCodes.SUCCESS, 3)])
+        self.assert_equal(pool.spawned, 2)
+        self.assert_equal(pool.restarter.restarts, 0)
+
+    def test_max_restarts(self):
+        pool = uv.ProcessPool(workers=1, max_restarts=1, loop=self.loop)
+        statuses = []
+
+        def on_done(task, status, result):
+            statuses.append(status)
+
+        for _ in range(2):
+            pool.submit(os._exit, 1, on_done=on_done)
+        pool.submit(abs, -3, on_done=on_done)
+        self.loop.run()
+        self.assert_equal(statuses, [uv.StatusCodes.EPIPE] * 3)
+        self.assert_equal(pool.spawned, 2)
+        self.assert_true(pool.closed)
+
+    def test_close(self):
+        pool = uv.ProcessPool(workers=1, loop=self.loop)
+        statuses = []
+        pool.submit(abs, -1, on_done=lambda task, status, result: statuses.append(status))
+        pool.submit(abs, -2, on_done=lambda task, status, result: statuses.append(status))
+        pool.close()
+        self.loop.run()
+        self.assert_equal(statuses, [uv.StatusCodes.ECANCELED, uv.StatusCodes.SUCCESS])
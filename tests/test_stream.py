@@ -15,6 +15,9 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import os
+import tempfile
+
 import common
 
 import uv
@@ -73,3 +76,102 @@ class TestStream(common.TestCase):
         self.pipe = uv.Pipe()
         self.assert_false(self.pipe.readable)
         self.assert_false(self.pipe.writable)
+
+
+@common.skip_platform('win32')
+class TestSendfile(common.TestCase):
+    def set_up(self):
+        self.data = os.urandom(2**22 + 17)
+        self.file = tempfile.TemporaryFile()
+        self.file.write(self.data)
+        self.file.flush()
+        self.received = []
+
+        def on_read(connection, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.received.append(data)
+            else:
+                connection.close()
+
+        def on_connection(server, status):
+            connection = server.accept()
+            if self.read_delay:
+                timer = uv.Timer(loop=self.loop)
+                timer.start(self.read_delay, on_timeout=lambda _: (
+                    timer.close(), connection.read_start(on_read=on_read)))
+            else:
+                connection.read_start(on_read=on_read)
+            server.close()
+
+        self.read_delay = 0
+
+        self.server = uv.TCP()
+        self.server.bind((common.TEST_IPV4, common.TEST_PORT1))
+        self.server.listen(on_connection=on_connection)
+        self.client = uv.TCP()
+
+    def tear_down(self):
+        self.file.close()
+
+    def test_sendfile(self):
+        results = []
+        progress = []
+
+        def on_done(operation, status):
+            results.append((status, operation.sent))
+            self.client.close()
+
+        def on_connect(request, status):
+            self.client.write(b'header')
+            self.client.sendfile(self.file, 10, None, on_done,
+                                 lambda operation, sent: progress.append(sent),
+                                 chunk_size=2**20)
+
+        self.client.connect((common.TEST_IPV4, common.TEST_PORT1), on_connect=on_connect)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, len(self.data) - 10)])
+        self.assert_equal(b''.join(self.received), b'header' + self.data[10:])
+        self.assert_equal(progress[-1], len(self.data) - 10)
+        self.assert_equal(progress, sorted(progress))
+
+    def test_count_and_cancel(self):
+        results = []
+
+        def on_progress(operation, sent):
+            operation.cancel()
+
+        def on_first(operation, status):
+            results.append((status, operation.sent))
+            self.client.sendfile(self.file.fileno(), 0, 2**21, on_second, on_progress,
+                                 chunk_size=2**16)
+
+        def on_second(operation, status):
+            results.append((status, operation.sent))
+            self.client.close()
+
+        def on_connect(request, status):
+            self.client.sendfile(self.file.fileno(), 5, 100, on_first)
+
+        self.client.connect((common.TEST_IPV4, common.TEST_PORT1), on_connect=on_connect)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, 100),
+                                    (uv.StatusCodes.ECANCELED, 2**16)])
+        self.assert_equal(b''.join(self.received), self.data[5:105] + self.data[:2**16])
+
+    def test_full_socket_buffer(self):
+        results = []
+        self.read_delay = 50
+
+        def on_done(operation, status):
+            results.append((status, operation.sent))
+            self.client.close()
+
+        def on_connect(request, status):
+            self.client.send_buffer_size = 2**14
+            self.client.sendfile(self.file, on_done=on_done)
+
+        self.client.connect((common.TEST_IPV4, common.TEST_PORT1), on_connect=on_connect)
+        self.loop.run()
+        self.assert_equal(results, [(uv.StatusCodes.SUCCESS, len(self.data))])
+        self.assert_equal(b''.join(self.received), self.data)
+
@@ -15,6 +15,7 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import os
 import socket
 
 import common
@@ -49,6 +50,22 @@ class TestTCP(common.TestCase):
         self.tcp = uv.TCP()
         self.tcp.open(server.fileno())
 
+    @common.skip_platform('win32')
+    def test_init_error(self):
+        fds = []
+        try:
+            while True:
+                fds.append(os.open(os.devnull, os.O_RDONLY))
+        except OSError:
+            pass
+        try:
+            self.assert_raises(uv.UVError, uv.TCP, flags=socket.AF_INET, loop=self.loop)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self.assert_equal(self.loop.handles, set())
+        self.loop.run()
+
     def test_family(self):
         self.tcp4 = uv.TCP()
         self.assert_equal(self.tcp4.family, None)
@@ -59,6 +76,19 @@ class TestTCP(common.TestCase):
         self.tcp6.bind((common.TEST_IPV6, common.TEST_PORT1))
         self.assert_equal(self.tcp6.family, socket.AF_INET6)
 
+    @common.skip_platform('win32')
+    def test_reuse_port(self):
+        address = (common.TEST_IPV4, common.TEST_PORT1)
+        self.tcp1 = uv.TCP()
+        self.tcp1.bind(address, reuse_port=True)
+        self.tcp1.listen()
+        self.tcp2 = uv.TCP()
+        self.tcp2.bind(address, reuse_port=True)
+        self.tcp2.listen()
+        self.assert_equal(self.tcp2.sockname, address)
+        self.tcp1.close()
+        self.tcp2.close()
+
     def test_sockname_peername(self):
         address = (common.TEST_IPV4, common.TEST_PORT1)
 
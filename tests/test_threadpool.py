@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import hashlib
+import threading
+import unittest
+
+import common
+
+import uv
+import uv.threadpool
+
+
+class TestThreadpool(common.TestCase):
+    def test_run_in_threadpool(self):
+        data = b'x' * 2**20
+        results = []
+
+        def digest(data, name='sha256'):
+            return threading.current_thread(), hashlib.new(name, data).hexdigest()
+
+        def on_done(request, status, result):
+            results.append((status, result))
+
+        self.loop.run_in_threadpool(digest, data, on_done=on_done)
+        self.loop.run_in_threadpool(digest, data, name='md5', on_done=on_done)
+        self.loop.run()
+        self.assert_equal(sorted(result[1] for _, result in results),
+                          sorted([hashlib.sha256(data).hexdigest(),
+                                  hashlib.md5(data).hexdigest()]))
+        self.assert_equal([status for status, _ in results],
+                          [uv.StatusCodes.SUCCESS] * 2)
+        self.assert_not_in(threading.current_thread(), [result[0] for _, result in results])
+
+    def test_exception(self):
+        requests = []
+
+        def fail():
+            raise ValueError('test')
+
+        self.loop.run_in_threadpool(fail,
+                                    on_done=lambda request, *_: requests.append(request))
+        self.loop.run()
+        self.assert_is_instance(requests[0].exception, ValueError)
+        self.assert_is(requests[0].result, None)
+
+    def test_threadpool_size(self):
+        self.assert_raises(ValueError, uv.set_threadpool_size, 0)
+        self.assert_raises(ValueError, uv.set_threadpool_size, 1000)
+
+
+@unittest.skipIf(not hasattr(uv.threadpool, 'Executor'), 'concurrent.futures is missing')
+class TestExecutor(common.TestCase):
+    def test_submit(self):
+        executor = uv.threadpool.Executor(loop=self.loop)
+        future = executor.submit(pow, 2, 10)
+        self.assert_false(future.done())
+        self.loop.run()
+        self.assert_equal(future.result(), 1024)
+        failed = executor.submit(int, 'invalid')
+        executor.shutdown()
+        self.assert_is_instance(failed.exception(), ValueError)
+        self.assert_raises(RuntimeError, executor.submit, abs, 1)
+
+    def test_foreign_thread(self):
+        executor = uv.threadpool.Executor(loop=self.loop)
+        futures = []
+        thread = threading.Thread(target=lambda: futures.append(executor.submit(abs, -5)))
+        thread.start()
+        thread.join()
+        self.loop.run()
+        self.assert_equal(futures[0].result(), 5)
@@ -151,6 +151,17 @@ class TestUDP(common.TestCase):
 
         self.assert_equal(self.datagram, b'hello')
 
+    @common.skip_platform('win32')
+    def test_udp_reuse_port(self):
+        address = (common.TEST_IPV4, common.TEST_PORT1)
+        self.udp1 = uv.UDP()
+        self.udp1.bind(address, reuse_port=True)
+        self.udp2 = uv.UDP()
+        self.udp2.bind(address, reuse_port=True)
+        self.assert_equal(self.udp2.sockname, address)
+        self.udp1.close()
+        self.udp2.close()
+
     def test_udp_closed(self):
         self.udp = uv.UDP()
         self.udp.close()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import unittest
+
+import common
+
+import uv
+
+
+PROGRAM_HELLO = common.resolve_path('program_hello.py')
+PROGRAM_ENDLESS_LOOP = common.resolve_path('program_endless_loop.py')
+PROGRAM_DUMP_ENV = common.resolve_path('program_dump_env.py')
+
+
+@unittest.skipIf(uv.common.is_win32 or not hasattr(socket.socket, 'sendmsg'),
+                 'zygotes are only supported on POSIX with Python 3.3+')
+class TestZygote(common.TestCase):
+    def set_up(self):
+        super(TestZygote, self).set_up()
+        self.zygote = uv.Zygote(loop=self.loop)
+
+    def tear_down(self):
+        self.zygote.close()
+        super(TestZygote, self).tear_down()
+
+    def test_zygote_hello(self):
+        self.buffer = b''
+        self.returncode = None
+        self.spawn_status = None
+
+        def on_spawn(process, status):
+            self.spawn_status = status
+            self.assert_not_equal(process.pid, os.getpid())
+
+        def on_exit(process, returncode, signum):
+            self.returncode = returncode
+
+        def on_read(pipe, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.buffer += data
+            else:
+                pipe.close()
+
+        process = self.zygote.spawn([sys.executable, PROGRAM_HELLO], stdout=uv.PIPE,
+                                    on_spawn=on_spawn, on_exit=on_exit)
+        self.assert_is_none(process.pid)
+        process.stdout.read_start(on_read)
+        self.loop.run()
+        self.assert_equal(self.spawn_status, uv.StatusCodes.SUCCESS)
+        self.assert_equal(self.buffer.strip(), b'hello')
+        self.assert_equal(self.returncode, 1)
+        self.assert_raises(uv.error.ProcessLookupError, process.kill)
+        process.close()
+        self.assert_raises(uv.ClosedHandleError, process.kill)
+
+    def test_zygote_env_cwd(self):
+        self.buffer = b''
+
+        def on_read(pipe, status, data):
+            if status == uv.StatusCodes.SUCCESS:
+                self.buffer += data
+            else:
+                pipe.close()
+
+        cwd = os.path.dirname(PROGRAM_DUMP_ENV)
+        process = self.zygote.spawn([sys.executable, PROGRAM_DUMP_ENV], stdout=uv.PIPE,
+                                    env={'hello': 'world'}, cwd=cwd)
+        process.stdout.read_start(on_read)
+        self.loop.run()
+        result = json.loads(self.buffer.decode())
+        self.assert_equal(result['hello'], 'world')
+        self.assert_equal(os.path.realpath(result['cwd']), os.path.realpath(cwd))
+
+    def test_zygote_kill(self):
+        self.signum = None
+
+        def on_exit(process, returncode, signum):
+            self.signum = signum
+
+        def on_timeout(timer):
+            process.kill(signal.SIGTERM)
+            timer.close()
+
+        process = self.zygote.spawn([sys.executable, PROGRAM_ENDLESS_LOOP],
+                                    on_exit=on_exit)
+        uv.Timer(loop=self.loop).start(100, on_timeout=on_timeout)
+        self.loop.run()
+        self.assert_equal(self.signum, signal.SIGTERM)
+
+    def test_zygote_kill_default(self):
+        self.signum = None
+
+        def on_exit(process, returncode, signum):
+            self.signum = signum
+
+        def on_spawn(process, status):
+            process.kill()
+
+        self.zygote.spawn(['sleep', '10'], on_spawn=on_spawn, on_exit=on_exit)
+        self.loop.run()
+        self.assert_equal(self.signum, signal.SIGINT)
+
+    def test_zygote_backlog(self):
+        self.returncodes = []
+
+        def on_exit(process, returncode, signum):
+            self.returncodes.append(returncode)
+
+        env = dict(os.environ)
+        env.update(('FILLER%d' % index, 'x' * 100000) for index in range(3))
+        for _ in range(10):
+            self.zygote.spawn([sys.executable, '-c', 'pass'], env=env, on_exit=on_exit)
+        self.assert_true(self.zygote.outbox)
+        self.loop.run()
+        self.assert_equal(self.returncodes, [0] * 10)
+
+    def test_zygote_kill_before_spawn(self):
+        self.signum = None
+
+        def on_exit(process, returncode, signum):
+            self.signum = signum
+
+        process = self.zygote.spawn([sys.executable, PROGRAM_ENDLESS_LOOP],
+                                    on_exit=on_exit)
+        process.kill(signal.SIGTERM)
+        self.loop.run()
+        self.assert_equal(self.signum, signal.SIGTERM)
+
+    def test_zygote_unknown_program(self):
+        self.status = None
+
+        def on_spawn(process, status):
+            self.status = status
+
+        process = self.zygote.spawn(['program-which-does-not-exist'], stdout=uv.PIPE,
+                                    on_spawn=on_spawn, on_exit=self.fail)
+        self.loop.run()
+        self.assert_equal(self.status, uv.StatusCodes.ENOENT)
+        self.assert_true(process.stdout.closed)
+        self.assert_is_none(process.pid)
+        self.zygote.close()
+        self.assert_raises(RuntimeError, self.zygote.spawn, [sys.executable])
+
+    def test_zygote_died(self):
+        statuses = []
+
+        def on_spawn(process, status):
+            statuses.append(status)
+
+        os.kill(self.zygote.process.pid, signal.SIGKILL)
+        with self.assert_raises(uv.UVError) as context:
+            while True:
+                self.zygote.spawn([sys.executable, PROGRAM_HELLO], on_spawn=on_spawn)
+                time.sleep(0.01)
+        self.assert_equal(context.exception.code, uv.StatusCodes.EPIPE)
+        self.loop.run()
+        self.assert_true(self.zygote.closed)
+        self.assert_equal(statuses, [uv.StatusCodes.EPIPE] * len(statuses))
@@ -18,9 +18,11 @@ This package aims to provide an object oriented CFFI based wrapper around
 the libuv asynchronous IO library. It supports all handles as well as
 filesystem operations, dns utility functions and miscellaneous utilities.
 
-There are no plans to support the thread pool work scheduling and the
-threading and synchronization utilities because Python already provides
-nice solutions for those things in the standard library.
+Functions can be scheduled on libuv's thread pool, which is shared with
+filesystem operations and dns lookups, see :mod:`uv.threadpool`, or on
+a pool of worker processes, see :mod:`uv.processpool`. There are no plans
+to support the threading and synchronization utilities because Python
+already provides nice solutions for those things in the standard library.
 
 Based on Python's standard library's SSL module this package also provides
 support for asynchronous SSL sockets.
@@ -40,7 +42,7 @@ from .library import version as uv_version
 
 from .error import UVError, ClosedHandleError, ClosedLoopError, StatusCodes
 from .handle import Handle
-from .loop import RunModes, Loop
+from .loop import RunModes, IterationPhases, Loop
 from .request import Request
 
 from . import common, error, loop, handle, request
@@ -51,16 +53,17 @@ from .handles.idle import Idle
 from .handles.pipe import PipeConnectRequest, Pipe
 from .handles.poll import PollEvent, Poll
 from .handles.prepare import Prepare
-from .handles.process import CreatePipe, PIPE, ProcessFlags, Process
+from .handles.process import CreatePipe, PIPE, ProcessFlags, ProcessSpec, Process
 from .handles.signal import Signals, Signal
-from .handles.stream import ShutdownRequest, WriteRequest, ConnectRequest, Stream
+from .handles.stream import (ShutdownRequest, WriteRequest, ConnectRequest, Sendfile,
+                             Stream)
 from .handles.tcp import TCPFlags, TCPConnectRequest, TCP
 from .handles.timer import Timer
 from .handles.tty import ConsoleSize, TTYMode, TTY
 from .handles.udp import UDPFlags, UDPMembership, UDPSendRequest, UDP
 
 from .handles.fs_event import FSEvents, FSEventFlags, FSEvent
-from .handles.fs_poll import FSPoll
+from .handles.fs_poll import FSPoll, FSPollChange, FSPollGroup
 
 from .handles import async
 from .handles import check
@@ -80,9 +83,20 @@ from .handles import fs_poll
 from .dns import (AddressFamilies, SocketTypes, SocketProtocols, Address, Address4,
                   Address6, AddrInfo, NameInfo, getnameinfo, getaddrinfo)
 
-from .fs import Stat
+from .fs import Stat, TreeWatcher
+
+from .threadpool import WorkRequest, set_threadpool_size
+from .processpool import ProcessTask, ProcessPool
+from .cluster import Cluster, serve_per_core, fork_workers
+from .loopgroup import LoopGroup
+from .zygote import ZygoteProcess, Zygote
 
 from . import dns
 from . import fs
+from . import threadpool
+from . import processpool
+from . import cluster
+from . import loopgroup
+from . import zygote
 from . import misc
 from . import secure
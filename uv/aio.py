@@ -0,0 +1,1831 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+An implementation of :class:`asyncio.AbstractEventLoop` running on top
+of :class:`uv.Loop`. Transports are backed by the stream, datagram and
+process handles of this package, timers share a single :class:`uv.Timer`
+and ready callbacks are dispatched from an idle handle and an after poll
+iteration hook, so callbacks scheduled by IO callbacks run within the
+same loop iteration.
+
+This module requires :mod:`asyncio` and therefore Python 3.4 or newer.
+To make :func:`asyncio.get_event_loop` return instances of
+:class:`uv.aio.EventLoop` install the policy::
+
+    import asyncio
+    import uv.aio
+
+    asyncio.set_event_loop_policy(uv.aio.EventLoopPolicy())
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import heapq
+import logging
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import weakref
+
+from asyncio import events, futures, protocols, tasks, transports
+
+from . import dns, error, loop
+from .handles import async, idle, pipe, poll, process, signal as uv_signal
+from .handles import tcp, timer, udp
+
+
+logger = logging.getLogger(__name__)
+
+_READ_EVENTS = poll.PollEvent.READABLE
+_WRITE_EVENTS = poll.PollEvent.WRITABLE
+
+_FATAL_ERROR_IGNORE = (BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+
+def _fileobj_to_fd(fileobj):
+    if isinstance(fileobj, int):
+        fd = fileobj
+    else:
+        try:
+            fd = int(fileobj.fileno())
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError('invalid file object: {!r}'.format(fileobj))
+    if fd < 0:
+        raise ValueError('invalid file descriptor: {}'.format(fd))
+    return fd
+
+
+def _set_result_unless_cancelled(future, result):
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _is_ip_address(host):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return family
+        except (OSError, ValueError):
+            pass
+    return None
+
+
+class _Poller(object):
+    """
+    Bookkeeping of the reader and writer of a file descriptor watched
+    by :func:`EventLoop.add_reader` and :func:`EventLoop.add_writer`.
+    """
+
+    __slots__ = ['poll', 'reader', 'writer']
+
+    def __init__(self, poll_handle):
+        self.poll = poll_handle
+        self.reader = None
+        self.writer = None
+
+    @property
+    def events(self):
+        events = 0
+        if self.reader is not None:
+            events |= _READ_EVENTS
+        if self.writer is not None:
+            events |= _WRITE_EVENTS
+        return events
+
+
+class EventLoop(asyncio.AbstractEventLoop):
+    """
+    An :mod:`asyncio` event loop driven by a :class:`uv.Loop`.
+
+    :param uv_loop:
+        libuv event loop to run on (a new one is created if not
+        specified and closed together with the event loop, otherwise
+        closing the event loop only closes the handles it has created)
+
+    :type uv_loop:
+        uv.Loop | None
+    """
+
+    slow_callback_duration = 0.1
+
+    def __init__(self, uv_loop=None):
+        self._owns_uv_loop = uv_loop is None
+        self._uv_loop = uv_loop or loop.Loop()
+        self._uv_excepthook_saved = self._uv_loop.excepthook
+        self._uv_loop.excepthook = self._uv_excepthook
+        # handles created by the event loop, others on a shared libuv loop
+        # are left alone when closing
+        self._handles = weakref.WeakSet()
+
+        self._closed = False
+        self._stopping = False
+        self._thread_id = None
+        self._base_exception = None
+        self._debug = bool(os.environ.get('PYTHONASYNCIODEBUG'))
+
+        self._ready = collections.deque()
+        self._idle = self._track(idle.Idle(self._uv_loop, on_idle=self._run_ready))
+        self._idle_active = False
+        self._hook = self._uv_loop.add_iteration_hook(loop.IterationPhases.AFTER_POLL,
+                                                      self._run_ready)
+
+        self._scheduled = []
+        self._timer = self._track(timer.Timer(self._uv_loop,
+                                              on_timeout=self._run_timers))
+        self._timer_deadline = None
+        self._timer_cancelled_count = 0
+
+        # keeps the libuv loop alive until stop is called
+        self._keepalive = self._track(async.Async(self._uv_loop))
+
+        self._pollers = {}
+        self._signal_handlers = {}
+
+        self._exception_handler = None
+        self._task_factory = None
+        self._default_executor = None
+        self._asyncgens = weakref.WeakSet()
+        self._asyncgens_shutdown_called = False
+
+    def __repr__(self):
+        return '<{} running={} closed={} debug={}>'.format(
+            self.__class__.__name__, self.is_running(), self.is_closed(), self._debug)
+
+    @property
+    def uv_loop(self):
+        """
+        The libuv event loop the event loop runs on.
+
+        :readonly:
+            True
+        :rtype:
+            uv.Loop
+        """
+        return self._uv_loop
+
+    # running and stopping
+
+    def _check_closed(self):
+        if self._closed:
+            raise RuntimeError('Event loop is closed')
+
+    def _uv_excepthook(self, uv_loop, exc_type, exc_value, exc_traceback):
+        if not isinstance(exc_value, Exception):
+            # KeyboardInterrupt and SystemExit are re-raised by run_forever
+            self._base_exception = exc_value
+            uv_loop.stop()
+            return
+        self.call_exception_handler({'message': 'Unhandled exception in libuv callback',
+                                     'exception': exc_value})
+
+    def _asyncgen_firstiter_hook(self, agen):
+        self._asyncgens.add(agen)
+
+    def _asyncgen_finalizer_hook(self, agen):
+        self._asyncgens.discard(agen)
+        if not self.is_closed():
+            self.call_soon_threadsafe(self.create_task, agen.aclose())
+
+    def run_forever(self):
+        self._check_closed()
+        if self.is_running():
+            raise RuntimeError('This event loop is already running')
+        if events._get_running_loop() is not None:
+            raise RuntimeError('Cannot run the event loop while another loop is running')
+        self._thread_id = threading.get_ident()
+        asyncgen_hooks = None
+        if hasattr(sys, 'get_asyncgen_hooks'):
+            asyncgen_hooks = sys.get_asyncgen_hooks()
+            sys.set_asyncgen_hooks(firstiter=self._asyncgen_firstiter_hook,
+                                   finalizer=self._asyncgen_finalizer_hook)
+        events._set_running_loop(self)
+        try:
+            self._uv_loop.run()
+            if self._base_exception is not None:
+                exception, self._base_exception = self._base_exception, None
+                raise exception
+        finally:
+            self._stopping = False
+            self._thread_id = None
+            events._set_running_loop(None)
+            if asyncgen_hooks is not None:
+                sys.set_asyncgen_hooks(*asyncgen_hooks)
+
+    def run_until_complete(self, future):
+        self._check_closed()
+        new_task = not futures.isfuture(future)
+        future = tasks.ensure_future(future, loop=self)
+        if new_task:
+            # an exception is raised if the future didn't complete
+            future._log_destroy_pending = False
+
+        def on_done(_):
+            self.stop()
+
+        future.add_done_callback(on_done)
+        try:
+            self.run_forever()
+        except BaseException:
+            if new_task and future.done() and not future.cancelled():
+                # the coroutine raised a BaseException, consume the exception
+                future.exception()
+            raise
+        finally:
+            future.remove_done_callback(on_done)
+        if not future.done():
+            raise RuntimeError('Event loop stopped before Future completed.')
+        return future.result()
+
+    def stop(self):
+        self._stopping = True
+        self._ensure_idle()
+
+    def is_running(self):
+        return self._thread_id is not None
+
+    def is_closed(self):
+        return self._closed
+
+    def close(self):
+        if self.is_running():
+            raise RuntimeError('Cannot close a running event loop')
+        if self._closed:
+            return
+        self._uv_loop.remove_iteration_hook(self._hook)
+        handles = self._uv_loop.handles if self._owns_uv_loop else list(self._handles)
+        for handle in handles:
+            if not handle.closing:
+                handle.close()
+        # run the close callbacks and cancelled requests
+        if self._owns_uv_loop:
+            self._uv_loop.run()
+        else:
+            while any(not handle.closed for handle in handles):
+                self._uv_loop.run(loop.RunModes.NOWAIT)
+        self._uv_loop.excepthook = self._uv_excepthook_saved
+        self._closed = True
+        self._ready.clear()
+        self._scheduled = []
+        self._pollers.clear()
+        self._signal_handlers.clear()
+        if self._owns_uv_loop:
+            self._uv_loop.close()
+        executor = self._default_executor
+        if executor is not None:
+            self._default_executor = None
+            executor.shutdown(wait=False)
+
+    def _track(self, handle):
+        self._handles.add(handle)
+        return handle
+
+    def shutdown_asyncgens(self):
+        self._asyncgens_shutdown_called = True
+        future = self.create_future()
+        closing = list(self._asyncgens)
+        self._asyncgens.clear()
+        if not closing:
+            future.set_result(None)
+            return future
+
+        def on_done(gathered):
+            for result, agen in zip(gathered.result(), closing):
+                if isinstance(result, Exception):
+                    self.call_exception_handler({
+                        'message': 'an error occurred during closing of asynchronous '
+                                   'generator {!r}'.format(agen),
+                        'exception': result,
+                        'asyncgen': agen})
+            future.set_result(None)
+
+        gathered = tasks.gather(*[agen.aclose() for agen in closing],
+                                return_exceptions=True, loop=self)
+        gathered.add_done_callback(on_done)
+        return future
+
+    # callbacks and timers
+
+    def _ensure_idle(self):
+        if not self._idle_active and not self._closed:
+            self._idle_active = True
+            self._idle.start()
+
+    def _run_ready(self, *_):
+        ready = self._ready
+        for _ in range(len(ready)):
+            handle = ready.popleft()
+            if handle._cancelled:
+                continue
+            if self._debug:
+                start = self.time()
+                handle._run()
+                duration = self.time() - start
+                if duration >= self.slow_callback_duration:
+                    logger.warning('Executing %r took %.3f seconds', handle, duration)
+            else:
+                handle._run()
+        if not ready and self._idle_active:
+            self._idle_active = False
+            self._idle.stop()
+        if self._stopping:
+            self._uv_loop.stop()
+
+    def _call_soon(self, callback, args, keywords):
+        handle = events.Handle(callback, args, self, **keywords)
+        self._ready.append(handle)
+        self._ensure_idle()
+        return handle
+
+    def call_soon(self, callback, *args, **keywords):
+        self._check_closed()
+        return self._call_soon(callback, args, keywords)
+
+    def call_soon_threadsafe(self, callback, *args, **keywords):
+        self._check_closed()
+        handle = events.Handle(callback, args, self, **keywords)
+        self._uv_loop.call_later(self._append_ready, handle)
+        return handle
+
+    def _append_ready(self, handle):
+        self._ready.append(handle)
+        self._ensure_idle()
+
+    def time(self):
+        return time.monotonic()
+
+    def call_later(self, delay, callback, *args, **keywords):
+        return self.call_at(self.time() + delay, callback, *args, **keywords)
+
+    def call_at(self, when, callback, *args, **keywords):
+        self._check_closed()
+        handle = events.TimerHandle(when, callback, args, self, **keywords)
+        heapq.heappush(self._scheduled, handle)
+        handle._scheduled = True
+        if self._timer_deadline is None or when < self._timer_deadline:
+            self._arm_timer(when)
+        return handle
+
+    def _arm_timer(self, when):
+        self._timer_deadline = when
+        timeout = max(0, int(math.ceil((when - self.time()) * 1000)))
+        self._timer.start(timeout)
+
+    def _timer_handle_cancelled(self, handle):
+        if handle._scheduled:
+            self._timer_cancelled_count += 1
+            scheduled = len(self._scheduled)
+            if scheduled > 100 and self._timer_cancelled_count * 2 > scheduled:
+                self._scheduled = [handle for handle in self._scheduled
+                                   if not handle._cancelled]
+                heapq.heapify(self._scheduled)
+                for handle in self._scheduled:
+                    handle._scheduled = True
+                self._timer_cancelled_count = 0
+
+    def _run_timers(self, _):
+        scheduled = self._scheduled
+        # the timer fires based on the cached loop time which may lag
+        # slightly behind the monotonic clock, so round up a millisecond
+        end = self.time() + 0.001
+        while scheduled and scheduled[0]._when <= end:
+            handle = heapq.heappop(scheduled)
+            handle._scheduled = False
+            if handle._cancelled:
+                self._timer_cancelled_count -= 1
+            else:
+                self._ready.append(handle)
+        while scheduled and scheduled[0]._cancelled:
+            heapq.heappop(scheduled)._scheduled = False
+            self._timer_cancelled_count -= 1
+        if scheduled:
+            self._arm_timer(scheduled[0]._when)
+        else:
+            self._timer_deadline = None
+        self._run_ready()
+
+    # futures and tasks
+
+    def create_future(self):
+        return futures.Future(loop=self)
+
+    def create_task(self, coro, **keywords):
+        self._check_closed()
+        if self._task_factory is None:
+            return tasks.Task(coro, loop=self, **keywords)
+        return self._task_factory(self, coro)
+
+    def set_task_factory(self, factory):
+        if factory is not None and not callable(factory):
+            raise TypeError('task factory must be a callable or None')
+        self._task_factory = factory
+
+    def get_task_factory(self):
+        return self._task_factory
+
+    # executor
+
+    def run_in_executor(self, executor, func, *args):
+        self._check_closed()
+        if executor is None:
+            executor = self._default_executor
+            if executor is None:
+                executor = concurrent.futures.ThreadPoolExecutor()
+                self._default_executor = executor
+        return futures.wrap_future(executor.submit(func, *args), loop=self)
+
+    def set_default_executor(self, executor):
+        self._default_executor = executor
+
+    # name resolution
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        future = self.create_future()
+        if host is None:
+            # nothing to resolve, a passive or loopback address is requested
+            try:
+                future.set_result(socket.getaddrinfo(host, port, family, type,
+                                                     proto, flags))
+            except OSError as exception:
+                future.set_exception(exception)
+            return future
+        if isinstance(host, bytes):
+            host = host.decode('idna')
+        if isinstance(port, bytes):
+            port = port.decode()
+
+        def on_addrinfo(request, status, addrinfo):
+            if future.cancelled():
+                return
+            if status != error.StatusCodes.SUCCESS:
+                future.set_exception(error.UVError(status))
+            else:
+                future.set_result([(info.family, info.socktype, info.protocol,
+                                    info.canonname, tuple(info.address))
+                                   for info in addrinfo])
+
+        try:
+            dns.getaddrinfo(host, port or 0, family, type, proto, flags,
+                            callback=on_addrinfo, loop=self._uv_loop)
+        except error.UVError as exception:
+            future.set_exception(exception)
+        return future
+
+    def getnameinfo(self, sockaddr, flags=0):
+        future = self.create_future()
+
+        def on_nameinfo(request, status, hostname, service):
+            if future.cancelled():
+                return
+            if status != error.StatusCodes.SUCCESS:
+                future.set_exception(error.UVError(status))
+            else:
+                future.set_result((hostname, service))
+
+        try:
+            dns.getnameinfo(sockaddr[0], sockaddr[1], flags, callback=on_nameinfo,
+                            loop=self._uv_loop)
+        except error.UVError as exception:
+            future.set_exception(exception)
+        return future
+
+    def _resolve(self, address, family, type, proto, flags, callback):
+        """
+        Resolve `address` and call `callback` with a future of the list
+        of address information. IP literals are resolved immediately
+        without a round trip through the thread pool.
+        """
+        host, port = address[:2]
+        literal_family = _is_ip_address(host) if host else None
+        if literal_family is not None and family in (0, literal_family):
+            future = self.create_future()
+            if literal_family == socket.AF_INET6:
+                sockaddr = (host, port) + tuple(address[2:4]) + (0, 0)[len(address[2:4]):]
+            else:
+                sockaddr = (host, port)
+            future.set_result([(literal_family, type, proto, '', sockaddr)])
+        else:
+            future = self.getaddrinfo(host, port, family=family, type=type,
+                                      proto=proto, flags=flags)
+        future.add_done_callback(callback)
+
+    # file descriptor watching
+
+    def _get_poller(self, fd):
+        poller = self._pollers.get(fd)
+        if poller is None:
+            poll_handle = self._track(poll.Poll(fd, self._uv_loop,
+                                                on_event=self._on_poll_event))
+            poller = self._pollers[fd] = _Poller(poll_handle)
+        return poller
+
+    def _update_poller(self, fd, poller):
+        events = poller.events
+        if events:
+            poller.poll.start(events)
+        else:
+            poller.poll.close()
+            del self._pollers[fd]
+
+    def _on_poll_event(self, poll_handle, status, events):
+        poller = self._pollers.get(poll_handle.fd)
+        if poller is None:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            # let the callbacks discover the error when accessing the fd
+            events = _READ_EVENTS | _WRITE_EVENTS
+        if events & _READ_EVENTS and poller.reader is not None:
+            if poller.reader._cancelled:
+                self.remove_reader(poll_handle.fd)
+            else:
+                self._ready.append(poller.reader)
+        if events & _WRITE_EVENTS and poller.writer is not None:
+            if poller.writer._cancelled:
+                self.remove_writer(poll_handle.fd)
+            else:
+                self._ready.append(poller.writer)
+        self._ensure_idle()
+
+    def add_reader(self, fd, callback, *args):
+        self._check_closed()
+        fd = _fileobj_to_fd(fd)
+        poller = self._get_poller(fd)
+        if poller.reader is not None:
+            poller.reader.cancel()
+        poller.reader = events.Handle(callback, args, self)
+        self._update_poller(fd, poller)
+
+    def remove_reader(self, fd):
+        if self._closed:
+            return False
+        fd = _fileobj_to_fd(fd)
+        poller = self._pollers.get(fd)
+        if poller is None or poller.reader is None:
+            return False
+        poller.reader.cancel()
+        poller.reader = None
+        self._update_poller(fd, poller)
+        return True
+
+    def add_writer(self, fd, callback, *args):
+        self._check_closed()
+        fd = _fileobj_to_fd(fd)
+        poller = self._get_poller(fd)
+        if poller.writer is not None:
+            poller.writer.cancel()
+        poller.writer = events.Handle(callback, args, self)
+        self._update_poller(fd, poller)
+
+    def remove_writer(self, fd):
+        if self._closed:
+            return False
+        fd = _fileobj_to_fd(fd)
+        poller = self._pollers.get(fd)
+        if poller is None or poller.writer is None:
+            return False
+        poller.writer.cancel()
+        poller.writer = None
+        self._update_poller(fd, poller)
+        return True
+
+    # low level socket operations
+
+    def sock_recv(self, sock, nbytes):
+        future = self.create_future()
+        self._sock_recv(future, None, sock, nbytes)
+        return future
+
+    def _sock_recv(self, future, registered_fd, sock, nbytes):
+        if registered_fd is not None:
+            self.remove_reader(registered_fd)
+        if future.cancelled():
+            return
+        try:
+            data = sock.recv(nbytes)
+        except (BlockingIOError, InterruptedError):
+            fd = sock.fileno()
+            self.add_reader(fd, self._sock_recv, future, fd, sock, nbytes)
+        except Exception as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result(data)
+
+    def sock_recv_into(self, sock, buffer):
+        future = self.create_future()
+        self._sock_recv_into(future, None, sock, buffer)
+        return future
+
+    def _sock_recv_into(self, future, registered_fd, sock, buffer):
+        if registered_fd is not None:
+            self.remove_reader(registered_fd)
+        if future.cancelled():
+            return
+        try:
+            length = sock.recv_into(buffer)
+        except (BlockingIOError, InterruptedError):
+            fd = sock.fileno()
+            self.add_reader(fd, self._sock_recv_into, future, fd, sock, buffer)
+        except Exception as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result(length)
+
+    def sock_sendall(self, sock, data):
+        future = self.create_future()
+        self._sock_sendall(future, None, sock, memoryview(data))
+        return future
+
+    def _sock_sendall(self, future, registered_fd, sock, data):
+        if registered_fd is not None:
+            self.remove_writer(registered_fd)
+        if future.cancelled():
+            return
+        try:
+            sent = sock.send(data)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except Exception as exception:
+            future.set_exception(exception)
+            return
+        if sent == len(data):
+            future.set_result(None)
+        else:
+            fd = sock.fileno()
+            self.add_writer(fd, self._sock_sendall, future, fd, sock, data[sent:])
+
+    def sock_connect(self, sock, address):
+        future = self.create_future()
+        try:
+            sock.connect(address)
+        except (BlockingIOError, InterruptedError):
+            fd = sock.fileno()
+            self.add_writer(fd, self._sock_connect_done, future, fd, sock, address)
+        except Exception as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result(None)
+        return future
+
+    def _sock_connect_done(self, future, fd, sock, address):
+        self.remove_writer(fd)
+        if future.cancelled():
+            return
+        try:
+            code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if code != 0:
+                raise OSError(code, 'Connect call failed {}'.format(address))
+        except (BlockingIOError, InterruptedError):
+            self.add_writer(fd, self._sock_connect_done, future, fd, sock, address)
+        except Exception as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result(None)
+
+    def sock_accept(self, sock):
+        future = self.create_future()
+        self._sock_accept(future, None, sock)
+        return future
+
+    def _sock_accept(self, future, registered_fd, sock):
+        if registered_fd is not None:
+            self.remove_reader(registered_fd)
+        if future.cancelled():
+            return
+        try:
+            connection, address = sock.accept()
+            connection.setblocking(False)
+        except (BlockingIOError, InterruptedError):
+            fd = sock.fileno()
+            self.add_reader(fd, self._sock_accept, future, fd, sock)
+        except Exception as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result((connection, address))
+
+    # stream transports
+
+    def _make_transport(self, stream, protocol_factory, future, extra=None, server=None):
+        try:
+            protocol = protocol_factory()
+        except Exception as exception:
+            stream.close()
+            future.set_exception(exception)
+            return
+        waiter = self.create_future()
+        transport = _StreamTransport(self, stream, protocol, waiter, extra, server)
+
+        def on_made(_):
+            if future.cancelled():
+                transport.close()
+            else:
+                future.set_result((transport, protocol))
+
+        waiter.add_done_callback(on_made)
+
+    def create_connection(self, protocol_factory, host=None, port=None, ssl=None,
+                          family=0, proto=0, flags=0, sock=None, local_addr=None,
+                          server_hostname=None, **keywords):
+        self._check_closed()
+        if ssl:
+            raise NotImplementedError('uv.aio does not support SSL transports')
+        if server_hostname is not None:
+            raise ValueError('server_hostname is only meaningful with ssl')
+        future = self.create_future()
+        if sock is not None:
+            if host is not None or port is not None:
+                raise ValueError('host/port and sock can not be specified at the '
+                                 'same time')
+            stream = self._track(tcp.TCP(loop=self._uv_loop))
+            stream.open(sock.detach())
+            stream.set_nodelay(True)
+            self._make_transport(stream, protocol_factory, future)
+            return future
+        if host is None and port is None:
+            raise ValueError('host and port was not specified and no sock specified')
+
+        def on_resolved(resolved):
+            if future.cancelled():
+                return
+            if resolved.exception() is not None:
+                future.set_exception(resolved.exception())
+                return
+            addresses = [info[4] for info in resolved.result()]
+            if not addresses:
+                future.set_exception(OSError('getaddrinfo() returned empty list'))
+            else:
+                self._connect_next(future, protocol_factory, addresses, local_addr, [])
+
+        self._resolve((host, port), family, socket.SOCK_STREAM, proto, flags, on_resolved)
+        return future
+
+    def _connect_next(self, future, protocol_factory, addresses, local_addr, exceptions):
+        if future.cancelled():
+            return
+        if not addresses:
+            if len(exceptions) == 1:
+                future.set_exception(exceptions[0])
+            else:
+                model = str(exceptions[0])
+                if all(str(exception) == model for exception in exceptions):
+                    future.set_exception(exceptions[0])
+                else:
+                    message = ', '.join(str(exception) for exception in exceptions)
+                    future.set_exception(OSError('Multiple exceptions: ' + message))
+            return
+        address = addresses.pop(0)
+        stream = self._track(tcp.TCP(loop=self._uv_loop))
+
+        def on_connect(request, status):
+            if status != error.StatusCodes.SUCCESS:
+                stream.close()
+                exceptions.append(error.UVError(status))
+                self._connect_next(future, protocol_factory, addresses, local_addr,
+                                   exceptions)
+            elif future.cancelled():
+                stream.close()
+            else:
+                stream.set_nodelay(True)
+                self._make_transport(stream, protocol_factory, future)
+
+        try:
+            if local_addr is not None:
+                stream.bind(local_addr)
+            stream.connect(address, on_connect=on_connect)
+        except error.UVError as exception:
+            stream.close()
+            exceptions.append(exception)
+            self._connect_next(future, protocol_factory, addresses, local_addr,
+                               exceptions)
+
+    def connect_accepted_socket(self, protocol_factory, sock, ssl=None, **keywords):
+        self._check_closed()
+        if ssl:
+            raise NotImplementedError('uv.aio does not support SSL transports')
+        future = self.create_future()
+        if sock.family == socket.AF_UNIX:
+            stream = self._track(pipe.Pipe(loop=self._uv_loop))
+        else:
+            stream = self._track(tcp.TCP(loop=self._uv_loop))
+        stream.open(sock.detach())
+        self._make_transport(stream, protocol_factory, future)
+        return future
+
+    def create_server(self, protocol_factory, host=None, port=None,
+                      family=socket.AF_UNSPEC, flags=socket.AI_PASSIVE, sock=None,
+                      backlog=100, ssl=None, reuse_address=None, reuse_port=None,
+                      **keywords):
+        self._check_closed()
+        if ssl:
+            raise NotImplementedError('uv.aio does not support SSL transports')
+        future = self.create_future()
+        server = Server(self, protocol_factory)
+        if sock is not None:
+            if host is not None or port is not None:
+                raise ValueError('host/port and sock can not be specified at the '
+                                 'same time')
+            server._listen_socket(sock, backlog)
+            future.set_result(server)
+            return future
+
+        hosts = [host] if isinstance(host, str) or host is None else list(host)
+
+        def on_resolved(resolved):
+            if future.cancelled():
+                return
+            if resolved.exception() is not None:
+                server.close()
+                future.set_exception(resolved.exception())
+                return
+            addresses = set()
+            for info in resolved.result():
+                addresses.add((info[0], info[4]))
+            for info_family, address in sorted(addresses):
+                try:
+                    server._listen_address(info_family, address, backlog, reuse_address,
+                                           reuse_port)
+                except OSError as exception:
+                    server.close()
+                    future.set_exception(exception)
+                    return
+            if not future.done():
+                future.set_result(server)
+
+        remaining = [len(hosts)]
+        results = []
+
+        def on_host(resolved):
+            remaining[0] -= 1
+            if resolved.exception() is not None:
+                results[:] = [resolved]
+            elif not results or results[0].exception() is None:
+                results.append(resolved)
+            if remaining[0]:
+                return
+            if results and results[0].exception() is not None:
+                on_resolved(results[0])
+            else:
+                combined = self.create_future()
+                combined.set_result([info for result in results
+                                     for info in result.result()])
+                on_resolved(combined)
+
+        for host in hosts:
+            if host == '':
+                host = None
+            if host is None:
+                resolved = self.getaddrinfo(None, port, family=family,
+                                            type=socket.SOCK_STREAM, flags=flags)
+                resolved.add_done_callback(on_host)
+            else:
+                self._resolve((host, port), family, socket.SOCK_STREAM, 0, flags,
+                              on_host)
+        return future
+
+    def create_unix_connection(self, protocol_factory, path=None, ssl=None, sock=None,
+                               server_hostname=None, **keywords):
+        self._check_closed()
+        if ssl:
+            raise NotImplementedError('uv.aio does not support SSL transports')
+        future = self.create_future()
+        stream = self._track(pipe.Pipe(loop=self._uv_loop))
+        if sock is not None:
+            if path is not None:
+                raise ValueError('path and sock can not be specified at the same time')
+            stream.open(sock.detach())
+            self._make_transport(stream, protocol_factory, future)
+            return future
+        if path is None:
+            raise ValueError('no path and sock were specified')
+
+        def on_connect(request, status):
+            if status != error.StatusCodes.SUCCESS:
+                stream.close()
+                if not future.cancelled():
+                    future.set_exception(error.UVError(status))
+            elif future.cancelled():
+                stream.close()
+            else:
+                self._make_transport(stream, protocol_factory, future)
+
+        stream.connect(os.fspath(path) if hasattr(os, 'fspath') else path,
+                       on_connect=on_connect)
+        return future
+
+    def create_unix_server(self, protocol_factory, path=None, sock=None, backlog=100,
+                           ssl=None, **keywords):
+        self._check_closed()
+        if ssl:
+            raise NotImplementedError('uv.aio does not support SSL transports')
+        future = self.create_future()
+        server = Server(self, protocol_factory)
+        try:
+            if sock is not None:
+                if path is not None:
+                    raise ValueError('path and sock can not be specified at the '
+                                     'same time')
+                server._listen_socket(sock, backlog)
+            elif path is None:
+                raise ValueError('path was not specified, and no sock specified')
+            else:
+                stream = self._track(pipe.Pipe(loop=self._uv_loop))
+                server._handles.append(stream)
+                stream.bind(os.fspath(path) if hasattr(os, 'fspath') else path)
+                stream.listen(backlog, on_connection=server._on_connection)
+        except Exception as exception:
+            server.close()
+            future.set_exception(exception)
+        else:
+            future.set_result(server)
+        return future
+
+    def connect_read_pipe(self, protocol_factory, pipe_object):
+        return self._connect_pipe(protocol_factory, pipe_object)
+
+    def connect_write_pipe(self, protocol_factory, pipe_object):
+        return self._connect_pipe(protocol_factory, pipe_object)
+
+    def _connect_pipe(self, protocol_factory, pipe_object):
+        self._check_closed()
+        future = self.create_future()
+        stream = self._track(pipe.Pipe(loop=self._uv_loop))
+        # the pipe object is closed when the transport is closed
+        stream.open(os.dup(pipe_object.fileno()))
+        self._make_transport(stream, protocol_factory, future, {'pipe': pipe_object})
+        return future
+
+    # datagram transports
+
+    def create_datagram_endpoint(self, protocol_factory, local_addr=None,
+                                 remote_addr=None, family=0, proto=0, flags=0,
+                                 reuse_address=None, reuse_port=None,
+                                 allow_broadcast=None, sock=None, **keywords):
+        self._check_closed()
+        future = self.create_future()
+        if sock is not None:
+            if local_addr or remote_addr or family or proto or flags:
+                raise ValueError('socket modifier keyword arguments can not be used '
+                                 'when sock is specified')
+            handle = self._track(udp.UDP(loop=self._uv_loop))
+            handle.open(sock.detach())
+            self._make_datagram_transport(handle, protocol_factory, None, future)
+            return future
+
+        addresses = {}
+
+        def on_done():
+            if future.cancelled():
+                return
+            handle = self._track(udp.UDP(loop=self._uv_loop))
+            try:
+                local = addresses.get('local')
+                remote = addresses.get('remote')
+                if local is None:
+                    if remote is not None and remote[0] == socket.AF_INET6:
+                        local = (socket.AF_INET6, ('::', 0))
+                    else:
+                        local = (socket.AF_INET, ('0.0.0.0', 0))
+                if reuse_port:
+                    raw = socket.socket(local[0], socket.SOCK_DGRAM)
+                    raw.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                    raw.bind(local[1])
+                    handle.open(raw.detach())
+                else:
+                    handle.bind(local[1], udp.UDPFlags.REUSEADDR if reuse_address else 0)
+                if allow_broadcast:
+                    handle.set_broadcast(True)
+            except Exception as exception:
+                handle.close()
+                future.set_exception(exception)
+                return
+            remote = addresses.get('remote')
+            self._make_datagram_transport(handle, protocol_factory,
+                                          remote and remote[1], future)
+
+        pending = [(name, address) for name, address in (('local', local_addr),
+                                                        ('remote', remote_addr))
+                   if address is not None]
+        if not pending:
+            on_done()
+            return future
+        remaining = [len(pending)]
+
+        def make_callback(name):
+            def on_resolved(resolved):
+                if future.done():
+                    return
+                if resolved.exception() is not None:
+                    future.set_exception(resolved.exception())
+                    return
+                infos = resolved.result()
+                if not infos:
+                    future.set_exception(OSError('getaddrinfo() returned empty list'))
+                    return
+                addresses[name] = (infos[0][0], infos[0][4])
+                remaining[0] -= 1
+                if not remaining[0]:
+                    on_done()
+            return on_resolved
+
+        for name, address in pending:
+            self._resolve(address, family, socket.SOCK_DGRAM, proto, flags,
+                          make_callback(name))
+        return future
+
+    def _make_datagram_transport(self, handle, protocol_factory, address, future):
+        try:
+            protocol = protocol_factory()
+        except Exception as exception:
+            handle.close()
+            future.set_exception(exception)
+            return
+        waiter = self.create_future()
+        transport = _DatagramTransport(self, handle, protocol, address, waiter)
+
+        def on_made(_):
+            if future.cancelled():
+                transport.close()
+            else:
+                future.set_result((transport, protocol))
+
+        waiter.add_done_callback(on_made)
+
+    # subprocesses
+
+    def subprocess_exec(self, protocol_factory, program, *args, **keywords):
+        self._check_closed()
+        stdin = keywords.pop('stdin', subprocess.PIPE)
+        stdout = keywords.pop('stdout', subprocess.PIPE)
+        stderr = keywords.pop('stderr', subprocess.PIPE)
+        if keywords.pop('universal_newlines', False):
+            raise ValueError('universal_newlines must be False')
+        if keywords.pop('shell', False):
+            raise ValueError('shell must be False')
+        if keywords.pop('bufsize', 0) != 0:
+            raise ValueError('bufsize must be 0')
+        arguments = [os.fsdecode(argument) for argument in (program, ) + args]
+        return self._subprocess(protocol_factory, arguments, stdin, stdout, stderr,
+                                keywords)
+
+    def subprocess_shell(self, protocol_factory, cmd, **keywords):
+        self._check_closed()
+        stdin = keywords.pop('stdin', subprocess.PIPE)
+        stdout = keywords.pop('stdout', subprocess.PIPE)
+        stderr = keywords.pop('stderr', subprocess.PIPE)
+        if keywords.pop('universal_newlines', False):
+            raise ValueError('universal_newlines must be False')
+        if not keywords.pop('shell', True):
+            raise ValueError('shell must be True')
+        if keywords.pop('bufsize', 0) != 0:
+            raise ValueError('bufsize must be 0')
+        if sys.platform == 'win32':
+            arguments = [os.environ.get('COMSPEC', 'cmd.exe'), '/c', os.fsdecode(cmd)]
+        else:
+            arguments = ['/bin/sh', '-c', os.fsdecode(cmd)]
+        return self._subprocess(protocol_factory, arguments, stdin, stdout, stderr,
+                                keywords)
+
+    def _subprocess(self, protocol_factory, arguments, stdin, stdout, stderr, keywords):
+        future = self.create_future()
+        protocol = protocol_factory()
+        waiter = self.create_future()
+        transport = _SubprocessTransport(self, protocol, arguments, stdin, stdout,
+                                         stderr, waiter, keywords)
+
+        def on_made(_):
+            if future.cancelled():
+                transport.close()
+            else:
+                future.set_result((transport, protocol))
+
+        waiter.add_done_callback(on_made)
+        return future
+
+    # signals
+
+    def add_signal_handler(self, sig, callback, *args):
+        self._check_closed()
+        if not isinstance(sig, int):
+            raise TypeError('sig must be an int, not {!r}'.format(sig))
+        if not (1 <= sig < signal.NSIG):
+            raise ValueError('sig {} out of range(1, {})'.format(sig, signal.NSIG))
+        self.remove_signal_handler(sig)
+        handle = events.Handle(callback, args, self)
+
+        def on_signal(signal_handle, signum):
+            if not handle._cancelled:
+                self._append_ready(handle)
+
+        signal_handle = self._track(uv_signal.Signal(self._uv_loop))
+        try:
+            signal_handle.start(sig, on_signal=on_signal)
+        except error.UVError:
+            signal_handle.close()
+            raise RuntimeError('sig {} cannot be caught'.format(sig))
+        self._signal_handlers[sig] = signal_handle, handle
+
+    def remove_signal_handler(self, sig):
+        entry = self._signal_handlers.pop(sig, None)
+        if entry is None:
+            return False
+        signal_handle, handle = entry
+        handle.cancel()
+        signal_handle.close()
+        return True
+
+    # error handlers
+
+    def get_exception_handler(self):
+        return self._exception_handler
+
+    def set_exception_handler(self, handler):
+        if handler is not None and not callable(handler):
+            raise TypeError('A callable object or None is expected, '
+                            'got {!r}'.format(handler))
+        self._exception_handler = handler
+
+    def default_exception_handler(self, context):
+        message = context.get('message') or 'Unhandled exception in event loop'
+        exception = context.get('exception')
+        if exception is not None:
+            exc_info = (type(exception), exception, exception.__traceback__)
+        else:
+            exc_info = False
+        lines = [message]
+        for key in sorted(context):
+            if key not in ('message', 'exception'):
+                lines.append('{}: {!r}'.format(key, context[key]))
+        logger.error('\n'.join(lines), exc_info=exc_info)
+
+    def call_exception_handler(self, context):
+        if self._exception_handler is None:
+            try:
+                self.default_exception_handler(context)
+            except Exception:
+                logger.error('Exception in default exception handler', exc_info=True)
+            return
+        try:
+            self._exception_handler(self, context)
+        except Exception as exception:
+            try:
+                self.default_exception_handler({
+                    'message': 'Unhandled error in exception handler',
+                    'exception': exception,
+                    'context': context})
+            except Exception:
+                logger.error('Exception in default exception handler while handling '
+                             'an unexpected error in custom exception handler',
+                             exc_info=True)
+
+    # debug flag
+
+    def get_debug(self):
+        return self._debug
+
+    def set_debug(self, enabled):
+        self._debug = enabled
+
+
+class Server(events.AbstractServer):
+    """
+    Listening server returned by :func:`EventLoop.create_server` and
+    :func:`EventLoop.create_unix_server`.
+    """
+
+    def __init__(self, event_loop, protocol_factory):
+        self._loop = event_loop
+        self._protocol_factory = protocol_factory
+        self._handles = []
+        self._sockets = None
+        self._active_count = 0
+        self._waiters = []
+
+    def __repr__(self):
+        return '<{} sockets={!r}>'.format(self.__class__.__name__, self.sockets)
+
+    def _listen_address(self, family, address, backlog, reuse_address=None,
+                        reuse_port=False):
+        stream = self._loop._track(tcp.TCP(loop=self._loop._uv_loop))
+        self._handles.append(stream)
+        if reuse_address is not None or reuse_port:
+            # libuv decides on SO_REUSEADDR itself when binding
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                if reuse_address:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                if reuse_port:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                if family == socket.AF_INET6:
+                    sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+                sock.bind(address)
+            except OSError:
+                sock.close()
+                raise
+            stream.open(sock.detach())
+        else:
+            flags = tcp.TCPFlags.IPV6ONLY if family == socket.AF_INET6 else 0
+            stream.bind(address, flags)
+        stream.listen(backlog, on_connection=self._on_connection)
+
+    def _listen_socket(self, sock, backlog):
+        if sock.family == socket.AF_UNIX:
+            stream = self._loop._track(pipe.Pipe(loop=self._loop._uv_loop))
+        else:
+            stream = self._loop._track(tcp.TCP(loop=self._loop._uv_loop))
+        self._handles.append(stream)
+        stream.open(sock.detach())
+        stream.listen(backlog, on_connection=self._on_connection)
+
+    def _on_connection(self, stream, status):
+        if status != error.StatusCodes.SUCCESS:
+            self._loop.call_exception_handler({
+                'message': 'Error on listening socket',
+                'exception': error.UVError(status),
+                'server': self})
+            return
+        connection = self._loop._track(stream.accept(loop=self._loop._uv_loop))
+        if isinstance(connection, tcp.TCP):
+            connection.set_nodelay(True)
+        try:
+            protocol = self._protocol_factory()
+        except Exception as exception:
+            connection.close()
+            self._loop.call_exception_handler({
+                'message': 'Error creating protocol for accepted connection',
+                'exception': exception,
+                'server': self})
+            return
+        _StreamTransport(self._loop, connection, protocol, server=self)
+
+    def _attach(self):
+        self._active_count += 1
+
+    def _detach(self):
+        self._active_count -= 1
+        if self._active_count == 0 and self._handles is None:
+            self._wakeup()
+
+    def _wakeup(self):
+        waiters, self._waiters = self._waiters, None
+        for waiter in waiters or ():
+            if not waiter.done():
+                waiter.set_result(None)
+
+    @property
+    def sockets(self):
+        if self._handles is None:
+            return []
+        if self._sockets is None:
+            # duplicates of the listening sockets, closed with the server
+            self._sockets = []
+            for stream in self._handles:
+                if isinstance(stream, pipe.Pipe):
+                    family = socket.AF_UNIX
+                else:
+                    family = stream.family
+                self._sockets.append(socket.fromfd(stream.fileno(), family,
+                                                   socket.SOCK_STREAM))
+        return list(self._sockets)
+
+    def get_loop(self):
+        return self._loop
+
+    def is_serving(self):
+        return self._handles is not None
+
+    def close(self):
+        handles = self._handles
+        if handles is None:
+            return
+        self._handles = None
+        for stream in handles:
+            stream.close()
+        for sock in self._sockets or ():
+            sock.close()
+        self._sockets = None
+        if self._active_count == 0:
+            self._wakeup()
+
+    def wait_closed(self):
+        waiter = self._loop.create_future()
+        if self._waiters is None:
+            waiter.set_result(None)
+        else:
+            self._waiters.append(waiter)
+        return waiter
+
+
+class _StreamTransport(transports._FlowControlMixin, transports.Transport):
+    """
+    Transport over a :class:`uv.Stream`. Writes are first tried
+    synchronously with :func:`uv.Stream.try_write`, only the remainder
+    is queued as a write request and counts as buffered.
+    """
+
+    def __init__(self, event_loop, stream, protocol, waiter=None, extra=None,
+                 server=None):
+        super(_StreamTransport, self).__init__(extra, event_loop)
+        self._stream = stream
+        self._protocol = protocol
+        self._server = server
+        self._buffer_size = 0
+        self._closing = False
+        self._eof = False
+        self._reading = False
+        self._conn_lost = 0
+        if server is not None:
+            server._attach()
+        stream.on_read = self._on_read
+        event_loop._call_soon(self._protocol.connection_made, (self, ), {})
+        event_loop._call_soon(self._start_reading, (), {})
+        if waiter is not None:
+            event_loop._call_soon(_set_result_unless_cancelled, (waiter, None), {})
+
+    def __repr__(self):
+        return '<{} stream={!r} buffer_size={}>'.format(
+            self.__class__.__name__, self._stream, self._buffer_size)
+
+    def get_extra_info(self, name, default=None):
+        if name not in self._extra and name in ('sockname', 'peername', 'socket'):
+            try:
+                if name == 'socket':
+                    if isinstance(self._stream, pipe.Pipe):
+                        family = socket.AF_UNIX
+                    else:
+                        family = self._stream.family
+                    value = socket.fromfd(self._stream.fileno(), family,
+                                          socket.SOCK_STREAM)
+                else:
+                    value = getattr(self._stream, name)
+            except (error.UVError, AttributeError, OSError):
+                value = None
+            self._extra[name] = value
+        value = self._extra.get(name)
+        return default if value is None else value
+
+    def _start_reading(self):
+        if not self._closing and not self._reading and self._stream.readable:
+            self._reading = True
+            self._stream.read_start()
+
+    def _on_read(self, stream, status, data):
+        if status == error.StatusCodes.SUCCESS:
+            if data:
+                try:
+                    self._protocol.data_received(data)
+                except Exception as exception:
+                    self._fatal_error(exception, 'Fatal error: protocol.data_received() '
+                                                 'call failed.')
+        elif status == error.StatusCodes.EOF:
+            self.pause_reading()
+            try:
+                keep_open = self._protocol.eof_received()
+            except Exception as exception:
+                self._fatal_error(exception, 'Fatal error: protocol.eof_received() '
+                                             'call failed.')
+                return
+            if not keep_open:
+                self.close()
+        else:
+            self._fatal_error(error.UVError(status), 'Fatal read error on stream '
+                                                     'transport')
+
+    def is_reading(self):
+        return self._reading
+
+    def pause_reading(self):
+        if self._reading and not self._conn_lost:
+            self._reading = False
+            self._stream.read_stop()
+
+    def resume_reading(self):
+        if not self._closing:
+            self._start_reading()
+
+    def set_protocol(self, protocol):
+        self._protocol = protocol
+
+    def get_protocol(self):
+        return self._protocol
+
+    def is_closing(self):
+        return self._closing
+
+    def get_write_buffer_size(self):
+        return self._buffer_size
+
+    def can_write_eof(self):
+        return True
+
+    def write(self, data):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('data argument must be a bytes-like object, '
+                            'not {!r}'.format(type(data).__name__))
+        if self._eof:
+            raise RuntimeError('Cannot call write() after write_eof()')
+        if not data or self._conn_lost:
+            return
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        if not self._buffer_size:
+            try:
+                written = self._stream.try_write(data)
+            except error.TemporaryUnavailableError:
+                written = 0
+            except error.UVError as exception:
+                self._fatal_error(exception, 'Fatal write error on stream transport')
+                return
+            if written == len(data):
+                return
+            data = data[written:]
+        self._buffer_size += len(data)
+        self._stream.write(data, on_write=functools.partial(self._on_write, len(data)))
+        self._maybe_pause_protocol()
+
+    def writelines(self, list_of_data):
+        self.write(b''.join(list_of_data))
+
+    def _on_write(self, size, request, status):
+        self._buffer_size -= size
+        if self._conn_lost:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            self._fatal_error(error.UVError(status), 'Fatal write error on stream '
+                                                     'transport')
+            return
+        self._maybe_resume_protocol()
+        if not self._buffer_size and self._closing:
+            self._conn_lost += 1
+            self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def write_eof(self):
+        if self._closing or self._eof:
+            return
+        self._eof = True
+        # libuv shuts the stream down after all pending writes completed
+        self._stream.shutdown()
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        self.pause_reading()
+        if not self._buffer_size:
+            self._conn_lost += 1
+            self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def abort(self):
+        self._force_close(None)
+
+    def _fatal_error(self, exception, message):
+        if isinstance(exception, _FATAL_ERROR_IGNORE):
+            if self._loop.get_debug():
+                logger.debug('%r: %s', self, message, exc_info=True)
+        else:
+            self._loop.call_exception_handler({'message': message,
+                                               'exception': exception,
+                                               'transport': self,
+                                               'protocol': self._protocol})
+        self._force_close(exception)
+
+    def _force_close(self, exception):
+        if self._conn_lost:
+            return
+        self._closing = True
+        self.pause_reading()
+        self._conn_lost += 1
+        self._loop._call_soon(self._call_connection_lost, (exception, ), {})
+
+    def _call_connection_lost(self, exception):
+        try:
+            self._protocol.connection_lost(exception)
+        finally:
+            self._stream.close()
+            pipe_object = self._extra.get('pipe')
+            if pipe_object is not None:
+                pipe_object.close()
+            self._protocol = None
+            server, self._server = self._server, None
+            if server is not None:
+                server._detach()
+
+
+class _DatagramTransport(transports._FlowControlMixin, transports.DatagramTransport):
+    """
+    Transport over a :class:`uv.UDP` handle. If a remote address is
+    given, datagrams from other peers are dropped.
+    """
+
+    def __init__(self, event_loop, handle, protocol, address=None, waiter=None):
+        super(_DatagramTransport, self).__init__(None, event_loop)
+        self._handle = handle
+        self._protocol = protocol
+        self._address = address
+        self._buffer_size = 0
+        self._closing = False
+        self._conn_lost = 0
+        event_loop._call_soon(self._protocol.connection_made, (self, ), {})
+        event_loop._call_soon(self._handle.receive_start, (self._on_receive, ), {})
+        if waiter is not None:
+            event_loop._call_soon(_set_result_unless_cancelled, (waiter, None), {})
+
+    def get_extra_info(self, name, default=None):
+        if name not in self._extra and name in ('sockname', 'peername', 'socket'):
+            try:
+                if name == 'sockname':
+                    value = self._handle.sockname
+                elif name == 'peername':
+                    value = self._address
+                else:
+                    value = socket.fromfd(self._handle.fileno(), self._handle.family,
+                                          socket.SOCK_DGRAM)
+            except (error.UVError, OSError):
+                value = None
+            self._extra[name] = value
+        value = self._extra.get(name)
+        return default if value is None else value
+
+    def _on_receive(self, handle, status, address, data, flags):
+        if self._conn_lost:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            self._protocol.error_received(error.UVError(status))
+        elif address is not None:
+            if self._address is not None and address[:2] != self._address[:2]:
+                return
+            self._protocol.datagram_received(data, address)
+
+    def is_closing(self):
+        return self._closing
+
+    def get_write_buffer_size(self):
+        return self._buffer_size
+
+    def sendto(self, data, addr=None):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('data argument must be a bytes-like object, '
+                            'not {!r}'.format(type(data).__name__))
+        if self._address is not None:
+            if addr not in (None, self._address):
+                raise ValueError('Invalid address: must be None or '
+                                 '{}'.format(self._address))
+            addr = self._address
+        if addr is None:
+            raise ValueError('Invalid address: must not be None if not connected')
+        if self._conn_lost:
+            return
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        if not self._buffer_size:
+            try:
+                self._handle.try_send(data, addr)
+                return
+            except error.TemporaryUnavailableError:
+                pass
+            except error.UVError as exception:
+                self._protocol.error_received(exception)
+                return
+        self._buffer_size += len(data)
+        self._handle.send(data, addr, on_send=functools.partial(self._on_send, len(data)))
+        self._maybe_pause_protocol()
+
+    def _on_send(self, size, request, status):
+        self._buffer_size -= size
+        if self._conn_lost:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            self._protocol.error_received(error.UVError(status))
+        self._maybe_resume_protocol()
+        if not self._buffer_size and self._closing:
+            self._conn_lost += 1
+            self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        if not self._buffer_size:
+            self._conn_lost += 1
+            self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def abort(self):
+        if self._conn_lost:
+            return
+        self._closing = True
+        self._conn_lost += 1
+        self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def _call_connection_lost(self, exception):
+        try:
+            self._protocol.connection_lost(exception)
+        finally:
+            self._handle.close()
+            self._protocol = None
+
+
+class _PipeProtocol(protocols.Protocol):
+    """
+    Forwards the events of a pipe transport of a subprocess to the
+    subprocess protocol.
+    """
+
+    def __init__(self, transport, fd):
+        self.transport = transport
+        self.fd = fd
+
+    def data_received(self, data):
+        if self.fd != 0:
+            self.transport._protocol.pipe_data_received(self.fd, data)
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exception):
+        self.transport._pipe_connection_lost(self.fd, exception)
+
+    def pause_writing(self):
+        self.transport._protocol.pause_writing()
+
+    def resume_writing(self):
+        self.transport._protocol.resume_writing()
+
+
+class _SubprocessTransport(transports.SubprocessTransport):
+    """
+    Subprocess transport backed by a :class:`uv.Process` handle.
+    """
+
+    def __init__(self, event_loop, protocol, arguments, stdin, stdout, stderr, waiter,
+                 keywords):
+        super(_SubprocessTransport, self).__init__({})
+        self._loop = event_loop
+        self._protocol = protocol
+        self._returncode = None
+        self._closed = False
+        self._finished = False
+        self._exit_waiters = []
+        self._pipes = {}
+        self._connected = set()
+
+        stdio = [stdin, stdout, stderr]
+        parent_ends = {}
+        close_after = []
+        if stderr == subprocess.STDOUT:
+            if stdout == subprocess.PIPE:
+                parent, child = socket.socketpair()
+                parent_ends[1] = parent
+                close_after.append(child)
+                stdio[1] = child.fileno()
+            stdio[2] = stdio[1]
+        for fd in range(3):
+            target = stdio[fd]
+            if target is None:
+                stdio[fd] = fd
+            elif target == subprocess.PIPE:
+                stdio[fd] = process.CreatePipe(readable=fd == 0, writable=fd != 0)
+            elif target == subprocess.DEVNULL:
+                devnull = open(os.devnull, 'rb' if fd == 0 else 'wb')
+                close_after.append(devnull)
+                stdio[fd] = devnull.fileno()
+            elif target == subprocess.STDOUT:
+                stdio[fd] = 1
+
+        try:
+            self._process = process.Process(arguments, cwd=keywords.get('cwd'),
+                                            env=keywords.get('env'), stdin=stdio[0],
+                                            stdout=stdio[1], stderr=stdio[2],
+                                            loop=event_loop._uv_loop,
+                                            on_exit=self._on_exit)
+        except error.UVError:
+            for parent in parent_ends.values():
+                parent.close()
+            raise
+        finally:
+            for fileobj in close_after:
+                fileobj.close()
+        self._extra['subprocess'] = event_loop._track(self._process)
+
+        streams = {0: self._process.stdin, 1: self._process.stdout,
+                   2: self._process.stderr}
+        for fd, parent in parent_ends.items():
+            streams[fd] = event_loop._track(pipe.Pipe(loop=event_loop._uv_loop))
+            streams[fd].open(parent.detach())
+        # the protocol must see the transport before any pipe data arrives
+        event_loop._call_soon(self._protocol.connection_made, (self, ), {})
+        for fd, stream in streams.items():
+            if isinstance(stream, pipe.Pipe):
+                event_loop._track(stream)
+            if isinstance(stream, pipe.Pipe) and (fd != 2 or stderr != subprocess.STDOUT):
+                self._pipes[fd] = _StreamTransport(event_loop, stream,
+                                                   _PipeProtocol(self, fd))
+                self._connected.add(fd)
+        event_loop._call_soon(_set_result_unless_cancelled, (waiter, None), {})
+
+    def __repr__(self):
+        return '<{} pid={} returncode={}>'.format(self.__class__.__name__,
+                                                  self.get_pid(), self._returncode)
+
+    def _on_exit(self, process_handle, returncode, signum):
+        self._returncode = -signum if signum else returncode
+        process_handle.close()
+        self._loop._call_soon(self._protocol.process_exited, (), {})
+        self._loop._call_soon(self._try_finish, (), {})
+        waiters, self._exit_waiters = self._exit_waiters, []
+        for waiter in waiters:
+            if not waiter.cancelled():
+                waiter.set_result(self._returncode)
+
+    def _pipe_connection_lost(self, fd, exception):
+        self._connected.discard(fd)
+        self._protocol.pipe_connection_lost(fd, exception)
+        self._try_finish()
+
+    def _try_finish(self):
+        if self._finished or self._returncode is None or self._connected:
+            return
+        self._finished = True
+        self._loop._call_soon(self._call_connection_lost, (None, ), {})
+
+    def _call_connection_lost(self, exception):
+        try:
+            self._protocol.connection_lost(exception)
+        finally:
+            self._protocol = None
+
+    def _wait(self):
+        waiter = self._loop.create_future()
+        if self._returncode is not None:
+            waiter.set_result(self._returncode)
+        else:
+            self._exit_waiters.append(waiter)
+        return waiter
+
+    def get_pid(self):
+        return self._process.pid
+
+    def get_returncode(self):
+        return self._returncode
+
+    def get_pipe_transport(self, fd):
+        return self._pipes.get(fd)
+
+    def is_closing(self):
+        return self._closed
+
+    def send_signal(self, signum):
+        if self._returncode is not None:
+            raise ProcessLookupError()
+        self._process.kill(signum)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL if hasattr(signal, 'SIGKILL') else signal.SIGTERM)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for transport in self._pipes.values():
+            transport.close()
+        if self._returncode is None and not self._process.closing:
+            try:
+                self.kill()
+            except (OSError, ProcessLookupError):
+                pass
+
+
+class EventLoopPolicy(events.BaseDefaultEventLoopPolicy):
+    """
+    Event loop policy creating instances of :class:`uv.aio.EventLoop`.
+    """
+
+    _loop_factory = EventLoop
+
+
+def install():
+    """
+    Make :class:`uv.aio.EventLoopPolicy` the current event loop policy.
+    """
+    asyncio.set_event_loop_policy(EventLoopPolicy())
@@ -78,6 +78,13 @@ def base_prepare_cb(uv_prepare):
     base_loop.on_prepare()
 
 
+@ffi.callback('uv_check_cb')
+def base_check_cb(uv_check):
+    base_loop = ffi.from_handle(uv_check.data)
+    """ :type: BaseLoop """
+    base_loop.on_check()
+
+
 @ffi.callback('uv_walk_cb')
 def base_walk_close_cb(uv_handle, _):
     if not lib.uv_is_closing(uv_handle):
@@ -135,6 +142,8 @@ class BaseLoop(object):
         self.internal_uv_async.data = self.c_reference
         self.internal_uv_prepare = ffi.new('uv_prepare_t*')
         self.internal_uv_prepare.data = self.c_reference
+        self.internal_uv_check = ffi.new('uv_check_t*')
+        self.internal_uv_check.data = self.c_reference
 
         if not default:
             code = lib.uv_loop_init(self.uv_loop)
@@ -144,6 +153,7 @@ class BaseLoop(object):
 
         self._init_internal_async()
         self._init_internal_prepare()
+        self._init_internal_check()
 
         _loops.add(self)
 
@@ -178,6 +188,34 @@ class BaseLoop(object):
         if not lib.uv_is_closing(uv_handle):
             lib.uv_close(uv_handle, ffi.NULL)
 
+    def _init_internal_check(self):
+        """
+        Initialize the internal check handle. It is only started when
+        there are hooks to run right after polling for IO.
+        """
+        lib.uv_check_init(self.uv_loop, self.internal_uv_check)
+        lib.uv_unref(ffi.cast('uv_handle_t*', self.internal_uv_check))
+
+    def _close_internal_check(self):
+        """
+        Close the internal check handle.
+        """
+        uv_handle = ffi.cast('uv_handle_t*', self.internal_uv_check)
+        if not lib.uv_is_closing(uv_handle):
+            lib.uv_close(uv_handle, ffi.NULL)
+
+    def start_internal_check(self):
+        """
+        Start the internal check handle used for after poll hooks.
+        """
+        lib.uv_check_start(self.internal_uv_check, base_check_cb)
+
+    def stop_internal_check(self):
+        """
+        Stop the internal check handle used for after poll hooks.
+        """
+        lib.uv_check_stop(self.internal_uv_check)
+
     def _destroy(self, _):
         """
         This method is invoked by the garbage collection after the user
@@ -276,6 +314,7 @@ class BaseLoop(object):
 
         self._close_internal_async()
         self._close_internal_prepare()
+        self._close_internal_check()
         for handle in self.handles_to_close:
             handle.close()
         for request in self.requests_to_cancel:
@@ -287,6 +326,7 @@ class BaseLoop(object):
         if code != error.StatusCodes.SUCCESS:
             self._init_internal_async()
             self._init_internal_prepare()
+            self._init_internal_check()
         else:
             _loops.remove(self)
             self.closed = True
@@ -310,6 +350,19 @@ class BaseLoop(object):
                 base_request.cancel()  # pragma: no cover
         except KeyError:
             pass
+        user_loop = self.user_loop
+        """ :type: uv.Loop """
+        if user_loop is not None:
+            user_loop.on_prepare()
+
+    def on_check(self):
+        """
+        Internal check handle callback.
+        """
+        user_loop = self.user_loop
+        """ :type: uv.Loop """
+        if user_loop is not None:
+            user_loop.on_check()
 
     def on_wakeup(self):
         """
@@ -358,7 +411,8 @@ class BaseHandle(object):
         except AttributeError:
             return None
 
-    def __init__(self, user_handle, base_loop, handle_type, handle_init, arguments):
+    def __init__(self, user_handle, base_loop, handle_type, handle_init, arguments,
+                 registered_on_error=False):
         """
         :type user_handle:
             uv.Handle
@@ -370,6 +424,8 @@ class BaseHandle(object):
             callable
         :type arguments:
             tuple
+        :type registered_on_error:
+            bool
         """
         self.c_reference = ffi.new_handle(self)
 
@@ -382,8 +438,18 @@ class BaseHandle(object):
 
         code = handle_init(self.base_loop.uv_loop, self.uv_object, *arguments)
         if code != error.StatusCodes.SUCCESS:
-            self.closed = True
-            self.closing = True
+            if registered_on_error:
+                # the handle has been registered nevertheless, it has to be
+                # closed before its memory may be released and the user
+                # handle has not been initialized, so detach it
+                self.weak_user_handle = lambda: None
+                self.closed = False
+                self.closing = False
+                self.base_loop.attach_handle(self)
+                self.close()
+            else:
+                self.closed = True
+                self.closing = True
             raise error.UVError(code)
         else:
             self.closed = False
@@ -441,6 +507,8 @@ def handle_callback(callback_type):
         def wrapper(uv_handle, *arguments):
             user_handle = BaseHandle.detach(uv_handle)
             if user_handle:
+                if user_handle.loop.track_activity:
+                    user_handle.loop.activity += 1
                 try:
                     callback(user_handle, *arguments)
                 except:
@@ -551,6 +619,8 @@ def request_callback(callback_type):
             user_request = base_request.user_request
             if user_request:
                 user_request.clear_pending()
+                if user_request.loop.track_activity:
+                    user_request.loop.activity += 1
                 try:
                     callback(user_request, *arguments)
                 except Exception:
@@ -0,0 +1,895 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Pre-forked multi-process TCP servers. A master process accepts all
+connections and hands them to worker processes over inter process
+communication pipes, each worker serves its connections on its own loop.
+Which worker receives a connection is decided by a pluggable distribution
+function, e.g. :func:`round_robin`, :func:`least_connections` or
+:func:`least_load`. Alternatively :func:`serve_per_core` lets each
+worker listen on its own `SO_REUSEPORT` socket and leaves the distribution
+to the kernel. Workers which have to share large preloaded state are
+forked from a warmed-up process with :func:`fork_workers`.
+"""
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections
+import functools
+import importlib
+import multiprocessing
+import os
+import signal
+import struct
+import sys
+import traceback
+
+from . import common, error
+from .loop import Loop
+from .handles.check import Check
+from .handles.pipe import Pipe
+from .handles.signal import Signal
+from .handles.tcp import TCP
+from .helpers.workers import (RESTART_DELAY_MAX, WORKER_FD, ChildProcess, Restarter,
+                              unpack_records)
+from .library import lib
+
+
+_report = struct.Struct('!Bi')
+
+REPORT_RELEASE = 1
+REPORT_LOAD = 2
+REPORT_READY = 3
+
+WORKER_CODE = ('import sys; sys.path[:] = {path!r}; '
+               'from uv.cluster import run_worker; run_worker({target!r}, {fd})')
+
+PER_CORE_CODE = ('import sys; sys.path[:] = {path!r}; '
+                 'from uv.cluster import run_per_core; '
+                 'run_per_core({target!r}, {address!r}, {backlog}, {fd})')
+
+
+def _resolve(target):
+    module, _, name = target.partition(':')
+    return functools.reduce(getattr, name.split('.'), importlib.import_module(module))
+
+
+def _rotated(cluster):
+    workers = cluster.workers
+    start = cluster.accepted % len(workers)
+    return workers[start:] + workers[:start]
+
+
+def round_robin(cluster):
+    """
+    Hand connections to the workers in turn.
+
+    :type cluster:
+        uv.Cluster
+
+    :rtype:
+        uv.cluster.WorkerProcess
+    """
+    return cluster.workers[cluster.accepted % len(cluster.workers)]
+
+
+def least_connections(cluster):
+    """
+    Hand connections to the worker with the fewest open connections.
+    Requires the workers to call :func:`uv.cluster.Worker.release` for
+    every finished connection.
+
+    :type cluster:
+        uv.Cluster
+
+    :rtype:
+        uv.cluster.WorkerProcess
+    """
+    return min(_rotated(cluster), key=lambda worker: worker.connections)
+
+
+def least_load(cluster):
+    """
+    Hand connections to the worker with the lowest load reported by
+    :func:`uv.cluster.Worker.report_load`, ties are broken by the number
+    of open connections.
+
+    :type cluster:
+        uv.Cluster
+
+    :rtype:
+        uv.cluster.WorkerProcess
+    """
+    return min(_rotated(cluster), key=lambda worker: (worker.load, worker.connections))
+
+
+class Worker(object):
+    """
+    Worker side of a cluster, passed to the target function in each
+    worker process. Connections handed over by the master are accepted
+    on the worker's loop and passed to :attr:`uv.cluster.Worker.on_connection`.
+
+    .. note::
+        This class must not be instantiated directly, it is created by
+        the worker processes of :class:`uv.Cluster`.
+
+    :param fd:
+        file descriptor of the pipe to the master process
+    :param loop:
+        event loop the connections should run on
+
+    :type fd:
+        int
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'channel', 'connections', 'on_connection', 'on_shutdown']
+
+    def __init__(self, fd=WORKER_FD, loop=None):
+        self.loop = loop or Loop.get_current()
+        self.connections = 0
+        """
+        Number of connections accepted and not yet released.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.on_connection = common.dummy_callback
+        """
+        Callback which should be called with connections handed over by
+        the master.
+
+
+        .. function:: on_connection(worker, connection)
+
+            :param worker:
+                worker the call originates from
+            :param connection:
+                accepted connection
+
+            :type worker:
+                uv.cluster.Worker
+            :type connection:
+                uv.TCP
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.cluster.Worker, uv.TCP) -> None)
+        """
+        self.on_shutdown = lambda worker: worker.loop.stop()
+        """
+        Callback which should be called after the master has closed the
+        cluster or died. By default the loop is stopped, so the worker
+        process exits.
+
+
+        .. function:: on_shutdown(worker)
+
+            :param worker:
+                worker the call originates from
+
+            :type worker:
+                uv.cluster.Worker
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.cluster.Worker) -> None)
+        """
+        self.channel = Pipe(ipc=True, loop=self.loop)
+        self.channel.open(fd)
+        self.channel.read_start(self._on_read)
+
+    def release(self):
+        """
+        Report a finished connection to the master. Used by the
+        :func:`uv.cluster.least_connections` distribution.
+        """
+        self.connections -= 1
+        self._report(REPORT_RELEASE, 1)
+
+    def report_load(self, load):
+        """
+        Report the current load of the worker to the master. Used by
+        the :func:`uv.cluster.least_load` distribution.
+
+        :param load:
+            current load, e.g. the number of queued requests
+
+        :type load:
+            int
+        """
+        self._report(REPORT_LOAD, load)
+
+    def _report(self, kind, value):
+        if not self.channel.closing:
+            self.channel.write(_report.pack(kind, value))
+
+    def _on_read(self, channel, status, data):
+        if status != error.StatusCodes.SUCCESS:
+            channel.close()
+            self.on_shutdown(self)
+            return
+        while channel.pending_count:
+            connection = channel.pending_accept(loop=self.loop)
+            self.connections += 1
+            self.on_connection(self, connection)
+
+
+def run_worker(target, fd=WORKER_FD):
+    """
+    Main function of a worker process. Calls the target function with
+    a :class:`uv.cluster.Worker` and runs the loop until it is stopped.
+
+    .. warning::
+        Only for internal purposes!
+
+    :param target:
+        target function as `module:name`
+    :param fd:
+        file descriptor of the pipe to the master process
+
+    :type target:
+        unicode
+    :type fd:
+        int
+    """
+    function = _resolve(target)
+    worker = Worker(fd)
+    function(worker)
+    worker._report(REPORT_READY, 0)
+    worker.loop.run()
+
+
+def run_per_core(target, address, backlog, fd=WORKER_FD):
+    """
+    Main function of a worker process started by :func:`uv.serve_per_core`.
+    Binds a listener with `SO_REUSEPORT`, passes it to the factory and
+    runs the loop until the master shuts the worker down.
+
+    .. warning::
+        Only for internal purposes!
+
+    :param target:
+        factory function as `module:name`
+    :param address:
+        address to listen on
+    :param backlog:
+        listen backlog
+    :param fd:
+        file descriptor of the pipe to the master process
+
+    :type target:
+        unicode
+    :type address:
+        tuple
+    :type backlog:
+        int
+    :type fd:
+        int
+    """
+    function = _resolve(target)
+    worker = Worker(fd)
+    listener = TCP(loop=worker.loop)
+    listener.bind(address, reuse_port=True)
+    function(listener)
+    listener.listen(backlog)
+    worker._report(REPORT_READY, 0)
+    worker.loop.run()
+
+
+class WorkerProcess(ChildProcess):
+    """
+    Master side of a cluster's worker process.
+
+    .. note::
+        This class must not be instantiated directly, it is created by
+        :class:`uv.Cluster`.
+    """
+
+    __slots__ = ['cluster', 'connections', 'load', 'ready']
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+        self.connections = 0
+        """
+        Number of connections handed to the worker and not yet released.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.load = 0
+        """
+        Load last reported by the worker.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.ready = False
+        """
+        Whether the worker has finished its setup.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        super(WorkerProcess, self).__init__(cluster._worker_code(), cluster.loop)
+
+    @property
+    def pid(self):
+        """
+        PID of the worker process.
+
+        :readonly:
+            True
+        :rtype:
+            int
+        """
+        return self.process.pid
+
+    def hand_over(self, connection):
+        """
+        Send an accepted connection to the worker and close it in the
+        master afterwards.
+
+        :param connection:
+            accepted connection
+
+        :type connection:
+            uv.TCP
+        """
+        def on_write(request, status):
+            connection.close()
+            if status != error.StatusCodes.SUCCESS:
+                self.connections -= 1
+
+        self.connections += 1
+        self.pipe.write(b'\0', send_stream=connection, on_write=on_write)
+
+    def _on_data(self, buffer):
+        for kind, value in unpack_records(buffer, _report):
+            if kind == REPORT_RELEASE:
+                self.connections = max(0, self.connections - value)
+            elif kind == REPORT_LOAD:
+                self.load = value
+            elif kind == REPORT_READY:
+                self.ready = True
+                self.cluster._on_worker_ready(self)
+
+    def _on_dead(self):
+        self.cluster._on_worker_dead(self)
+
+
+class Cluster(object):
+    """
+    Pre-forked multi-process TCP server. The master process listens on
+    `address` and hands every accepted connection to one of `workers`
+    worker processes, which serve them on their own loops. The `target`
+    function runs in each worker with a :class:`uv.cluster.Worker` and
+    has to set its :attr:`uv.cluster.Worker.on_connection` callback.
+    Workers which die are replaced after an exponentially growing delay,
+    which is reset once a worker has finished its setup. After
+    `max_restarts` consecutive replacements dead workers are no longer
+    replaced and the cluster is closed once the last one has died.
+
+    The worker for a connection is chosen by the `distribution` function
+    which is called with the cluster and returns one of its
+    :attr:`uv.Cluster.workers`.
+
+    .. code-block:: python
+
+        def serve(worker):
+            def on_connection(worker, connection):
+                connection.read_start(on_read)
+            worker.on_connection = on_connection
+
+        uv.Cluster(serve, ('0.0.0.0', 8080), distribution=uv.cluster.least_load)
+
+    .. note::
+        The target function is imported by its module name in the
+        workers, which start with the `sys.path` of the master process,
+        so it must not be defined in the main script of a program.
+        Clusters are only supported on POSIX systems.
+
+    :raises uv.UVError:
+        error while listening or spawning the workers
+
+    :param target:
+        function running in each worker or its name as `module:name`
+    :param address:
+        address to listen on `(ip, port, flowinfo=0, scope_id=0)`
+    :param workers:
+        number of worker processes, defaults to the number of CPUs
+    :param distribution:
+        function choosing the worker for a connection
+    :param backlog:
+        listen backlog of the master
+    :param on_ready:
+        callback which should be called once all workers have finished
+        their setup for the first time
+    :param max_restarts:
+        number of consecutive replacements of dead workers or `None`
+    :param loop:
+        event loop the master should run on
+
+    :type target:
+        ((uv.cluster.Worker) -> None) | unicode
+    :type address:
+        uv.Address4 | uv.Address6 | tuple
+    :type workers:
+        int | None
+    :type distribution:
+        (uv.Cluster) -> uv.cluster.WorkerProcess
+    :type backlog:
+        int
+    :type on_ready:
+        ((uv.Cluster) -> None) | None
+    :type max_restarts:
+        int | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'target', 'size', 'distribution', 'listener', 'workers',
+                 'accepted', 'spawned', 'on_ready', 'started', 'closed', 'restarter']
+
+    def __init__(self, target, address, workers=None, distribution=round_robin,
+                 backlog=128, on_ready=None, max_restarts=None, loop=None):
+        self.loop = loop or Loop.get_current()
+        if callable(target):
+            name = getattr(target, '__qualname__', target.__name__)
+            target = '%s:%s' % (target.__module__, name)
+        self.target = target
+        self.size = workers or multiprocessing.cpu_count()
+        self.distribution = distribution
+        self.workers = []
+        """
+        Worker processes of the cluster.
+
+        :readonly:
+            True
+        :type:
+            list[uv.cluster.WorkerProcess]
+        """
+        self.accepted = 0
+        """
+        Number of connections accepted so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.spawned = 0
+        """
+        Number of worker processes spawned so far, including the ones
+        replacing dead workers.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.on_ready = on_ready or common.dummy_callback
+        """
+        Callback which should be called once all workers have finished
+        their setup for the first time.
+
+
+        .. function:: on_ready(cluster)
+
+            :param cluster:
+                cluster the call originates from
+
+            :type cluster:
+                uv.Cluster
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.Cluster) -> None)
+        """
+        self.started = False
+        self.closed = False
+        self.restarter = Restarter(self.loop, self._spawn, self._on_exhausted,
+                                   max_restarts)
+        self.listener = TCP(loop=self.loop)
+        try:
+            self._listen(address, backlog)
+            for _ in range(self.size):
+                self._spawn()
+        except error.UVError:
+            self.close()
+            raise
+
+    @property
+    def sockname(self):
+        """
+        Address the master listens on.
+
+        :readonly:
+            True
+        :rtype:
+            uv.Address4 | uv.Address6
+        """
+        return self.listener.sockname
+
+    def close(self):
+        """
+        Close the listener and shut down the workers.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.restarter.close()
+        self.listener.close()
+        for worker in self.workers:
+            worker.retire()
+        del self.workers[:]
+
+    def _listen(self, address, backlog):
+        self.listener.bind(address)
+        self.listener.listen(backlog, on_connection=self._on_connection)
+
+    def _worker_code(self):
+        return WORKER_CODE.format(path=sys.path, target=self.target, fd=WORKER_FD)
+
+    def _spawn(self):
+        self.workers.append(WorkerProcess(self))
+        self.spawned += 1
+
+    def _on_connection(self, listener, status):
+        if status != error.StatusCodes.SUCCESS:
+            return
+        connection = listener.accept(loop=self.loop)
+        if not self.workers:
+            connection.close()
+            return
+        worker = self.distribution(self)
+        self.accepted += 1
+        worker.hand_over(connection)
+
+    def _on_worker_ready(self, worker):
+        self.restarter.reset()
+        if not self.started and all(worker.ready for worker in self.workers):
+            self.started = True
+            self.on_ready(self)
+
+    def _on_worker_dead(self, worker):
+        if worker.retiring:
+            return
+        self.workers.remove(worker)
+        if not self.closed:
+            self.restarter.schedule()
+
+    def _on_exhausted(self):
+        if not self.workers and not self.restarter.pending:
+            self.close()
+
+
+class ReusePortCluster(Cluster):
+    """
+    Shared-nothing multi-process TCP server created by
+    :func:`uv.serve_per_core`. Each worker listens with its own
+    `SO_REUSEPORT` socket on the same address and the kernel distributes
+    incoming connections among them, the master only supervises the
+    workers. The master keeps a bound but not listening socket on the
+    address, which reserves the port, e.g. for port 0, while workers are
+    restarted.
+
+    .. note::
+        This class must not be instantiated directly. Please use
+        :func:`uv.serve_per_core` instead.
+    """
+
+    __slots__ = ['address', 'backlog']
+
+    def __init__(self, target, address, workers=None, backlog=128, on_ready=None,
+                 max_restarts=None, loop=None):
+        super(ReusePortCluster, self).__init__(target, address, workers, None, backlog,
+                                               on_ready, max_restarts, loop)
+
+    def _listen(self, address, backlog):
+        self.listener.bind(address, reuse_port=True)
+        self.address = tuple(self.listener.sockname)
+        self.backlog = backlog
+
+    def _worker_code(self):
+        return PER_CORE_CODE.format(path=sys.path, target=self.target,
+                                    address=self.address, backlog=self.backlog,
+                                    fd=WORKER_FD)
+
+
+def serve_per_core(factory, address, workers=None, backlog=128, on_ready=None,
+                   max_restarts=None, loop=None):
+    """
+    Serve TCP connections with one worker process per core, each with
+    its own loop and its own `SO_REUSEPORT` listener on `address`. The
+    `factory` function is called in each worker with the bound listener,
+    e.g. to set :attr:`uv.TCP.on_connection`, which then starts listening.
+    Workers which die are replaced like in :class:`uv.Cluster`, closing
+    the returned cluster shuts them down. Unlike :class:`uv.Cluster`
+    connections never pass through the master, but their distribution
+    is left to the kernel, which only balances them evenly on Linux.
+
+    .. code-block:: python
+
+        def serve(listener):
+            def on_connection(listener, status):
+                listener.accept().read_start(on_read)
+            listener.on_connection = on_connection
+
+        uv.serve_per_core(serve, ('0.0.0.0', 8080))
+
+    :raises uv.UVError:
+        error while binding or spawning the workers,
+        :attr:`uv.StatusCodes.ENOTSUP` if the platform does not
+        support `SO_REUSEPORT`
+
+    :param factory:
+        function setting up the listener of each worker or its name as
+        `module:name`, it must not be defined in the main script
+    :param address:
+        address to listen on `(ip, port, flowinfo=0, scope_id=0)`
+    :param workers:
+        number of worker processes, defaults to the number of CPUs
+    :param backlog:
+        listen backlog of each worker
+    :param on_ready:
+        callback which should be called once all workers are listening
+    :param max_restarts:
+        number of consecutive replacements of dead workers or `None`
+    :param loop:
+        event loop the master should run on
+
+    :type factory:
+        ((uv.TCP) -> None) | unicode
+    :type address:
+        uv.Address4 | uv.Address6 | tuple
+    :type workers:
+        int | None
+    :type backlog:
+        int
+    :type on_ready:
+        ((uv.cluster.ReusePortCluster) -> None) | None
+    :type max_restarts:
+        int | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.cluster.ReusePortCluster
+    """
+    return ReusePortCluster(factory, address, workers, backlog, on_ready, max_restarts,
+                            loop)
+
+
+class ForkedWorkers(object):
+    """
+    Worker processes forked from the current process by
+    :func:`uv.fork_workers`. Workers are forked by the parent's loop
+    right after polling for IO, the children then leave the parent's run
+    at the end of that iteration and start a fresh run of the forked
+    loop. The parent reaps exited workers on its loop and forks
+    replacements after an exponentially growing delay if `restart` is
+    true, the delay is reset once a worker has survived the longest one.
+    After `max_restarts` consecutive replacements the workers are closed
+    once the last one has exited.
+
+    .. note::
+        This class must not be instantiated directly. Please use
+        :func:`uv.fork_workers` instead.
+    """
+
+    __slots__ = ['loop', 'on_child', 'restart', 'pids', 'restarts', 'closed', 'watcher',
+                 'forker', 'unforked', 'exited', 'forked_at', 'restarter']
+
+    def __init__(self, size, on_child, restart=True, loop=None, max_restarts=None):
+        if not hasattr(os, 'fork') or not lib.cross_uv_loop_fork_supported():
+            raise error.UVError(error.StatusCodes.ENOSYS)
+        self.loop = loop or Loop.get_current()
+        self.on_child = on_child
+        self.restart = restart
+        self.pids = {}
+        """
+        PIDs of the running workers by their index.
+
+        :readonly:
+            True
+        :type:
+            dict[int, int]
+        """
+        self.restarts = 0
+        """
+        Number of workers forked to replace exited ones.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.closed = False
+        self.watcher = Signal(loop=self.loop, on_signal=self._on_signal)
+        self.watcher.start(signal.SIGCHLD)
+        self.unforked = list(range(size))
+        self.exited = collections.deque()
+        self.forked_at = {}
+        self.restarter = Restarter(self.loop, self._on_restart, self._on_exhausted,
+                                   max_restarts)
+        self.forker = Check(loop=self.loop, on_check=self._on_check)
+        self._start_forker()
+
+    def close(self, signum=signal.SIGTERM):
+        """
+        Stop restarting workers and send them the signal `signum`. The
+        parent's loop keeps running until all workers have been reaped.
+
+        :param signum:
+            signal which should be sent to the workers
+
+        :type signum:
+            int
+        """
+        self.closed = True
+        self.forker.close()
+        self.restarter.close()
+        for pid in self.pids.values():
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+        if not self.pids:
+            self.watcher.close()
+
+    def _start_forker(self):
+        self.forker.start()
+        # do not block while polling for IO, which precedes the check
+        self.loop.base_loop.wakeup()
+
+    def _on_check(self, forker):
+        forker.stop()
+        unforked, self.unforked = self.unforked, []
+        for index in unforked:
+            pid = os.fork()
+            if pid == 0:
+                self._enter_child(index)
+                return
+            self.pids[index] = pid
+            self.forked_at[index] = self.loop.now
+
+    def _enter_child(self, index):
+        self.watcher.close()
+        self.forker.close()
+        self.restarter.close()
+        self.loop.stop()
+        self.loop.call_after_run(self._run_child, index)
+
+    def _run_child(self, index):
+        status = 0
+        try:
+            self.loop.fork()
+            self.on_child(index)
+            self.loop.run()
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def _on_restart(self):
+        self.restarts += 1
+        self.unforked.append(self.exited.popleft())
+        self._start_forker()
+
+    def _on_exhausted(self):
+        if not self.pids and not self.restarter.pending:
+            self.close()
+
+    def _on_signal(self, watcher, signum):
+        self.loop.update_time()
+        for index, pid in list(self.pids.items()):
+            try:
+                reaped, _ = os.waitpid(pid, os.WNOHANG)
+            except OSError:
+                reaped = pid
+            if not reaped:
+                continue
+            del self.pids[index]
+            if self.loop.now - self.forked_at.pop(index) >= RESTART_DELAY_MAX:
+                self.restarter.reset()
+            if self.restart and not self.closed:
+                self.exited.append(index)
+                self.restarter.schedule()
+        if self.closed and not self.pids:
+            watcher.close()
+
+
+def fork_workers(size, on_child, restart=True, loop=None, max_restarts=None):
+    """
+    Fork `size` worker processes from the current process. Modules,
+    configuration and models loaded before share their memory pages
+    with the workers copy-on-write, so workers start instantly and
+    large preloaded state is not duplicated.
+
+    The workers are forked once the loop runs. In each worker the loop
+    is reinitialized with :func:`uv.Loop.fork` after the parent's run has
+    returned, `on_child` is called with the index of the worker and the
+    loop runs anew until it has no more active handles, then the worker
+    exits. Handles created before the fork are inherited, e.g. a
+    :class:`uv.TCP` handle bound in the parent can be listened on in each
+    worker, the kernel then distributes connections among the workers.
+    The parent should not listen on such handles itself.
+
+    .. code-block:: python
+
+        model = load_model()
+        server = uv.TCP()
+        server.bind(('0.0.0.0', 8080))
+
+        def on_child(index):
+            server.listen(on_connection=on_connection)
+
+        workers = uv.fork_workers(8, on_child)
+        uv.Loop.get_current().run()
+
+    .. warning::
+        Only the calling thread exists in the workers. Fork before
+        starting other threads, handles or filesystem operations.
+
+    :raises uv.UVError:
+        :attr:`uv.StatusCodes.ENOSYS` if the platform or libuv version
+        does not support forking
+
+    :param size:
+        number of worker processes
+    :param on_child:
+        callback which should be called in each worker
+    :param restart:
+        fork a replacement whenever a worker exits
+    :param loop:
+        event loop which should be forked
+    :param max_restarts:
+        number of consecutive replacements of exited workers or `None`
+
+    :type size:
+        int
+    :type on_child:
+        (int) -> None
+    :type restart:
+        bool
+    :type loop:
+        uv.Loop
+    :type max_restarts:
+        int | None
+
+    :rtype:
+        uv.cluster.ForkedWorkers
+    """
+    return ForkedWorkers(size, on_child, restart, loop, max_restarts)
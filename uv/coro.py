@@ -0,0 +1,822 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+A minimal coroutine layer on top of the callback API. Futures are
+resolved from within libuv callbacks and resume the waiting coroutine
+immediately – there is no ready queue in between. Coroutines may be
+generators yielding futures (`data = yield uv.coro.read(stream)`) and
+raising :class:`uv.coro.Return` to return a value or, on Python 3.5 and
+newer, native coroutines awaiting them.
+
+.. code-block:: python3
+
+    async def echo(address):
+        tcp = uv.TCP()
+        await uv.coro.connect(tcp, address)
+        await uv.coro.write(tcp, b'hello')
+        print(await uv.coro.read(tcp))
+        tcp.close()
+
+    uv.coro.run(echo(('127.0.0.1', 4444)))
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+
+from . import dns, error
+from .loop import Loop, RunModes
+from .handles import timer
+
+
+class CancelledError(Exception):
+    """
+    Raised inside of a coroutine if its task has been cancelled.
+    """
+
+
+class Return(Exception):
+    """
+    Raised by generator based coroutines to return a value, as Python
+    2 does not allow `return` with a value inside of generators.
+
+    :param value:
+        return value of the coroutine
+
+    :type value:
+        Any
+    """
+
+    def __init__(self, value=None):
+        super(Return, self).__init__(value)
+        self.value = value
+
+
+class Future(object):
+    """
+    Result of an operation which completes in the future. Futures
+    are awaitable and are their own iterator: awaiting a pending
+    future suspends the coroutine, awaiting a completed one returns
+    the result (or raises the exception) immediately.
+
+    :param loop:
+        event loop exceptions of waiting tasks are reported to
+
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'done', 'result', 'exception', 'waiter', 'callbacks']
+
+    def __init__(self, loop=None):
+        self.loop = loop or Loop.get_current()
+        """
+        Event loop exceptions of waiting tasks are reported to.
+
+        :readonly:
+            True
+        :type:
+            uv.Loop
+        """
+        self.done = False
+        """
+        Future has been completed.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        self.result = None
+        """
+        Result of the operation.
+
+        :readonly:
+            True
+        :type:
+            Any
+        """
+        self.exception = None
+        """
+        Exception raised by the operation.
+
+        :readonly:
+            True
+        :type:
+            BaseException | None
+        """
+        self.waiter = None
+        self.callbacks = None
+
+    def __repr__(self):
+        if not self.done:
+            state = 'pending'
+        elif self.exception is not None:
+            state = 'exception={!r}'.format(self.exception)
+        else:
+            state = 'result={!r}'.format(self.result)
+        return '<{} {}>'.format(self.__class__.__name__, state)
+
+    def __iter__(self):
+        return self
+
+    __await__ = __iter__
+
+    def __next__(self):
+        if not self.done:
+            return self
+        if self.exception is not None:
+            raise self.exception
+        raise StopIteration(self.result)
+
+    next = __next__
+
+    def send(self, _):
+        return self.__next__()
+
+    def throw(self, exc_type, exc_value=None, exc_traceback=None):
+        if exc_value is None:
+            raise exc_type
+        raise exc_value
+
+    def close(self):
+        pass
+
+    def add_done_callback(self, callback):
+        """
+        Call `callback` with the future as soon as it is completed.
+
+        :param callback:
+            callback which should be called
+
+        :type callback:
+            ((uv.coro.Future) -> None) | ((Any, uv.coro.Future) -> None)
+        """
+        if self.done:
+            callback(self)
+        elif self.callbacks is None:
+            self.callbacks = [callback]
+        else:
+            self.callbacks.append(callback)
+
+    def set_result(self, result):
+        """
+        Complete the future with `result` and resume a waiting task.
+
+        :param result:
+            result of the operation
+
+        :type result:
+            Any
+        """
+        self.done = True
+        self.result = result
+        self._resolve()
+
+    def set_exception(self, exception):
+        """
+        Complete the future with `exception` and resume a waiting task.
+
+        :param exception:
+            exception which should be raised in the waiting task
+
+        :type exception:
+            BaseException
+        """
+        self.done = True
+        self.exception = exception
+        self._resolve()
+
+    def _resolve(self):
+        waiter = self.waiter
+        if waiter is not None:
+            self.waiter = None
+            waiter.step(self)
+        if self.callbacks is not None:
+            callbacks, self.callbacks = self.callbacks, None
+            for callback in callbacks:
+                callback(self)
+
+
+class Task(Future):
+    """
+    Drives a coroutine. The coroutine runs synchronously up to its
+    first suspension point when the task is created. Tasks are futures
+    themselves and complete with the return value of the coroutine.
+
+    If a task completes with an exception and nobody is waiting for
+    it the exception is passed to the excepthook of the loop.
+
+    :param coroutine:
+        generator or native coroutine which should be driven
+    :param loop:
+        event loop exceptions are reported to
+    :param on_done:
+        callback which should be called once the task has completed,
+        registered before the coroutine starts
+
+    :type coroutine:
+        generator | coroutine
+    :type loop:
+        uv.Loop
+    :type on_done:
+        ((uv.coro.Task) -> None) | None
+    """
+
+    __slots__ = ['coroutine', 'awaiting']
+
+    def __init__(self, coroutine, loop=None, on_done=None):
+        super(Task, self).__init__(loop)
+        if on_done is not None:
+            self.add_done_callback(on_done)
+        self.coroutine = coroutine
+        """
+        Coroutine driven by the task.
+
+        :readonly:
+            True
+        :type:
+            generator | coroutine
+        """
+        self.awaiting = None
+        """
+        Future the coroutine is currently waiting for.
+
+        :readonly:
+            True
+        :type:
+            uv.coro.Future | None
+        """
+        self.step(None)
+
+    def step(self, future):
+        """
+        Resume the coroutine with the outcome of `future`.
+
+        .. warning::
+            This method is only for internal purposes and is not part
+            of the official API. You should never call it directly!
+
+        :type future:
+            uv.coro.Future | None
+        """
+        self.awaiting = None
+        coroutine = self.coroutine
+        while True:
+            try:
+                if future is None or future.exception is None:
+                    # generator style coroutines receive the result, native
+                    # coroutines get it from the future's StopIteration
+                    future = coroutine.send(None if future is None else future.result)
+                else:
+                    future = coroutine.throw(future.exception)
+            except StopIteration as stop:
+                self.set_result(stop.args[0] if stop.args else None)
+                return
+            except Return as value:
+                self.set_result(value.value)
+                return
+            except Exception as exception:
+                if self.waiter is None and self.callbacks is None:
+                    if not isinstance(exception, CancelledError):
+                        self.loop.handle_exception()
+                self.set_exception(exception)
+                return
+            if not isinstance(future, Future):
+                future = _invalid_future(future)
+            elif not future.done:
+                self.awaiting = future
+                future.waiter = self
+                return
+
+    def cancel(self):
+        """
+        Cancel the task by raising :class:`uv.coro.CancelledError` in
+        the coroutine at its current suspension point. The operation
+        the coroutine is waiting for is not aborted but its outcome is
+        ignored.
+
+        :return:
+            whether the task has been cancelled
+        :rtype:
+            bool
+        """
+        if self.done or self.awaiting is None:
+            return False
+        self.awaiting.waiter = None
+        cancelled = Future(self.loop)
+        cancelled.set_exception(CancelledError())
+        self.step(cancelled)
+        return True
+
+
+def _invalid_future(value):
+    future = Future()
+    future.set_exception(TypeError('coroutine yielded {!r} instead of a '
+                                   'future'.format(value)))
+    return future
+
+
+def spawn(coroutine, loop=None):
+    """
+    Start driving `coroutine` in a new task.
+
+    :param coroutine:
+        generator or native coroutine
+    :param loop:
+        event loop exceptions are reported to
+
+    :type coroutine:
+        generator | coroutine
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.coro.Task
+    """
+    return Task(coroutine, loop)
+
+
+def run(coroutine, loop=None):
+    """
+    Drive `coroutine` and run the loop until it has completed.
+
+    :raises RuntimeError:
+        loop stopped before the coroutine completed
+
+    :param coroutine:
+        generator or native coroutine
+    :param loop:
+        event loop to run
+
+    :type coroutine:
+        generator | coroutine
+    :type loop:
+        uv.Loop
+
+    :return:
+        return value of the coroutine
+    :rtype:
+        Any
+    """
+    loop = loop or Loop.get_current()
+    running = []
+
+    def on_done(_):
+        if running:
+            loop.stop()
+
+    # the exception of the task is raised below, so it is not reported
+    task = Task(coroutine, loop, on_done)
+    if not task.done:
+        running.append(True)
+        loop.run()
+    if not task.done:
+        raise RuntimeError('loop stopped before the coroutine completed')
+    if task.exception is not None:
+        raise task.exception
+    return task.result
+
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:  # pragma: no cover
+    class StopAsyncIteration(Exception):
+        pass
+
+
+class StreamReader(object):
+    """
+    Buffered reader over a stream which applies backpressure: once
+    more than `high_water` bytes are buffered reading is stopped with
+    :func:`uv.Stream.read_stop` and it is resumed with
+    :func:`uv.Stream.read_start` as soon as the consumer has drained
+    the buffer to `low_water` bytes. Memory use per slow consumer is
+    therefore bounded by `high_water` plus one read buffer and no data
+    is dropped.
+
+    Readers are iterators yielding the chunks read from the stream –
+    iterating runs the loop until data is available, so this must not
+    be done from within a callback – and, on Python 3.5 and newer,
+    asynchronous iterators for `async for` loops. Within coroutines
+    chunks are awaited with :func:`uv.coro.StreamReader.read`.
+
+    :raises ValueError:
+        invalid water marks
+
+    :param stream_handle:
+        stream to read from (its read callback is replaced)
+    :param high_water:
+        number of buffered bytes reading is stopped at
+    :param low_water:
+        number of buffered bytes reading is resumed at (defaults to a
+        quarter of `high_water`)
+
+    :type stream_handle:
+        uv.Stream
+    :type high_water:
+        int
+    :type low_water:
+        int | None
+    """
+
+    __slots__ = ['stream', 'high_water', 'low_water', 'chunks', 'size', 'reading',
+                 'eof', 'exception', 'waiter', 'waiter_iterating']
+
+    def __init__(self, stream_handle, high_water=2**16, low_water=None):
+        if low_water is None:
+            low_water = high_water // 4
+        if not 0 <= low_water <= high_water:
+            raise ValueError('water marks must satisfy 0 <= low_water <= high_water')
+        self.stream = stream_handle
+        """
+        Stream the reader reads from.
+
+        :readonly:
+            True
+        :type:
+            uv.Stream
+        """
+        self.high_water = high_water
+        """
+        Number of buffered bytes reading is stopped at.
+
+        :readonly:
+            False
+        :type:
+            int
+        """
+        self.low_water = low_water
+        """
+        Number of buffered bytes reading is resumed at.
+
+        :readonly:
+            False
+        :type:
+            int
+        """
+        self.chunks = collections.deque()
+        self.size = 0
+        """
+        Number of buffered bytes.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.reading = False
+        """
+        Reader is currently reading from the stream.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        self.eof = False
+        self.exception = None
+        self.waiter = None
+        self.waiter_iterating = False
+        stream_handle.on_read = self
+        self._resume()
+
+    def _resume(self):
+        if not self.reading and not self.eof and self.exception is None:
+            if not self.stream.closing:
+                self.reading = True
+                self.stream.read_start()
+
+    def _pause(self):
+        if self.reading:
+            self.reading = False
+            if not self.stream.closing:
+                self.stream.read_stop()
+
+    def __call__(self, stream_handle, status, data):
+        if status == error.StatusCodes.SUCCESS:
+            if not data:
+                return
+            waiter = self.waiter
+            if waiter is not None and not self.chunks:
+                # hand the chunk over without buffering it
+                self.waiter = None
+                waiter.set_result(data)
+                return
+            self.chunks.append(data)
+            self.size += len(data)
+            if self.size >= self.high_water:
+                self._pause()
+        else:
+            if status == error.StatusCodes.EOF:
+                self.eof = True
+            else:
+                self.exception = error.UVError(status)
+            self._pause()
+        if self.waiter is not None:
+            waiter, self.waiter = self.waiter, None
+            self._deliver(waiter, self.waiter_iterating)
+
+    def _deliver(self, future, iterating):
+        if self.chunks:
+            chunk = self.chunks.popleft()
+            self.size -= len(chunk)
+            if self.size <= self.low_water:
+                self._resume()
+            future.set_result(chunk)
+        elif self.exception is not None:
+            future.set_exception(self.exception)
+        elif iterating:
+            future.set_exception(StopAsyncIteration())
+        else:
+            future.set_result(b'')
+
+    def _read(self, iterating):
+        future = Future(self.stream.loop)
+        if self.chunks or self.eof or self.exception is not None:
+            self._deliver(future, iterating)
+        elif self.waiter is not None:
+            raise RuntimeError('another coroutine is already waiting for data')
+        else:
+            self.waiter = future
+            self.waiter_iterating = iterating
+            self._resume()
+        return future
+
+    def read(self):
+        """
+        Read the next chunk of data. The result is `b''` at the end of
+        the stream.
+
+        :raises uv.UVError:
+            error while reading from the stream
+        :raises RuntimeError:
+            another coroutine is already waiting for data
+
+        :rtype:
+            uv.coro.Future[bytes]
+        """
+        return self._read(False)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        loop = self.stream.loop
+        while not (self.chunks or self.eof or self.exception is not None):
+            self._resume()
+            if not loop.run(RunModes.ONCE) and not self.chunks:
+                if not (self.eof or self.exception is not None):
+                    raise RuntimeError('loop ran out of work before the stream ended')
+        future = self._read(False)
+        if future.exception is not None:
+            raise future.exception
+        if not future.result:
+            raise StopIteration()
+        return future.result
+
+    next = __next__
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self._read(True)
+
+
+def read(stream_handle):
+    """
+    Read the next chunk of data from a stream. The result is `b''` at
+    the end of the stream. The first call installs a
+    :class:`uv.coro.StreamReader` with default water marks on the
+    stream.
+
+    :raises uv.UVError:
+        error while reading from the stream
+
+    :param stream_handle:
+        stream to read from
+
+    :type stream_handle:
+        uv.Stream
+
+    :rtype:
+        uv.coro.Future[bytes]
+    """
+    reader = stream_handle.on_read
+    if not isinstance(reader, StreamReader):
+        reader = StreamReader(stream_handle)
+    return reader.read()
+
+
+def write(stream_handle, data):
+    """
+    Write data to a stream. If the data can be written immediately no
+    write request is issued and the returned future is already done.
+
+    :raises uv.UVError:
+        error while writing to the stream
+
+    :param stream_handle:
+        stream to write to
+    :param data:
+        data which should be written
+
+    :type stream_handle:
+        uv.Stream
+    :type data:
+        bytes
+
+    :rtype:
+        uv.coro.Future[None]
+    """
+    future = Future(stream_handle.loop)
+    try:
+        written = stream_handle.try_write(data)
+    except error.TemporaryUnavailableError:
+        written = 0
+    except error.UVError as exception:
+        future.set_exception(exception)
+        return future
+    if written == len(data):
+        future.set_result(None)
+        return future
+
+    def on_write(request, status):
+        if status == error.StatusCodes.SUCCESS:
+            future.set_result(None)
+        else:
+            future.set_exception(error.UVError(status))
+
+    stream_handle.write(data[written:], on_write=on_write)
+    return future
+
+
+def connect(stream_handle, address):
+    """
+    Connect a TCP or pipe handle to the given address or path.
+
+    :raises uv.UVError:
+        error while connecting
+
+    :param stream_handle:
+        stream which should be connected
+    :param address:
+        address or path to connect to
+
+    :type stream_handle:
+        uv.TCP | uv.Pipe
+    :type address:
+        tuple | unicode
+
+    :rtype:
+        uv.coro.Future[None]
+    """
+    future = Future(stream_handle.loop)
+
+    def on_connect(request, status):
+        if status == error.StatusCodes.SUCCESS:
+            future.set_result(None)
+        else:
+            future.set_exception(error.UVError(status))
+
+    stream_handle.connect(address, on_connect=on_connect)
+    return future
+
+
+def shutdown(stream_handle):
+    """
+    Shutdown the outgoing side of a stream after pending writes.
+
+    :param stream_handle:
+        stream which should be shut down
+
+    :type stream_handle:
+        uv.Stream
+
+    :rtype:
+        uv.coro.Future[None]
+    """
+    future = Future(stream_handle.loop)
+
+    def on_shutdown(request, status):
+        if status == error.StatusCodes.SUCCESS:
+            future.set_result(None)
+        else:
+            future.set_exception(error.UVError(status))
+
+    stream_handle.shutdown(on_shutdown=on_shutdown)
+    return future
+
+
+def sleep(seconds, result=None, loop=None):
+    """
+    Complete after `seconds` with `result`.
+
+    :param seconds:
+        number of seconds to sleep
+    :param result:
+        result of the future
+    :param loop:
+        event loop the timer should run on
+
+    :type seconds:
+        float
+    :type result:
+        Any
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.coro.Future[Any]
+    """
+    future = Future(loop)
+
+    def on_timeout(timer_handle):
+        timer_handle.close()
+        future.set_result(result)
+
+    timer.Timer(future.loop, on_timeout=on_timeout).start(int(seconds * 1000))
+    return future
+
+
+def getaddrinfo(host, port, family=0, socktype=0, protocol=0, flags=0, loop=None):
+    """
+    Get address information for specified host and port (service).
+
+    See :class:`uv.dns.GetAddrInfo` for parameter descriptions.
+
+    :rtype:
+        uv.coro.Future[list[uv.AddrInfo]]
+    """
+    future = Future(loop)
+
+    def on_addrinfo(request, status, addrinfo):
+        if status == error.StatusCodes.SUCCESS:
+            future.set_result(addrinfo)
+        else:
+            future.set_exception(error.UVError(status))
+
+    dns.getaddrinfo(host, port, family, socktype, protocol, flags,
+                    callback=on_addrinfo, loop=future.loop)
+    return future
+
+
+def fs(function, *arguments, **keywords):
+    """
+    Call a filesystem function of :mod:`uv.fs` asynchronously. The
+    function is called with the given arguments and a `callback`, the
+    status and results the callback receives become the outcome of the
+    future. A single result is returned as is, multiple results as a
+    tuple.
+
+    .. code-block:: python3
+
+        fd = await uv.coro.fs(uv.fs.open, 'config.json', os.O_RDONLY)
+
+    :param function:
+        filesystem function taking `callback` and `loop` keywords
+    :param arguments:
+        positional arguments of the function
+    :param keywords:
+        keyword arguments of the function
+
+    :type function:
+        callable
+    :type arguments:
+        tuple
+    :type keywords:
+        dict
+
+    :rtype:
+        uv.coro.Future[Any]
+    """
+    future = Future(keywords.get('loop'))
+
+    def callback(request, status, *results):
+        if status != error.StatusCodes.SUCCESS:
+            future.set_exception(error.UVError(status))
+        elif len(results) == 1:
+            future.set_result(results[0])
+        else:
+            future.set_result(results or None)
+
+    keywords['loop'] = future.loop
+    try:
+        function(*arguments, callback=callback, **keywords)
+    except error.UVError as exception:
+        future.set_exception(exception)
+    return future
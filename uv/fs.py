@@ -15,10 +15,19 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import collections
+import functools
+import mmap
+import numbers
+import os
+
 from collections import namedtuple
 
-from . import common, error, handle, library, request
+from . import base, common, error, handle, library, request
+from .handles.fs_event import FSEvent, FSEvents
+from .handles.timer import Timer
 from .library import ffi, lib
+from .loop import Loop
 
 Timespec = namedtuple('Timespec', ['sec', 'nsec'])
 
@@ -28,8 +37,6 @@ Stat = namedtuple('Stat', ['dev', 'mode', 'nlink', 'uid', 'gid', 'rdev',
 
 Dirent = namedtuple('Dirent', ['name', 'type'])
 
-requests = set()
-
 
 def unpack_timespec(uv_timespec):
     return Timespec(uv_timespec.tv_sec, uv_timespec.tv_nsec)
@@ -44,7 +51,7 @@ def unpack_stat(uv_stat):
 
 
 def unpack_dirent(uv_dirent):
-    return Dirent(ffi.string(uv_dirent.name).decode(), DirentType(uv_dirent.type))
+    return Dirent(_fs_decode(ffi.string(uv_dirent.name)), DirentType(uv_dirent.type))
 
 
 class FSType(common.Enumeration):
@@ -82,6 +89,10 @@ class FSType(common.Enumeration):
         self.postprocessor = postprocessor
         return postprocessor
 
+    @staticmethod
+    def postprocessor(fs_request):
+        return None
+
 
 class DirentType(common.Enumeration):
     UNKNOWN = lib.UV_DIRENT_UNKNOWN
@@ -94,115 +105,2955 @@ class DirentType(common.Enumeration):
     BLOCK = lib.UV_DIRENT_BLOCK
 
 
+try:
+    _fs_encode, _fs_decode = os.fsencode, os.fsdecode
+except AttributeError:  # pragma: no cover
+    def _fs_encode(path):
+        return path.encode('utf-8')
+
+    def _fs_decode(path):
+        return path.decode('utf-8', 'replace')
+
+
+def _c_path(path):
+    # names which are not valid in the filesystem encoding round trip
+    return path if isinstance(path, bytes) else _fs_encode(path)
+
+
+def _fs_submit(uv_loop, uv_fs, function, *arguments):
+    code = function(uv_loop, uv_fs, *arguments)
+    if code < 0:
+        lib.uv_fs_req_cleanup(uv_fs)
+        return code
+    # synchronous requests return their result instead of zero
+    return error.StatusCodes.SUCCESS
+
+
+@base.request_callback('uv_fs_cb')
+def uv_fs_cb(fs_request):
+    """
+    :type fs_request:
+        uv.FSRequest
+    """
+    fs_request.populate()
+    fs_request.callback(fs_request, fs_request.status, fs_request.result)
+
+
 @request.RequestType.FS
 class FSRequest(request.Request):
-    __slots__ = ['uv_fs', 'data', 'callback']
+    """
+    Request to perform a filesystem operation on libuv's threadpool. If
+    no callback is provided the request is executed synchronously and
+    blocks the loop.
+
+    The result of the operation is computed by the postprocessor which
+    has been registered for the respective :class:`uv.fs.FSType`, unless
+    another one is given. If the result can not be computed the request
+    fails with an error status instead. You
+    should not instantiate this class directly but use the functions
+    provided by this module instead.
 
-    def __init__(self, data=None, callback=None, loop=None):
-        self.uv_fs = ffi.new('uv_fs_t*')
-        super(FSRequest, self).__init__(self.uv_fs, loop)
-        self.data = data
+    :raises uv.UVError:
+        error while initializing the request or synchronous operation
+        failed
+
+    :param function:
+        libuv filesystem function to call
+    :param arguments:
+        arguments for the function without loop, request and callback
+    :param pinned:
+        objects which must stay alive while the request is pending
+    :param buffer:
+        internal buffer reads are performed into
+    :param callback:
+        callback which should be called after the operation has been
+        completed or on error
+    :param loop:
+        event loop the request should run on
+    :param postprocessor:
+        function computing the result instead of the registered one
+
+    :type function:
+        ffi.CData
+    :type arguments:
+        tuple
+    :type pinned:
+        Any
+    :type buffer:
+        ffi.CData[char[]] | None
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, Any) -> None) | None
+    :type loop:
+        uv.Loop
+    :type postprocessor:
+        ((uv.FSRequest) -> Any) | None
+    """
+
+    __slots__ = ['uv_fs', 'callback', 'pinned', 'buffer', 'postprocessor', 'status',
+                 'result']
+
+    uv_request_type = 'uv_fs_t*'
+
+    def __init__(self, function, arguments, pinned=None, buffer=None, callback=None,
+                 loop=None, postprocessor=None):
         self.callback = callback or common.dummy_callback
-        requests.add(self)
+        """
+        Callback which should be called after the operation has been
+        completed or on error.
 
-    @property
-    def result(self):
-        return self.uv_fs.result
 
-    @property
-    def ptr(self):
-        return self.uv_fs.ptr
+        .. function:: callback(request, status, result)
 
-    @property
-    def path(self):
-        return ffi.string(self.uv_fs.path).decode()
+            :param request:
+                request the call originates from
+            :param status:
+                status of the request
+            :param result:
+                result of the operation or `None`
+
+            :type request:
+                uv.FSRequest
+            :type status:
+                uv.StatusCodes
+            :type result:
+                Any
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.FSRequest, uv.StatusCodes, Any) -> None) |
+            ((Any, uv.FSRequest, uv.StatusCodes, Any) -> None)
+        """
+        self.pinned = pinned
+        self.buffer = buffer
+        self.postprocessor = postprocessor
+        self.status = None
+        """
+        Status of the operation, `None` as long as it is pending.
+
+        :readonly:
+            True
+        :type:
+            uv.StatusCodes | None
+        """
+        self.result = None
+        """
+        Result of the operation, `None` as long as it is pending, if the
+        operation has failed or if it does not have a result.
+
+        :readonly:
+            True
+        :type:
+            Any
+        """
+
+        uv_callback = ffi.NULL if callback is None else uv_fs_cb
+        arguments = (function, ) + tuple(arguments) + (uv_callback, )
+        super(FSRequest, self).__init__(loop, arguments, request_init=_fs_submit)
+        self.uv_fs = self.base_request.uv_object
+        if callback is None:
+            try:
+                self.populate()
+            finally:
+                base.finalize_request(self)
 
     @property
     def fs_type(self):
+        """
+        Type of the filesystem operation.
+
+        :readonly:
+            True
+        :rtype:
+            uv.fs.FSType
+        """
         return FSType(self.uv_fs.fs_type)
 
     @property
-    def stat(self):
-        return unpack_stat(self.uv_fs.statbuf)
+    def path(self):
+        """
+        Path the operation has been performed on or `None`.
+
+        :readonly:
+            True
+        :rtype:
+            unicode | None
+        """
+        return _fs_decode(ffi.string(self.uv_fs.path)) if self.uv_fs.path else None
+
+    def populate(self):
+        """
+        Compute status and result and release libuv's resources.
+
+        .. warning::
+            Only for internal purposes!
+        """
+        try:
+            if self.uv_fs.result < 0:
+                self.status = error.StatusCodes.get(self.uv_fs.result)
+            else:
+                postprocessor = self.postprocessor or self.fs_type.postprocessor
+                self.status = error.StatusCodes.SUCCESS
+                self.result = postprocessor(self)
+        except error.UVError as uv_error:
+            self.status, self.result = uv_error.code, None
+        except MemoryError:
+            self.status, self.result = error.StatusCodes.ENOMEM, None
+        finally:
+            lib.uv_fs_req_cleanup(self.uv_fs)
+            self.pinned = None
+            self.buffer = None
+
+
+@FSType.OPEN
+def post_open(fs_request):
+    return fs_request.uv_fs.result
 
 
-@FSType.CLOSE
-def post_close(request):
-    status = error.StatusCodes.get(request.result)
-    return [status]
+@FSType.READ
+def post_read(fs_request):
+    if fs_request.buffer is None:
+        return fs_request.uv_fs.result
+    return ffi.buffer(fs_request.buffer, fs_request.uv_fs.result)[:]
 
 
+@FSType.WRITE
+def post_write(fs_request):
+    return fs_request.uv_fs.result
 
 
+@FSType.SENDFILE
+def post_sendfile(fs_request):
+    return fs_request.uv_fs.result
+
 
 @FSType.STAT
-def post_stat(request):
-    status = error.StatusCodes.get(request.result)
-    return [status, request.stat]
+def post_stat(fs_request):
+    return unpack_stat(fs_request.uv_fs.statbuf)
+
+
+FSType.LSTAT(post_stat)
+FSType.FSTAT(post_stat)
+
+
+@FSType.MKDTEMP
+def post_mkdtemp(fs_request):
+    return fs_request.path
+
 
+_dirent_types = dict((str(int(member)).encode(), member) for member in DirentType)
 
-@ffi.callback('uv_fs_cb')
-def fs_callback(uv_request):
-    fs_request = library.detach(uv_request)
-    """ :type: uv.FSRequest """
+
+def post_scandir_bytes(fs_request):
+    # fetch all entries with a single call instead of one per entry
+    c_length = ffi.new('size_t*')
+    c_blob = lib.cross_uv_fs_scandir_blob(fs_request.uv_fs, c_length)
+    if not c_blob:
+        raise MemoryError()
     try:
-        fs_request.callback(fs_request, *fs_request.fs_type.postprocessor(fs_request))
-    except:
-        fs_request.loop.handle_exception()
-    lib.uv_fs_req_cleanup(uv_request)
-    fs_request.set_closed()
+        blob = ffi.buffer(c_blob, c_length[0])[:]
+    finally:
+        lib.cross_free(c_blob)
+    return [Dirent(record[1:], _dirent_types.get(record[:1], DirentType.UNKNOWN))
+            for record in blob.split(b'\0')[:-1]]
 
 
-def close(fd, callback=None, loop=None):
-    request = FSRequest(None, callback, loop)
-    code = lib.cross_uv_fs_close(request.loop.uv_loop, request.uv_fs, fd, fs_callback)
-    if code != error.StatusCodes.SUCCESS:
-        raise error.UVError(code)
-    return request
+@FSType.SCANDIR
+def post_scandir(fs_request):
+    return [Dirent(_fs_decode(name), dirent_type)
+            for name, dirent_type in post_scandir_bytes(fs_request)]
 
 
-@FSType.OPEN
-def post_open(request):
-    if request.result < 0: status, fd = error.StatusCodes.get(request.result), None
-    else: status, fd = error.StatusCodes.SUCCESS, request.result
-    return [status, fd]
+@FSType.READLINK
+def post_readlink(fs_request):
+    return _fs_decode(ffi.string(ffi.cast('char*', fs_request.uv_fs.ptr)))
+
+
+def _finish(fs_request, callback):
+    if callback is not None:
+        return fs_request
+    if fs_request.status != error.StatusCodes.SUCCESS:
+        raise error.UVError(fs_request.status)
+    return fs_request.result
 
 
 def open(path, flags, mode=0o777, callback=None, loop=None):
     """
+    Open a file and return its file descriptor.
 
     :param path:
+        path of the file
     :param flags:
+        flags to open the file with, see :mod:`os`
     :param mode:
-    :param callback: callback signature: `(request, status, fd)`
+        mode to create the file with
+    :param callback:
+        callback which should be called with the file descriptor
+    :param loop:
+        event loop the request should run on
+
+    :type path:
+        unicode | bytes
+    :type flags:
+        int
+    :type mode:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, int) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | int
+    """
+    fs_request = FSRequest(lib.uv_fs_open, (_c_path(path), flags, mode),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def close(fd, callback=None, loop=None):
+    """
+    Close a file descriptor.
+
+    :type fd:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_close, (fd, ), callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def read(fd, size_or_buffer, offset=-1, callback=None, loop=None):
+    """
+    Read from a file descriptor. If an integer is passed the data is
+    read into a new buffer of that size and the result is the data
+    which has been read. Otherwise the data is read directly into the
+    provided writable buffer, without any copying, and the result is
+    the number of bytes which have been read. The buffer must not be
+    modified or resized until the request has been completed.
+
+    :param fd:
+        file descriptor to read from
+    :param size_or_buffer:
+        maximal number of bytes to read or buffer to read into
+    :param offset:
+        position to read from, `-1` reads from the current position
+    :param callback:
+        callback which should be called with the result
+    :param loop:
+        event loop the request should run on
+
+    :type fd:
+        int
+    :type size_or_buffer:
+        int | bytearray | memoryview
+    :type offset:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, bytes | int) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | bytes | int
+    """
+    if isinstance(size_or_buffer, numbers.Integral):
+        c_buffer = buffer = ffi.new('char[]', size_or_buffer)
+    else:
+        c_buffer, buffer = ffi.from_buffer(size_or_buffer), None
+    uv_buffers = ffi.new('uv_buf_t[1]')
+    library.uv_buffer_set(uv_buffers, c_buffer, len(c_buffer))
+    fs_request = FSRequest(lib.cross_uv_fs_read, (fd, uv_buffers, 1, offset),
+                           (uv_buffers, c_buffer), buffer, callback, loop)
+    return _finish(fs_request, callback)
+
+
+def write(fd, data, offset=-1, callback=None, loop=None):
+    """
+    Write to a file descriptor. The data is not copied, a list of
+    buffers is written with a single vectored write. The buffers must
+    not be modified until the request has been completed.
+
+    :param fd:
+        file descriptor to write to
+    :param data:
+        buffer or list of buffers to write
+    :param offset:
+        position to write at, `-1` writes at the current position
+    :param callback:
+        callback which should be called with the number of bytes
+        which have been written
     :param loop:
+        event loop the request should run on
+
+    :type fd:
+        int
+    :type data:
+        bytes | bytearray | memoryview | list[bytes]
+    :type offset:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, int) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | int
+    """
+    if not isinstance(data, (list, tuple)):
+        data = (data, )
+    c_buffers = [ffi.from_buffer(item) for item in data]
+    uv_buffers = ffi.new('uv_buf_t[]', len(c_buffers))
+    for index, c_buffer in enumerate(c_buffers):
+        library.uv_buffer_set(uv_buffers + index, c_buffer, len(c_buffer))
+    fs_request = FSRequest(lib.cross_uv_fs_write,
+                           (fd, uv_buffers, len(c_buffers), offset),
+                           (uv_buffers, c_buffers), None, callback, loop)
+    return _finish(fs_request, callback)
+
 
-    :type path: str
-    :type flags: int
-    :type mode: int
-    :type callback: (FSRequest, int, int) -> None
+def sendfile(out_fd, in_fd, offset, length, callback=None, loop=None):
+    """
+    Copy data from one file descriptor to another without passing it
+    through user space, if supported by the platform.
+
+    :param out_fd:
+        file descriptor to write to
+    :param in_fd:
+        file descriptor to read from
+    :param offset:
+        position to read from
+    :param length:
+        maximal number of bytes to copy
 
-    :return:
+    :type out_fd:
+        int
+    :type in_fd:
+        int
+    :type offset:
+        int
+    :type length:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, int) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | int
     """
-    fs_request = FSRequest(None, callback, loop)
-    uv_fs = request.uv_fs
-    c_path = path.encode()
-    code = lib.uv_fs_open(fs_request.loop.uv_loop, uv_fs, c_path, flags, mode,
-                          fs_callback)
-    if code != error.StatusCodes.SUCCESS:
-        raise error.UVError(code)
-    return request
+    fs_request = FSRequest(lib.cross_uv_fs_sendfile, (out_fd, in_fd, offset, length),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
 
 
 def stat(path, callback=None, loop=None):
-    fs_request = FSRequest(callback=callback, loop=loop)
-    code = lib.uv_fs_stat(fs_request.loop.uv_loop, fs_request.uv_fs, path.encode(),
-                          fs_callback)
-    if code != error.StatusCodes.SUCCESS:
-        raise error.UVError(code)
-    return request
+    """
+    Get information about a file, following symbolic links.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, uv.fs.Stat) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | uv.fs.Stat
+    """
+    fs_request = FSRequest(lib.uv_fs_stat, (_c_path(path), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def lstat(path, callback=None, loop=None):
+    """
+    Get information about a file without following symbolic links.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, uv.fs.Stat) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | uv.fs.Stat
+    """
+    fs_request = FSRequest(lib.uv_fs_lstat, (_c_path(path), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def fstat(fd, callback=None, loop=None):
+    """
+    Get information about an open file descriptor.
+
+    :type fd:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, uv.fs.Stat) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | uv.fs.Stat
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_fstat, (fd, ), callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def fsync(fd, callback=None, loop=None):
+    """
+    Flush data and metadata of a file descriptor to the storage device.
+
+    :type fd:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_fsync, (fd, ), callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def fdatasync(fd, callback=None, loop=None):
+    """
+    Flush the data of a file descriptor to the storage device, without
+    metadata which is not needed to read the data back.
+
+    :type fd:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_fdatasync, (fd, ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def ftruncate(fd, length=0, callback=None, loop=None):
+    """
+    Truncate or extend a file descriptor to the given length.
+
+    :type fd:
+        int
+    :type length:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_ftruncate, (fd, length),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def rename(path, new_path, callback=None, loop=None):
+    """
+    Rename a file or directory.
+
+    :type path:
+        unicode | bytes
+    :type new_path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_rename, (_c_path(path), _c_path(new_path)),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def unlink(path, callback=None, loop=None):
+    """
+    Remove a file.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_unlink, (_c_path(path), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def mkdir(path, mode=0o777, callback=None, loop=None):
+    """
+    Create a directory.
+
+    :type path:
+        unicode | bytes
+    :type mode:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_mkdir, (_c_path(path), mode),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def mkdtemp(template, callback=None, loop=None):
+    """
+    Create a unique temporary directory and return its path. The
+    template has to end with `XXXXXX`.
+
+    :type template:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, unicode) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | unicode
+    """
+    fs_request = FSRequest(lib.uv_fs_mkdtemp, (_c_path(template), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def rmdir(path, callback=None, loop=None):
+    """
+    Remove an empty directory.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_rmdir, (_c_path(path), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def scandir(path, callback=None, loop=None):
+    """
+    List the entries of a directory. Names are bytes if `path` is bytes
+    and decoded with :func:`os.fsdecode` otherwise, so names which are
+    not valid in the filesystem encoding do not get lost.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, list[uv.fs.Dirent]) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | list[uv.fs.Dirent]
+    """
+    postprocessor = post_scandir_bytes if isinstance(path, bytes) else None
+    fs_request = FSRequest(lib.uv_fs_scandir, (_c_path(path), 0), callback=callback,
+                           loop=loop, postprocessor=postprocessor)
+    return _finish(fs_request, callback)
+
+
+def readlink(path, callback=None, loop=None):
+    """
+    Read the target of a symbolic link.
+
+    :type path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, unicode) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | unicode
+    """
+    fs_request = FSRequest(lib.uv_fs_readlink, (_c_path(path), ),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def link(path, new_path, callback=None, loop=None):
+    """
+    Create a hard link.
+
+    :type path:
+        unicode | bytes
+    :type new_path:
+        unicode | bytes
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_link, (_c_path(path), _c_path(new_path)),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def symlink(path, new_path, flags=0, callback=None, loop=None):
+    """
+    Create a symbolic link at `new_path` pointing to `path`.
+
+    :type path:
+        unicode | bytes
+    :type new_path:
+        unicode | bytes
+    :type flags:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_symlink, (_c_path(path), _c_path(new_path), flags),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def access(path, mode, callback=None, loop=None):
+    """
+    Check the accessibility of a file, see :func:`os.access`. Fails
+    with an error if the file is not accessible.
+
+    :type path:
+        unicode | bytes
+    :type mode:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_access, (_c_path(path), mode),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def chmod(path, mode, callback=None, loop=None):
+    """
+    Change the mode of a file.
+
+    :type path:
+        unicode | bytes
+    :type mode:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_chmod, (_c_path(path), mode),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def fchmod(fd, mode, callback=None, loop=None):
+    """
+    Change the mode of an open file descriptor.
+
+    :type fd:
+        int
+    :type mode:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_fchmod, (fd, mode),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def utime(path, atime, mtime, callback=None, loop=None):
+    """
+    Change the access and modification time of a file.
+
+    :type path:
+        unicode | bytes
+    :type atime:
+        float
+    :type mtime:
+        float
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.uv_fs_utime, (_c_path(path), atime, mtime),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def futime(fd, atime, mtime, callback=None, loop=None):
+    """
+    Change the access and modification time of an open file descriptor.
+
+    :type fd:
+        int
+    :type atime:
+        float
+    :type mtime:
+        float
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_futime, (fd, atime, mtime),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def chown(path, uid, gid, callback=None, loop=None):
+    """
+    Change the owner and group of a file.
+
+    :type path:
+        unicode | bytes
+    :type uid:
+        int
+    :type gid:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_chown, (_c_path(path), uid, gid),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+def fchown(fd, uid, gid, callback=None, loop=None):
+    """
+    Change the owner and group of an open file descriptor.
+
+    :type fd:
+        int
+    :type uid:
+        int
+    :type gid:
+        int
+    :type callback:
+        ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.FSRequest | None
+    """
+    fs_request = FSRequest(lib.cross_uv_fs_fchown, (fd, uid, gid),
+                           callback=callback, loop=loop)
+    return _finish(fs_request, callback)
+
+
+class BufferPool(object):
+    """
+    Pool of equally sized read buffers. Reading into pooled buffers
+    avoids allocating and copying a new buffer for every chunk read.
+
+    :param buffer_size:
+        size of the buffers
+    :param capacity:
+        maximal number of unused buffers kept in the pool
+
+    :type buffer_size:
+        int
+    :type capacity:
+        int
+    """
+
+    __slots__ = ['buffer_size', 'capacity', 'buffers']
+
+    def __init__(self, buffer_size=2**16, capacity=16):
+        self.buffer_size = buffer_size
+        self.capacity = capacity
+        self.buffers = []
+
+    def acquire(self, size=None):
+        """
+        Get a buffer of at least the given size from the pool.
+
+        :type size:
+            int | None
+
+        :rtype:
+            bytearray
+        """
+        if size is not None and size > self.buffer_size:
+            return bytearray(size)
+        return self.buffers.pop() if self.buffers else bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        """
+        Return a buffer to the pool.
+
+        :type buffer:
+            bytearray
+        """
+        if len(buffer) == self.buffer_size and len(self.buffers) < self.capacity:
+            self.buffers.append(buffer)
+
+
+class AlignedAllocator(BufferPool):
+    """
+    Pool of buffers whose addresses and sizes are multiples of the
+    alignment, as required for unbuffered I/O with :data:`os.O_DIRECT`.
+    The memory is allocated outside of Python's heap and released once
+    the last reference to a buffer is gone. Buffers are writable
+    objects supporting the buffer protocol.
+
+    :param buffer_size:
+        size of the pooled buffers, rounded up to the alignment
+    :param capacity:
+        maximal number of unused buffers kept in the pool
+    :param alignment:
+        alignment of buffer addresses and sizes, a power of two
+
+    :type buffer_size:
+        int
+    :type capacity:
+        int
+    :type alignment:
+        int
+    """
+
+    __slots__ = ['alignment']
+
+    def __init__(self, buffer_size=2**20, capacity=16, alignment=mmap.PAGESIZE):
+        if alignment <= 0 or alignment & (alignment - 1):
+            raise ValueError('alignment has to be a power of two')
+        self.alignment = alignment
+        super(AlignedAllocator, self).__init__(self.align(buffer_size), capacity)
+
+    def align(self, size):
+        """
+        Round a size up to the next multiple of the alignment.
+
+        :type size:
+            int
+
+        :rtype:
+            int
+        """
+        return max(self.alignment, -(-size // self.alignment) * self.alignment)
+
+    def allocate(self, size):
+        """
+        Allocate a new aligned buffer bypassing the pool.
+
+        :param size:
+            size of the buffer, rounded up to the alignment
+
+        :type size:
+            int
+
+        :raises MemoryError:
+            if the memory could not be allocated
+        :rtype:
+            _cffi_backend.buffer
+        """
+        size = self.align(size)
+        c_buffer = lib.cross_aligned_alloc(self.alignment, size)
+        if c_buffer == ffi.NULL:
+            raise MemoryError()
+        return ffi.buffer(ffi.gc(ffi.cast('char*', c_buffer), lib.cross_aligned_free),
+                          size)
+
+    def acquire(self, size=None):
+        """
+        Get an aligned buffer of at least the given size, which is
+        rounded up to the alignment.
+
+        :type size:
+            int | None
+
+        :rtype:
+            _cffi_backend.buffer
+        """
+        if size is not None and self.align(size) > self.buffer_size:
+            return self.allocate(size)
+        return self.buffers.pop() if self.buffers else self.allocate(self.buffer_size)
 
 
 @handle.HandleTypes.FILE
 class File(object):
-    pass
+    """
+    Asynchronous file based on an open file descriptor. All operations
+    run on libuv's threadpool if a callback is provided and block the
+    loop otherwise.
+
+    With a :class:`uv.fs.BufferPool` reads go into pooled buffers and
+    the read callbacks receive a :class:`memoryview` which is only
+    valid until the callback returns, the buffer is reused afterwards.
+    Without a pool the callbacks receive :class:`bytes`.
+
+    Files opened with :data:`os.O_DIRECT` bypass the page cache and
+    require buffer addresses, sizes and positions to be aligned. In
+    direct mode reads go through an :class:`uv.fs.AlignedAllocator` and
+    are widened to aligned boundaries, writes are copied into aligned
+    buffers unless they already are aligned. The unaligned tail of a
+    write is written through a second descriptor of the same file
+    opened without :data:`os.O_DIRECT`. Direct mode always requires
+    explicit positions.
+
+    :param fd:
+        open file descriptor
+    :param path:
+        path the file descriptor has been opened with
+    :param pool:
+        buffer pool for reads
+    :param loop:
+        event loop the file operations should run on
+    :param direct:
+        whether the file descriptor has been opened with
+        :data:`os.O_DIRECT`
+    :param buffered_fd:
+        descriptor of the same file opened without :data:`os.O_DIRECT`
+        used for unaligned writes in direct mode
+
+    :type fd:
+        int
+    :type path:
+        unicode | bytes | None
+    :type pool:
+        uv.fs.BufferPool | None
+    :type loop:
+        uv.Loop
+    :type direct:
+        bool
+    :type buffered_fd:
+        int | None
+    """
+
+    __slots__ = ['fd', 'path', 'pool', 'loop', 'closed', 'direct', 'buffered_fd',
+                 'on_read', 'reading', 'eof', 'chunk_size', 'depth', 'max_depth',
+                 'pending', 'completed', 'issue_offset', 'deliver_offset', 'direction',
+                 'window_bytes', 'window_start', 'last_rate']
+
+    def __init__(self, fd, path=None, pool=None, loop=None, direct=False,
+                 buffered_fd=None):
+        self.fd = fd
+        """
+        Underlying file descriptor.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.path = path
+        if direct and not isinstance(pool, AlignedAllocator):
+            pool = AlignedAllocator()
+        self.pool = pool
+        self.loop = loop or Loop.get_current()
+        self.closed = False
+        self.direct = direct
+        """
+        Whether the file bypasses the page cache.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        self.buffered_fd = buffered_fd
+
+        self.on_read = common.dummy_callback
+        self.reading = False
+        self.eof = False
+        self.chunk_size = 2**16
+        self.depth = 1
+        """
+        Current number of read requests kept in flight by the sequential
+        reading mode, adapted to the measured throughput.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.max_depth = 8
+        self.pending = 0
+        self.completed = {}
+        self.issue_offset = 0
+        self.deliver_offset = 0
+        self.direction = 1
+        self.window_bytes = 0
+        self.window_start = 0
+        self.last_rate = 0
+
+    @classmethod
+    def open(cls, path, flags=os.O_RDONLY, mode=0o644, pool=None, callback=None,
+             loop=None, direct=False):
+        """
+        Open a file. If a callback is provided it is called with the
+        file, or `None` on error, and a status code.
+
+        :param path:
+            path of the file
+        :param flags:
+            flags to open the file with, see :mod:`os`
+        :param mode:
+            mode to create the file with
+        :param pool:
+            buffer pool for reads
+        :param callback:
+            callback which should be called after the file has been
+            opened or on error
+        :param loop:
+            event loop the file operations should run on
+        :param direct:
+            bypass the page cache by opening the file with
+            :data:`os.O_DIRECT`
+
+        :raises uv.error.UVError:
+            :attr:`uv.StatusCodes.ENOTSUP` if direct I/O is not
+            supported by the platform
+
+        :type path:
+            unicode | bytes
+        :type flags:
+            int
+        :type mode:
+            int
+        :type pool:
+            uv.fs.BufferPool | None
+        :type callback:
+            ((uv.fs.File | None, uv.StatusCodes) -> None) | None
+        :type loop:
+            uv.Loop
+        :type direct:
+            bool
+
+        :rtype:
+            uv.fs.File | uv.FSRequest
+        """
+        loop = loop or Loop.get_current()
+        if not direct:
+            if callback is None:
+                return cls(open(path, flags, mode, loop=loop), path, pool, loop)
+
+            def on_open(request, status, fd):
+                callback(None if fd is None else cls(fd, path, pool, loop), status)
+
+            return open(path, flags, mode, callback=on_open, loop=loop)
+        if not hasattr(os, 'O_DIRECT'):
+            raise error.UVError(error.StatusCodes.ENOTSUP)
+        writable = flags & (os.O_WRONLY | os.O_RDWR)
+        if callback is None:
+            fd = open(path, flags | os.O_DIRECT, mode, loop=loop)
+            try:
+                buffered_fd = open(path, os.O_WRONLY, loop=loop) if writable else None
+            except error.UVError:
+                close(fd, loop=loop)
+                raise
+            return cls(fd, path, pool, loop, True, buffered_fd)
+
+        def on_buffered_open(fd, request, status, buffered_fd):
+            if buffered_fd is None:
+                close(fd, callback=common.dummy_callback, loop=loop)
+                callback(None, status)
+            else:
+                callback(cls(fd, path, pool, loop, True, buffered_fd), status)
+
+        def on_direct_open(request, status, fd):
+            if fd is None:
+                callback(None, status)
+            elif writable:
+                open(path, os.O_WRONLY, callback=functools.partial(on_buffered_open, fd),
+                     loop=loop)
+            else:
+                callback(cls(fd, path, pool, loop, True), status)
+
+        return open(path, flags | os.O_DIRECT, mode, callback=on_direct_open, loop=loop)
+
+    def fileno(self):
+        """
+        :rtype:
+            int
+        """
+        return self.fd
+
+    def read(self, size, offset=-1, buffer=None, callback=None):
+        """
+        Read from the file. Data is read into the provided buffer, into
+        a pooled buffer or into a new buffer, in this order. If no
+        callback is provided the read blocks and returns the number of
+        bytes read into the provided buffer or the data.
+
+        :param size:
+            maximal number of bytes to read
+        :param offset:
+            position to read from, `-1` reads from the current position
+        :param buffer:
+            writable buffer to read into
+        :param callback:
+            callback which should be called with the number of bytes
+            read into the provided buffer or the data
+
+        :type size:
+            int
+        :type offset:
+            int
+        :type buffer:
+            bytearray | memoryview | None
+        :type callback:
+            ((uv.fs.File, uv.StatusCodes, int | bytes | memoryview) -> None) | None
+
+        :rtype:
+            uv.FSRequest | int | bytes
+        """
+        if self.direct:
+            return self._read_direct(size, offset, buffer, callback)
+        if buffer is not None:
+            target = memoryview(buffer)[:size]
+            if callback is None:
+                return read(self.fd, target, offset, loop=self.loop)
+            on_read = lambda request, status, count: callback(self, status, count)
+            return read(self.fd, target, offset, callback=on_read, loop=self.loop)
+        if callback is None or self.pool is None:
+            if callback is None:
+                return read(self.fd, size, offset, loop=self.loop)
+            on_read = lambda request, status, data: callback(self, status, data)
+            return read(self.fd, size, offset, callback=on_read, loop=self.loop)
+        pooled = self.pool.acquire(size)
+
+        def on_pooled_read(request, status, count):
+            try:
+                data = None if count is None else memoryview(pooled)[:count]
+                callback(self, status, data)
+            finally:
+                self.pool.release(pooled)
+
+        return read(self.fd, memoryview(pooled)[:size], offset, callback=on_pooled_read,
+                    loop=self.loop)
+
+    def write(self, data, offset=-1, callback=None):
+        """
+        Write to the file. The data is not copied and must not be
+        modified until the write has been completed.
+
+        :param data:
+            buffer or list of buffers to write
+        :param offset:
+            position to write at, `-1` writes at the current position
+        :param callback:
+            callback which should be called with the number of bytes
+            which have been written
+
+        :type data:
+            bytes | bytearray | memoryview | list[bytes]
+        :type offset:
+            int
+        :type callback:
+            ((uv.fs.File, uv.StatusCodes, int) -> None) | None
+
+        :rtype:
+            uv.FSRequest | int
+        """
+        if self.direct:
+            return self._write_direct(data, offset, callback)
+        if callback is None:
+            return write(self.fd, data, offset, loop=self.loop)
+        on_write = lambda request, status, written: callback(self, status, written)
+        return write(self.fd, data, offset, callback=on_write, loop=self.loop)
+
+    def _read_direct(self, size, offset, buffer, callback):
+        if offset < 0:
+            raise error.UVError(error.StatusCodes.EINVAL)
+        start = offset - offset % self.pool.alignment
+        skip = offset - start
+        aligned = self.pool.acquire(skip + size)
+        target = memoryview(aligned)[:self.pool.align(skip + size)]
+
+        def extract(count):
+            data = memoryview(aligned)[skip:max(skip, min(count, skip + size))]
+            if buffer is None:
+                return data
+            memoryview(buffer)[:len(data)] = data
+            return len(data)
+
+        if callback is None:
+            try:
+                data = extract(read(self.fd, target, start, loop=self.loop))
+                return data if buffer is not None else data.tobytes()
+            finally:
+                self.pool.release(aligned)
+
+        def on_direct_read(request, status, count):
+            try:
+                callback(self, status, None if count is None else extract(count))
+            finally:
+                self.pool.release(aligned)
+
+        return read(self.fd, target, start, callback=on_direct_read, loop=self.loop)
+
+    def _write_direct(self, data, offset, callback):
+        if offset < 0:
+            raise error.UVError(error.StatusCodes.EINVAL)
+        if not isinstance(data, (list, tuple)):
+            data = (data, )
+        data = [memoryview(item) for item in data]
+        alignment = self.pool.alignment
+        total = sum(len(item) for item in data)
+        head = 0 if offset % alignment else total - total % alignment
+        if head < total and self.buffered_fd is None:
+            raise error.UVError(error.StatusCodes.EINVAL)
+        writes = []
+        if head:
+            address = int(ffi.cast('uintptr_t', ffi.from_buffer(data[0])))
+            if len(data) == 1 and not address % alignment:
+                aligned = data[0][:head]
+            else:
+                aligned, position = memoryview(self.pool.allocate(head)), 0
+                for item in data:
+                    length = min(len(item), head - position)
+                    aligned[position:position + length] = item[:length]
+                    position += length
+            writes.append((self.fd, aligned, offset))
+        if head < total:
+            tail, position = [], 0
+            for item in data:
+                if position + len(item) > head:
+                    tail.append(item[max(0, head - position):])
+                position += len(item)
+            writes.append((self.buffered_fd, tail, offset + head))
+        if callback is None:
+            return sum(write(fd, chunk, position, loop=self.loop)
+                       for fd, chunk, position in writes)
+        if not writes:
+            callback(self, error.StatusCodes.SUCCESS, 0)
+            return
+        results = []
+
+        def on_direct_write(request, status, written):
+            results.append((status, written))
+            if len(results) < len(writes):
+                return
+            failed = [status for status, _ in results
+                      if status != error.StatusCodes.SUCCESS]
+            written = sum(written for status, written in results
+                          if status == error.StatusCodes.SUCCESS)
+            callback(self, failed[0] if failed else error.StatusCodes.SUCCESS, written)
+
+        for fd, chunk, position in writes:
+            request = write(fd, chunk, position, callback=on_direct_write, loop=self.loop)
+        return request
+
+    def stat(self, callback=None):
+        """
+        Get information about the file.
+
+        :type callback:
+            ((uv.FSRequest, uv.StatusCodes, uv.fs.Stat) -> None) | None
+
+        :rtype:
+            uv.FSRequest | uv.fs.Stat
+        """
+        return fstat(self.fd, callback=callback, loop=self.loop)
+
+    def sync(self, callback=None):
+        """
+        Flush the file's data to the storage device.
+
+        :type callback:
+            ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+
+        :rtype:
+            uv.FSRequest | None
+        """
+        return fdatasync(self.fd, callback=callback, loop=self.loop)
+
+    def truncate(self, length=0, callback=None):
+        """
+        Truncate or extend the file to the given length.
+
+        :type length:
+            int
+        :type callback:
+            ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+
+        :rtype:
+            uv.FSRequest | None
+        """
+        return ftruncate(self.fd, length, callback=callback, loop=self.loop)
+
+    def close(self, callback=None):
+        """
+        Stop reading and close the file. Results of reads which are
+        still in flight are discarded.
+
+        :type callback:
+            ((uv.FSRequest, uv.StatusCodes, None) -> None) | None
+
+        :rtype:
+            uv.FSRequest | None
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.read_stop()
+        self.completed.clear()
+        if self.buffered_fd is not None:
+            if callback is None:
+                close(self.buffered_fd, loop=self.loop)
+            else:
+                close(self.buffered_fd, callback=common.dummy_callback, loop=self.loop)
+        return close(self.fd, callback=callback, loop=self.loop)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def read_start(self, on_read=None, offset=None, chunk_size=2**16, max_depth=8):
+        """
+        Read the file sequentially in chunks and keep multiple read
+        requests in flight ahead of the consumer. The chunks are passed
+        to the callback in order, the end of the file is signaled with
+        :attr:`uv.StatusCodes.EOF` and an empty chunk.
+
+        The number of requests in flight starts at one and is adapted
+        to the measured throughput: the depth is increased as long as
+        this increases throughput and decreased again if it does not.
+
+        This mode is meant for files which are not modified while they
+        are read, a short read is treated as end of file. In direct mode
+        the chunk size is rounded up to the alignment and the offset has
+        to be aligned.
+
+        :param on_read:
+            callback which should be called with each chunk
+        :param offset:
+            position to start reading from, `None` continues where the
+            last sequential read stopped
+        :param chunk_size:
+            size of the chunks
+        :param max_depth:
+            maximal number of requests in flight
+
+        :type on_read:
+            ((uv.fs.File, uv.StatusCodes, bytes | memoryview) -> None) | None
+        :type offset:
+            int | None
+        :type chunk_size:
+            int
+        :type max_depth:
+            int
+        """
+        if self.closed:
+            raise error.ClosedHandleError()
+        if self.direct:
+            if offset is not None and offset % self.pool.alignment:
+                raise error.UVError(error.StatusCodes.EINVAL)
+            chunk_size = self.pool.align(chunk_size)
+        self.on_read = on_read or self.on_read
+        if offset is not None and offset != self.deliver_offset:
+            if self.pending:
+                raise error.UVError(error.StatusCodes.EBUSY)
+            self.completed.clear()
+            self.issue_offset = self.deliver_offset = offset
+            self.eof = False
+        self.chunk_size = chunk_size
+        self.max_depth = max(1, max_depth)
+        self.depth = min(self.depth, self.max_depth)
+        self.reading = True
+        self.window_bytes = 0
+        self.window_start = lib.uv_hrtime()
+        self._deliver()
+        self._issue()
+
+    def read_stop(self):
+        """
+        Stop reading sequentially. Reads which are already in flight
+        are kept and delivered once reading is started again.
+        """
+        self.reading = False
+
+    def _issue(self):
+        while self.reading and not self.eof and self.pending < self.depth:
+            offset = self.issue_offset
+            self.issue_offset += self.chunk_size
+            self.pending += 1
+            if self.pool is not None and (self.direct or
+                                          self.chunk_size <= self.pool.buffer_size):
+                buffer = self.pool.acquire(self.chunk_size)
+                target = memoryview(buffer)[:self.chunk_size]
+            else:
+                buffer, target = None, self.chunk_size
+            on_read = functools.partial(self._on_chunk, offset, buffer)
+            read(self.fd, target, offset, callback=on_read, loop=self.loop)
+
+    def _on_chunk(self, offset, buffer, request, status, result):
+        self.pending -= 1
+        if self.closed:
+            if buffer is not None:
+                self.pool.release(buffer)
+            return
+        if buffer is not None and result is not None:
+            result = memoryview(buffer)[:result]
+        self.completed[offset] = (status, result, buffer)
+        self._deliver()
+        self._issue()
+
+    def _deliver(self):
+        while self.reading and self.deliver_offset in self.completed:
+            status, data, buffer = self.completed.pop(self.deliver_offset)
+            try:
+                if status != error.StatusCodes.SUCCESS:
+                    self.eof = True
+                    self.reading = False
+                    self.on_read(self, status, b'')
+                elif not len(data):
+                    self.eof = True
+                    self.reading = False
+                    self.on_read(self, error.StatusCodes.EOF, b'')
+                else:
+                    self.deliver_offset += len(data)
+                    self._adapt(len(data))
+                    self.on_read(self, status, data)
+                    if len(data) < self.chunk_size:
+                        self.eof = True
+                        self.reading = False
+                        self.on_read(self, error.StatusCodes.EOF, b'')
+            finally:
+                if buffer is not None:
+                    self.pool.release(buffer)
+        if self.eof and not self.pending:
+            for _, _, buffer in self.completed.values():
+                if buffer is not None:
+                    self.pool.release(buffer)
+            self.completed.clear()
+
+    def _adapt(self, length):
+        self.window_bytes += length
+        if self.window_bytes < self.chunk_size * max(4, 2 * self.depth):
+            return
+        now = lib.uv_hrtime()
+        rate = self.window_bytes / max(1, now - self.window_start)
+        if rate < self.last_rate:
+            self.direction = -self.direction
+        self.depth = min(self.max_depth, max(1, self.depth + self.direction))
+        self.last_rate = rate
+        self.window_bytes = 0
+        self.window_start = now
+
+
+class Mapping(library.PinnedBuffer):
+    """
+    Read-only memory mapped file. Mappings can be passed directly to
+    :func:`uv.Stream.write` and :func:`uv.UDP.send`, alone or in a list
+    with other buffers, and are written without copying. The mapping is
+    kept alive until the respective request has been completed.
+
+    Mappings are created by :func:`uv.fs.map` and reference counted by
+    the :class:`uv.fs.MappingCache` they belong to. Call :func:`release`
+    if the mapping is no longer needed.
+
+    .. warning::
+        Truncating a mapped file while it is mapped leads to a crash
+        when the truncated region is accessed.
+
+    :param path:
+        path of the mapped file
+    :param fd:
+        file descriptor of the file to map
+    :param size:
+        size of the file
+
+    :type path:
+        unicode | bytes
+    :type fd:
+        int
+    :type size:
+        int
+    """
+
+    __slots__ = ['path', 'mmap', 'references', 'cache']
+
+    def __init__(self, path, fd, size):
+        self.path = path
+        if size:
+            self.mmap = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+            c_base = ffi.from_buffer(self.mmap)
+        else:
+            self.mmap, c_base = None, ffi.NULL
+        super(Mapping, self).__init__(c_base, size)
+        self.references = 1
+        """
+        Number of users of the mapping.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.release()
+
+    def slice(self, offset=0, length=None):
+        """
+        Get a part of the mapping which is written without copying.
+
+        :raises ValueError:
+            slice exceeds the mapping
+
+        :param offset:
+            start of the part
+        :param length:
+            length of the part, `None` means until the end
+
+        :type offset:
+            int
+        :type length:
+            int | None
+
+        :rtype:
+            uv.library.PinnedBuffer
+        """
+        if length is None:
+            length = self.length - offset
+        if offset < 0 or length < 0 or offset + length > self.length:
+            raise ValueError('slice exceeds the mapping')
+        return library.PinnedBuffer(self.c_base + offset if length else ffi.NULL, length,
+                                    self)
+
+    def release(self):
+        """
+        Release a reference to the mapping. Unreferenced mappings may be
+        evicted from their cache, the memory is unmapped once it is no
+        longer used by any request.
+        """
+        self.references -= 1
+        if self.cache is not None and self.references <= 0:
+            self.cache.evict()
+
+
+class MappingCache(object):
+    """
+    Least recently used cache of file mappings. Mappings which are still
+    referenced are never evicted, the capacity only limits the number of
+    unreferenced mappings kept for reuse.
+
+    :param capacity:
+        maximal number of mappings kept
+
+    :type capacity:
+        int
+    """
+
+    __slots__ = ['capacity', 'mappings']
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.mappings = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.mappings)
+
+    def get(self, path):
+        """
+        Get the mapping of the path and add a reference to it.
+
+        :type path:
+            unicode | bytes
+
+        :rtype:
+            uv.fs.Mapping | None
+        """
+        mapping = self.mappings.pop(path, None)
+        if mapping is not None:
+            self.mappings[path] = mapping
+            mapping.references += 1
+        return mapping
+
+    def add(self, mapping):
+        """
+        Add a new mapping. If a mapping of the same path has been added
+        in the meantime that mapping is referenced and returned instead.
+
+        :type mapping:
+            uv.fs.Mapping
+
+        :rtype:
+            uv.fs.Mapping
+        """
+        existing = self.get(mapping.path)
+        if existing is not None:
+            return existing
+        mapping.cache = self
+        self.mappings[mapping.path] = mapping
+        self.evict()
+        return mapping
+
+    def invalidate(self, path=None):
+        """
+        Remove the mapping of the path, or all mappings, from the cache.
+        Mappings in use stay valid, subsequent calls to :func:`uv.fs.map`
+        create new mappings.
+
+        :type path:
+            unicode | bytes | None
+        """
+        paths = list(self.mappings) if path is None else [path]
+        for path in paths:
+            mapping = self.mappings.pop(path, None)
+            if mapping is not None:
+                mapping.cache = None
+
+    def evict(self):
+        """
+        Evict least recently used unreferenced mappings above capacity.
+        """
+        excess = len(self.mappings) - self.capacity
+        if excess <= 0:
+            return
+        for path, mapping in list(self.mappings.items()):
+            if mapping.references <= 0:
+                del self.mappings[path]
+                mapping.cache = None
+                excess -= 1
+                if not excess:
+                    break
+
+
+mapping_cache = MappingCache()
+
+
+def map(path, cache=mapping_cache, callback=None, loop=None):
+    """
+    Map a file read-only into memory. Mappings are shared by the cache,
+    hot files are mapped once and reused by all users. If the file is
+    already mapped the callback is called immediately.
+
+    .. code-block:: python
+
+        def on_map(mapping, status):
+            connection.write([header, mapping], on_write=lambda *_: mapping.release())
+
+        uv.fs.map('static/index.html', callback=on_map)
+
+    :raises uv.UVError:
+        error while opening the file (synchronous mode only)
+
+    :param path:
+        path of the file to map
+    :param cache:
+        cache to share the mapping through, `None` disables caching
+    :param callback:
+        callback which should be called with the mapping, or `None` on
+        error, and a status code
+    :param loop:
+        event loop the filesystem requests should run on
+
+    :type path:
+        unicode | bytes
+    :type cache:
+        uv.fs.MappingCache | None
+    :type callback:
+        ((uv.fs.Mapping | None, uv.StatusCodes) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.fs.Mapping | None
+    """
+    mapping = None if cache is None else cache.get(path)
+    if mapping is not None:
+        if callback is None:
+            return mapping
+        callback(mapping, error.StatusCodes.SUCCESS)
+        return
+
+    if callback is None:
+        fd = open(path, os.O_RDONLY, loop=loop)
+        try:
+            mapping = Mapping(path, fd, fstat(fd, loop=loop).size)
+        finally:
+            close(fd, loop=loop)
+        return mapping if cache is None else cache.add(mapping)
+
+    def on_fstat(request, status, stat_result, fd):
+        mapping = None
+        if status == error.StatusCodes.SUCCESS:
+            try:
+                mapping = Mapping(path, fd, stat_result.size)
+            except EnvironmentError as exception:
+                status = error.StatusCodes.get(-exception.errno)
+        close(fd, callback=common.dummy_callback, loop=loop)
+        if mapping is not None and cache is not None:
+            mapping = cache.add(mapping)
+        callback(mapping, status)
+
+    def on_open(request, status, fd):
+        if status != error.StatusCodes.SUCCESS:
+            callback(None, status)
+        else:
+            fstat(fd, callback=functools.partial(on_fstat, fd=fd), loop=loop)
+
+    open(path, os.O_RDONLY, callback=on_open, loop=loop)
+
+
+_S_IFMT = 0o170000
+_S_IFDIR = 0o040000
+_S_IFREG = 0o100000
+_S_IFLNK = 0o120000
+
+_mode_types = {_S_IFDIR: DirentType.DIR, _S_IFREG: DirentType.FILE,
+               _S_IFLNK: DirentType.LINK}
+
+
+class Walker(object):
+    """
+    Recursive directory walk on libuv's threadpool. Directories are
+    listed with at most `concurrency` filesystem requests in flight
+    and entries are passed to the callback as soon as their directory
+    has been listed, there is no guaranteed order. Symbolic links are
+    not followed.
+
+    If `stat` is true every entry is additionally passed through
+    :func:`uv.fs.lstat`, using the same request window. Entries of
+    unknown type, which some filesystems report, are always checked
+    with :func:`uv.fs.lstat` to decide whether to descend.
+
+    Errors while listing subdirectories or getting information about
+    entries do not abort the walk, they are collected in
+    :attr:`errors` instead.
+
+    Paths and names are bytes if `root` is bytes, like with :func:`os.walk`.
+
+    :param root:
+        directory to walk
+    :param concurrency:
+        maximal number of filesystem requests in flight
+    :param stat:
+        get information about every entry
+    :param on_entry:
+        callback which should be called for every entry
+    :param on_done:
+        callback which should be called after the walk has been
+        completed, failed or has been canceled
+    :param loop:
+        event loop the filesystem requests should run on
+
+    :type root:
+        unicode | bytes
+    :type concurrency:
+        int
+    :type stat:
+        bool
+    :type on_entry:
+        ((uv.fs.Walker, unicode | bytes, uv.fs.Dirent, uv.fs.Stat | None) -> None) |
+        None
+    :type on_done:
+        ((uv.fs.Walker, uv.StatusCodes) -> None) | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['root', 'concurrency', 'stat', 'on_entry', 'on_done', 'loop',
+                 'directories', 'entries', 'pending', 'count', 'errors', 'status',
+                 'canceled', 'done']
+
+    def __init__(self, root, concurrency=4, stat=False, on_entry=None, on_done=None,
+                 loop=None):
+        self.root = root
+        self.concurrency = max(1, concurrency)
+        self.stat = stat
+        self.on_entry = on_entry or common.dummy_callback
+        self.on_done = on_done or common.dummy_callback
+        self.loop = loop or Loop.get_current()
+        self.directories = collections.deque([self.root])
+        self.entries = collections.deque()
+        self.pending = 0
+        self.count = 0
+        """
+        Number of entries passed to the callback so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.errors = []
+        """
+        Paths which could not be listed or examined with their status.
+
+        :readonly:
+            True
+        :type:
+            list[(unicode, uv.StatusCodes)]
+        """
+        self.status = error.StatusCodes.SUCCESS
+        self.canceled = False
+        self.done = False
+        self._schedule()
+
+    def cancel(self):
+        """
+        Cancel the walk. Requests in flight are completed but their
+        results are discarded.
+        """
+        if self.done:
+            return
+        self.canceled = True
+        self.status = error.StatusCodes.ECANCELED
+        self.directories.clear()
+        self.entries.clear()
+        if not self.pending:
+            self._finish()
+
+    def _schedule(self):
+        while self.pending < self.concurrency:
+            # examine pending entries first to bound memory usage
+            if self.entries:
+                path, dirent = self.entries.popleft()
+                callback = functools.partial(self._on_lstat, path, dirent)
+                lstat(path, callback=callback, loop=self.loop)
+            elif self.directories:
+                directory = self.directories.popleft()
+                callback = functools.partial(self._on_scandir, directory)
+                scandir(directory, callback=callback, loop=self.loop)
+            else:
+                break
+            self.pending += 1
+        if not self.pending and not self.done:
+            self._finish()
+
+    def _finish(self):
+        self.done = True
+        self.on_done(self, self.status)
+
+    def _on_scandir(self, directory, request, status, entries):
+        self.pending -= 1
+        try:
+            if self.canceled:
+                return
+            if status != error.StatusCodes.SUCCESS:
+                if directory is self.root:
+                    self.status = status
+                else:
+                    self.errors.append((directory, status))
+                return
+            for dirent in entries:
+                path = os.path.join(directory, dirent.name)
+                if self.stat or dirent.type == DirentType.UNKNOWN:
+                    self.entries.append((path, dirent))
+                    continue
+                if dirent.type == DirentType.DIR:
+                    self.directories.append(path)
+                self.count += 1
+                self.on_entry(self, path, dirent, None)
+        finally:
+            self._schedule()
+
+    def _on_lstat(self, path, dirent, request, status, stat_result):
+        self.pending -= 1
+        try:
+            if self.canceled:
+                return
+            if status != error.StatusCodes.SUCCESS:
+                self.errors.append((path, status))
+                return
+            if dirent.type == DirentType.UNKNOWN:
+                dirent_type = _mode_types.get(stat_result.mode & _S_IFMT,
+                                              DirentType.UNKNOWN)
+                dirent = Dirent(dirent.name, dirent_type)
+            if dirent.type == DirentType.DIR:
+                self.directories.append(path)
+            self.count += 1
+            self.on_entry(self, path, dirent, stat_result if self.stat else None)
+        finally:
+            self._schedule()
+
+
+def walk(root, concurrency=4, stat=False, on_entry=None, on_done=None, loop=None):
+    """
+    Walk a directory tree recursively. See :class:`uv.fs.Walker` for
+    parameter descriptions.
+
+    .. code-block:: python
+
+        def on_entry(walker, path, dirent, stat_result):
+            index[path] = stat_result.size
+
+        uv.fs.walk('/srv/artifacts', concurrency=16, stat=True, on_entry=on_entry)
+
+    :type root:
+        unicode | bytes
+    :type concurrency:
+        int
+    :type stat:
+        bool
+    :type on_entry:
+        ((uv.fs.Walker, unicode | bytes, uv.fs.Dirent, uv.fs.Stat | None) -> None) |
+        None
+    :type on_done:
+        ((uv.fs.Walker, uv.StatusCodes) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.fs.Walker
+    """
+    return Walker(root, concurrency, stat, on_entry, on_done, loop)
+
+
+class StatCache(object):
+    """
+    Least recently used cache of file information keyed by path. Entries
+    expire after `ttl` seconds. If `watch` is true the directories of the
+    cached paths are watched with :class:`uv.FSEvent` handles and entries
+    are invalidated as soon as the respective files change, the handles
+    do not keep the loop alive. Changes between getting the information
+    and starting to watch are not detected, use a `ttl` to bound the
+    staleness of such entries.
+
+    :param capacity:
+        maximal number of cached entries
+    :param ttl:
+        time to live of entries in seconds, `None` means forever
+    :param watch:
+        invalidate entries on filesystem events
+    :param loop:
+        event loop the watchers should run on
+
+    :type capacity:
+        int
+    :type ttl:
+        float | None
+    :type watch:
+        bool
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['capacity', 'ttl', 'watch', 'loop', 'entries', 'watchers']
+
+    def __init__(self, capacity=4096, ttl=None, watch=False, loop=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.watch = watch
+        self.loop = loop or Loop.get_current()
+        self.entries = collections.OrderedDict()
+        self.watchers = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def get(self, path):
+        """
+        Get the cached information about the path.
+
+        :type path:
+            unicode
+
+        :rtype:
+            uv.fs.Stat | None
+        """
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return None
+        expires, stat_result = entry
+        if expires is not None and expires <= self.loop.now:
+            self._forget(path)
+            return None
+        self.entries[path] = entry
+        return stat_result
+
+    def put(self, path, stat_result):
+        """
+        Cache information about the path.
+
+        :type path:
+            unicode
+        :type stat_result:
+            uv.fs.Stat
+        """
+        expires = None if self.ttl is None else self.loop.now + int(self.ttl * 1000)
+        if self.entries.pop(path, None) is None and self.watch:
+            self._watch(path)
+        self.entries[path] = (expires, stat_result)
+        while len(self.entries) > self.capacity:
+            self._forget(next(iter(self.entries)))
+
+    def invalidate(self, path=None):
+        """
+        Remove the path, or all paths, from the cache.
+
+        :type path:
+            unicode | None
+        """
+        if path is None:
+            self.entries.clear()
+            for fs_event, _ in self.watchers.values():
+                fs_event.close()
+            self.watchers.clear()
+        elif path in self.entries:
+            self._forget(path)
+
+    def close(self):
+        """
+        Clear the cache and close all watchers.
+        """
+        self.invalidate()
+
+    def _forget(self, path):
+        self.entries.pop(path, None)
+        if not self.watch:
+            return
+        directory, name = os.path.split(path)
+        watcher = self.watchers.get(directory)
+        if watcher is not None:
+            watcher[1].pop(name, None)
+            if not watcher[1]:
+                watcher[0].close()
+                del self.watchers[directory]
+
+    def _watch(self, path):
+        directory, name = os.path.split(path)
+        watcher = self.watchers.get(directory)
+        if watcher is None:
+            fs_event = FSEvent(loop=self.loop, on_event=self._on_event)
+            try:
+                fs_event.start(directory or os.curdir)
+            except error.UVError:
+                fs_event.close()
+                return
+            fs_event.dereference()
+            fs_event.data = directory
+            watcher = self.watchers[directory] = (fs_event, {})
+        watcher[1][name] = path
+
+    def _on_event(self, fs_event, status, filename, events):
+        watcher = self.watchers.get(fs_event.data)
+        if watcher is None or watcher[0] is not fs_event:
+            return
+        if status != error.StatusCodes.SUCCESS or not filename:
+            paths = list(watcher[1].values())
+        else:
+            paths = [watcher[1][filename]] if filename in watcher[1] else []
+        for path in paths:
+            self._forget(path)
+
+
+def stat_many(paths, concurrency=8, cache=None, follow_symlinks=True, callback=None,
+              loop=None):
+    """
+    Get information about many paths with at most `concurrency` requests
+    in flight, which neither floods the threadpool nor serializes the
+    requests. Paths found in the cache are not requested again and
+    successful results are added to the cache. Duplicate paths are only
+    requested once.
+
+    The callback receives a list of `(status, stat)` tuples in the order
+    of the given paths. If all paths are cached it is called immediately.
+    Without a callback the requests run synchronously one after another
+    and the list is returned.
+
+    :param paths:
+        paths to get information about
+    :param concurrency:
+        maximal number of requests in flight
+    :param cache:
+        cache to consult and populate
+    :param follow_symlinks:
+        follow symbolic links, otherwise :func:`uv.fs.lstat` is used
+    :param callback:
+        callback which should be called with the results
+    :param loop:
+        event loop the requests should run on
+
+    :type paths:
+        list[unicode]
+    :type concurrency:
+        int
+    :type cache:
+        uv.fs.StatCache | None
+    :type follow_symlinks:
+        bool
+    :type callback:
+        ((list[(uv.StatusCodes, uv.fs.Stat | None)]) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        list[(uv.StatusCodes, uv.fs.Stat | None)] | None
+    """
+    function = stat if follow_symlinks else lstat
+    results = [None] * len(paths)
+    missing = collections.OrderedDict()
+    for index, path in enumerate(paths):
+        stat_result = None if cache is None else cache.get(path)
+        if stat_result is not None:
+            results[index] = (error.StatusCodes.SUCCESS, stat_result)
+        else:
+            missing.setdefault(path, []).append(index)
+
+    def resolve(path, status, stat_result):
+        if cache is not None and status == error.StatusCodes.SUCCESS:
+            cache.put(path, stat_result)
+        for index in missing[path]:
+            results[index] = (status, stat_result)
+
+    if callback is None:
+        for path in missing:
+            try:
+                resolve(path, error.StatusCodes.SUCCESS, function(path, loop=loop))
+            except error.UVError as exception:
+                resolve(path, error.StatusCodes.get(exception.code), None)
+        return results
+
+    queue = collections.deque(missing)
+    state = {'pending': 0}
+
+    def issue():
+        while queue and state['pending'] < concurrency:
+            path = queue.popleft()
+            state['pending'] += 1
+            function(path, callback=functools.partial(on_stat, path), loop=loop)
+        if not state['pending']:
+            callback(results)
+
+    def on_stat(path, request, status, stat_result):
+        state['pending'] -= 1
+        resolve(path, status, stat_result)
+        issue()
+
+    issue()
+
+
+_IOV_MAX = 1024
+
+
+class AppendWriter(object):
+    """
+    Write-behind writer for append-only files like journals and request
+    logs. Appends are buffered and written with one vectored write per
+    batch, appends made while a write is in flight form the next batch.
+    Appends which request durability share one `fdatasync()`: a sync
+    covers everything written before it has been issued, appends written
+    while it is in flight wait for the next one. Under load this commits
+    whole groups of appends with a single sync.
+
+    The data is not copied and must not be modified until the callback
+    of the append has been called.
+
+    :param fd:
+        file descriptor to append to, should have been opened with
+        :data:`os.O_APPEND`
+    :param loop:
+        event loop the filesystem requests should run on
+
+    :type fd:
+        int
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['fd', 'loop', 'queue', 'appended', 'written', 'waiters', 'syncs',
+                 'writing', 'syncing', 'closing', 'syncs_issued']
+
+    def __init__(self, fd, loop=None):
+        self.fd = fd
+        self.loop = loop or Loop.get_current()
+        self.queue = collections.deque()
+        self.appended = 0
+        """
+        Number of bytes appended so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.written = 0
+        """
+        Number of bytes written so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.waiters = collections.deque()
+        self.syncs = []
+        self.writing = False
+        self.syncing = False
+        self.closing = False
+        self.syncs_issued = 0
+        """
+        Number of `fdatasync()` calls issued so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+
+    @classmethod
+    def open(cls, path, mode=0o644, loop=None):
+        """
+        Open a file for appending, creating it if it does not exist.
+
+        :raises uv.UVError:
+            error while opening the file
+
+        :type path:
+            unicode | bytes
+        :type mode:
+            int
+        :type loop:
+            uv.Loop
+
+        :rtype:
+            uv.fs.AppendWriter
+        """
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        return cls(open(path, flags, mode, loop=loop), loop)
+
+    def append(self, data, callback=None, durable=True):
+        """
+        Append data to the file. The callback is called once the data
+        has been written and, if `durable` is true, synced to the
+        storage device.
+
+        :raises uv.ClosedStructureError:
+            writer is closing or has been closed
+
+        :param data:
+            data to append
+        :param callback:
+            callback which should be called once the data has been
+            written or is durable respectively
+        :param durable:
+            wait for the data to be synced to the storage device
+
+        :type data:
+            bytes | bytearray | memoryview
+        :type callback:
+            ((uv.fs.AppendWriter, uv.StatusCodes) -> None) | None
+        :type durable:
+            bool
+        """
+        if self.closing:
+            raise error.ClosedStructureError()
+        if len(data):
+            self.queue.append(data)
+            self.appended += len(data)
+        self.waiters.append((self.appended, durable, callback or common.dummy_callback))
+        if self.writing:
+            return
+        self._advance(error.StatusCodes.SUCCESS)
+        self._write()
+        self._sync()
+
+    def flush(self, callback=None):
+        """
+        Call the callback once everything appended so far is durable.
+
+        :type callback:
+            ((uv.fs.AppendWriter, uv.StatusCodes) -> None) | None
+        """
+        self.append(b'', callback, True)
+
+    def close(self, callback=None):
+        """
+        Flush the writer and close the file afterwards.
+
+        :type callback:
+            ((uv.fs.AppendWriter, uv.StatusCodes) -> None) | None
+        """
+        if self.closing:
+            return
+        callback = callback or common.dummy_callback
+
+        def on_close(request, status, _):
+            callback(self, status)
+
+        def on_flush(writer, status):
+            close(self.fd, callback=on_close, loop=self.loop)
+
+        self.flush(on_flush)
+        self.closing = True
+
+    def _call(self, callback, status):
+        try:
+            callback(self, status)
+        except Exception:
+            self.loop.handle_exception()
+
+    def _advance(self, status):
+        while self.waiters and self.waiters[0][0] <= self.written:
+            _, durable, callback = self.waiters.popleft()
+            if durable and status == error.StatusCodes.SUCCESS:
+                self.syncs.append(callback)
+            else:
+                self._call(callback, status)
+
+    def _write(self):
+        if self.writing or not self.queue:
+            return
+        batch, size = [], 0
+        while self.queue and len(batch) < _IOV_MAX:
+            data = self.queue.popleft()
+            batch.append(data)
+            size += len(data)
+        self.writing = True
+        callback = functools.partial(self._on_write, batch, size)
+        write(self.fd, batch, -1, callback=callback, loop=self.loop)
+
+    def _on_write(self, batch, size, request, status, written):
+        self.writing = False
+        if status != error.StatusCodes.SUCCESS:
+            # the batch is lost, fail the appends it contained
+            self.written += size
+        else:
+            self.written += written
+            if written < size:
+                remaining = []
+                for data in batch:
+                    if written >= len(data):
+                        written -= len(data)
+                        continue
+                    remaining.append(memoryview(data)[written:] if written else data)
+                    written = 0
+                self.queue.extendleft(reversed(remaining))
+        self._advance(status)
+        self._write()
+        self._sync()
+
+    def _sync(self):
+        if self.syncing or not self.syncs:
+            return
+        waiting, self.syncs = self.syncs, []
+        self.syncing = True
+        self.syncs_issued += 1
+        fdatasync(self.fd, callback=functools.partial(self._on_sync, waiting),
+                  loop=self.loop)
+
+    def _on_sync(self, waiting, request, status, _):
+        self.syncing = False
+        for callback in waiting:
+            self._call(callback, status)
+        self._sync()
+
+
+class Follower(object):
+    """
+    Follower delivering data appended to a file, like `tail -F`. Growth
+    is signaled by a :class:`uv.FSEvent` watching the file, only the
+    appended range is read with positional reads into pooled buffers.
+    A :class:`uv.FSPoll` on the path detects rotation, i.e. a new file
+    replacing the followed one, and serves as fallback on platforms or
+    file systems without change events. After a rotation the remaining
+    data of the old file is delivered before following the new one from
+    its start. A file shrinking below the current position is treated
+    as truncated and followed from its start again. The size is compared
+    to the position before every read and on every poll, so a truncated
+    file which has been rewritten past the old position in between is
+    still detected if either of them observed the shrunk file.
+
+    The data passed to the callback is a :class:`memoryview` which is
+    only valid until the callback returns. Errors are passed to the
+    callback together with an empty chunk.
+
+    :param path:
+        path of the file to follow, the file does not have to exist yet
+    :param on_data:
+        callback which should be called with appended data
+    :param offset:
+        position to start following from, `None` starts at the end of
+        the file which exists when the follower is started
+    :param pool:
+        buffer pool for reads
+    :param interval:
+        interval of the path polling in milliseconds
+    :param loop:
+        event loop the follower should run on
+
+    :type path:
+        unicode | bytes
+    :type on_data:
+        ((uv.fs.Follower, uv.StatusCodes, memoryview | bytes) -> None) | None
+    :type offset:
+        int | None
+    :type pool:
+        uv.fs.BufferPool | None
+    :type interval:
+        int
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['path', 'on_data', 'pool', 'loop', 'fd', 'inode', 'position', 'fs_event',
+                 'fs_poll', 'busy', 'dirty', 'rotated', 'truncated', 'closed',
+                 'rotations', 'truncations']
+
+    def __init__(self, path, on_data=None, offset=None, pool=None, interval=1000,
+                 loop=None):
+        # imported here as the fs poll handle depends on this module
+        from .handles.fs_poll import FSPoll
+        self.path = path
+        self.on_data = on_data or common.dummy_callback
+        self.pool = pool or BufferPool()
+        self.loop = loop or Loop.get_current()
+        self.fd = None
+        self.inode = None
+        self.position = offset
+        """
+        Position in the followed file up to which data has been delivered.
+
+        :readonly:
+            True
+        :type:
+            int | None
+        """
+        self.fs_event = FSEvent(loop=self.loop, on_event=self._on_event)
+        self.fs_poll = FSPoll(path, interval, self.loop, on_change=self._on_change)
+        self.busy = True
+        self.dirty = False
+        self.rotated = False
+        self.truncated = False
+        self.closed = False
+        self.rotations = 0
+        """
+        Number of rotations which have been detected.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.truncations = 0
+        """
+        Number of truncations which have been detected.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.fs_poll.start()
+        self._open()
+
+    def close(self):
+        """
+        Stop following and close the file. Reads which are still in
+        flight are discarded.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.fs_event.close()
+        self.fs_poll.close()
+        if self.fd is not None:
+            close(self.fd, callback=common.dummy_callback, loop=self.loop)
+            self.fd = None
+
+    def _open(self):
+        self.busy = True
+        open(self.path, os.O_RDONLY, callback=self._on_open, loop=self.loop)
+
+    def _on_open(self, request, status, fd):
+        if self.closed:
+            if fd is not None:
+                close(fd, callback=common.dummy_callback, loop=self.loop)
+        elif fd is None:
+            # a missing file is opened once the poll handle notices it
+            self.busy = False
+            if status == error.StatusCodes.ENOENT:
+                self.position = self.position or 0
+            else:
+                self._deliver(status, b'')
+        else:
+            fstat(fd, callback=functools.partial(self._on_opened, fd), loop=self.loop)
+
+    def _on_opened(self, fd, request, status, stat_result):
+        if self.closed or status != error.StatusCodes.SUCCESS:
+            close(fd, callback=common.dummy_callback, loop=self.loop)
+            self.busy = False
+            if not self.closed:
+                self._deliver(status, b'')
+            return
+        self.fd, self.inode = fd, stat_result.ino
+        if self.position is None:
+            self.position = stat_result.size
+        try:
+            self.fs_event.start(self.path)
+        except error.UVError:
+            # no change events, the poll handle signals growth instead
+            pass
+        self._refresh()
+
+    def _check(self):
+        if self.busy:
+            self.dirty = True
+        elif self.fd is not None:
+            self.busy = True
+            self._refresh()
+
+    def _refresh(self):
+        fstat(self.fd, callback=self._on_fstat, loop=self.loop)
+
+    def _verify(self):
+        if not self.closed:
+            stat(self.path, callback=self._on_verify, loop=self.loop)
+
+    def _read(self):
+        buffer = self.pool.acquire()
+        on_read = functools.partial(self._on_read, buffer)
+        read(self.fd, buffer, self.position, callback=on_read, loop=self.loop)
+
+    def _on_read(self, buffer, request, status, count):
+        try:
+            if self.closed:
+                return
+            if status != error.StatusCodes.SUCCESS:
+                self._deliver(status, b'')
+            elif count:
+                self.position += count
+                self._deliver(status, memoryview(buffer)[:count])
+        finally:
+            self.pool.release(buffer)
+        if self.closed:
+            return
+        if status == error.StatusCodes.SUCCESS and count == len(buffer):
+            self._read()
+        else:
+            self._idle()
+
+    def _on_fstat(self, request, status, stat_result):
+        if self.closed:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            self._deliver(status, b'')
+            self._idle()
+            return
+        if self.truncated or stat_result.size < self.position:
+            self.truncations += 1
+            self.position = 0
+        self.truncated = False
+        self._read()
+
+    def _idle(self):
+        self.busy = False
+        if self.dirty:
+            self.dirty = False
+            self._check()
+        elif self.rotated:
+            self.rotated = False
+            self.rotations += 1
+            self.fs_event.stop()
+            close(self.fd, callback=common.dummy_callback, loop=self.loop)
+            self.fd, self.inode, self.position = None, None, 0
+            self._open()
+
+    def _on_verify(self, request, status, stat_result):
+        if self.closed:
+            return
+        if self.fd is None:
+            if status == error.StatusCodes.SUCCESS and not self.busy:
+                self._open()
+            return
+        if status == error.StatusCodes.SUCCESS and stat_result.ino != self.inode:
+            self.rotated = True
+        if self.busy:
+            self.dirty = True
+        else:
+            self.busy = True
+            self._refresh()
+
+    def _on_event(self, fs_event, status, filename, events):
+        if events & FSEvents.RENAME:
+            self._verify()
+        self._check()
+
+    def _on_change(self, fs_poll, status, previous_stat, current_stat):
+        if (status == error.StatusCodes.SUCCESS and previous_stat is not None and
+                current_stat is not None and current_stat.ino == self.inode and
+                current_stat.size < previous_stat.size and
+                self.position is not None and current_stat.size < self.position):
+            # the file may grow past the position again before it is read
+            self.truncated = True
+        self._verify()
+
+    def _deliver(self, status, data):
+        try:
+            self.on_data(self, status, data)
+        except Exception:
+            self.loop.handle_exception()
+
+
+def follow(path, on_data=None, offset=None, pool=None, interval=1000, loop=None):
+    """
+    Follow a file and deliver appended data, see :class:`uv.fs.Follower`.
+
+    :param path:
+        path of the file to follow
+    :param on_data:
+        callback which should be called with appended data
+    :param offset:
+        position to start following from, `None` starts at the end
+    :param pool:
+        buffer pool for reads
+    :param interval:
+        interval of the path polling in milliseconds
+    :param loop:
+        event loop the follower should run on
+
+    :type path:
+        unicode | bytes
+    :type on_data:
+        ((uv.fs.Follower, uv.StatusCodes, memoryview | bytes) -> None) | None
+    :type offset:
+        int | None
+    :type pool:
+        uv.fs.BufferPool | None
+    :type interval:
+        int
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.fs.Follower
+    """
+    return Follower(path, on_data, offset, pool, interval, loop)
+
+
+class TreeWatcher(object):
+    """
+    Watches a directory tree for changes. As libuv's recursive watching
+    is not available on all platforms, one :class:`uv.FSEvent` is used
+    per directory, directories appearing or disappearing in the tree are
+    watched or forgotten automatically.
+
+    Events are not passed on individually but coalesced: the first event
+    opens a window of `window` milliseconds, all events arriving within
+    it are delivered with a single call of the callback as a dictionary
+    mapping the paths to the union of their :class:`uv.FSEvents`. Paths
+    are kept as bytes internally, just like the paths :func:`os.listdir`
+    returns for a bytes path, and are only decoded with :func:`os.fsdecode`
+    when a batch is delivered if `decode` is true. The entries of directories which appear
+    after the watcher has been started are reported as renamed, as they
+    may have been created before the directory was watched.
+
+    :param root:
+        root of the tree to watch
+    :param on_change:
+        callback which should be called with coalesced changes
+    :param window:
+        coalescing window in milliseconds
+    :param decode:
+        pass the paths to the callback as unicode instead of bytes
+    :param loop:
+        event loop the watcher should run on
+
+    :type root:
+        unicode | bytes
+    :type on_change:
+        ((uv.TreeWatcher, dict[bytes | unicode, int]) -> None) | None
+    :type window:
+        int
+    :type decode:
+        bool
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['root', 'on_change', 'window', 'decode', 'loop', 'watches', 'changes',
+                 'timer', 'scheduled', 'closed', 'events_received', 'batches']
+
+    def __init__(self, root, on_change=None, window=50, decode=False, loop=None):
+        self.root = _c_path(root)
+        self.on_change = on_change or common.dummy_callback
+        self.window = window
+        self.decode = decode
+        self.loop = loop or Loop.get_current()
+        self.watches = {}
+        self.changes = {}
+        self.timer = Timer(loop=self.loop, on_timeout=self._on_timeout)
+        self.scheduled = False
+        self.closed = False
+        self.events_received = 0
+        """
+        Number of events received so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.batches = 0
+        """
+        Number of batches delivered so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self._add(self.root, False)
+
+    def __len__(self):
+        return len(self.watches)
+
+    def __contains__(self, directory):
+        return _c_path(directory) in self.watches
+
+    def close(self):
+        """
+        Stop watching and close all handles. Changes which have not been
+        delivered yet are discarded.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for fs_event in self.watches.values():
+            fs_event.close()
+        self.watches.clear()
+        self.changes.clear()
+        self.timer.close()
+
+    def _add(self, directory, report):
+        if self.closed or directory in self.watches:
+            return
+        fs_event = FSEvent(loop=self.loop, on_event=self._on_event)
+        try:
+            fs_event.start(directory)
+        except error.UVError:
+            fs_event.close()
+            return
+        self.watches[directory] = fs_event
+        on_scandir = functools.partial(self._on_scandir, directory, report)
+        scandir(directory, callback=on_scandir, loop=self.loop)
+
+    def _remove(self, directory):
+        prefix = os.path.join(directory, b'')
+        for path in [path for path in self.watches
+                     if path == directory or path.startswith(prefix)]:
+            self.watches.pop(path).close()
+
+    def _on_scandir(self, directory, report, request, status, entries):
+        if self.closed or directory not in self.watches or entries is None:
+            return
+        for name, dirent_type in entries:
+            path = os.path.join(directory, name)
+            if report:
+                self._record(path, FSEvents.RENAME)
+            if dirent_type == DirentType.DIR:
+                self._add(path, report)
+            elif dirent_type == DirentType.UNKNOWN:
+                self._check(path, report)
+
+    def _check(self, path, report=True):
+        lstat(path, callback=functools.partial(self._on_lstat, path, report),
+              loop=self.loop)
+
+    def _on_lstat(self, path, report, request, status, stat_result):
+        if self.closed:
+            return
+        if status != error.StatusCodes.SUCCESS:
+            self._remove(path)
+        elif stat_result.mode & _S_IFMT == _S_IFDIR:
+            self._add(path, report)
+
+    def _on_event(self, fs_event, status, filename, events):
+        self.events_received += 1
+        if status == error.StatusCodes.SUCCESS:
+            path = os.path.join(fs_event.path, filename) if filename else fs_event.path
+            self._record(path, events)
+
+    def _record(self, path, events):
+        self.changes[path] = self.changes.get(path, 0) | events
+        if not self.scheduled:
+            self.scheduled = True
+            self.timer.start(self.window)
+
+    def _on_timeout(self, timer):
+        self.scheduled = False
+        changes, self.changes = self.changes, {}
+        self.batches += 1
+        # renamed paths might be directories which appeared or disappeared
+        for path, events in changes.items():
+            if events & FSEvents.RENAME:
+                self._check(path)
+        if self.decode:
+            changes = dict((_fs_decode(path), events) for path, events in changes.items())
+        try:
+            self.on_change(self, changes)
+        except Exception:
+            self.loop.handle_exception()
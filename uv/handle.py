@@ -106,6 +106,7 @@ class Handle(object):
 
     uv_handle_type = None
     uv_handle_init = None
+    uv_handle_registered_on_error = False
 
     def __init__(self, loop, arguments=()):
         self.loop = loop or Loop.get_current()
@@ -122,7 +123,8 @@ class Handle(object):
 
         self.base_handle = base.BaseHandle(self, self.loop.base_loop,
                                            self.__class__.uv_handle_type,
-                                           self.__class__.uv_handle_init, arguments)
+                                           self.__class__.uv_handle_init, arguments,
+                                           self.__class__.uv_handle_registered_on_error)
 
         self.uv_handle = self.base_handle.uv_handle
 
@@ -101,7 +101,9 @@ def uv_fs_event_cb(fs_event_handle, c_filename, events, status):
     :type status:
         int
     """
-    filename = ffi.string(c_filename).decode()
+    filename = ffi.string(c_filename)
+    if not isinstance(fs_event_handle.path, bytes):
+        filename = filename.decode()
     code = error.StatusCodes.get(status)
     fs_event_handle.on_event(fs_event_handle, code, filename, events)
 
@@ -135,7 +137,7 @@ class FSEvent(handle.Handle):
             callback which should be called on filesystem events
 
         :type path:
-            unicode
+            unicode | bytes
         :type flags:
             int
         :type loop:
@@ -157,7 +159,7 @@ class FSEvent(handle.Handle):
         :readonly:
             False
         :type:
-            unicode
+            unicode | bytes
         """
         self.flags = flags
         """
@@ -186,7 +188,8 @@ class FSEvent(handle.Handle):
             :param filename:
                 if the handle has been started with a directory this
                 will be a relative path to a file contained in that
-                directory which triggered the events
+                directory which triggered the events, the filename is
+                not decoded if the path is a bytes object
             :param events:
                 bitmask of the triggered events
 
@@ -195,7 +198,7 @@ class FSEvent(handle.Handle):
             :type status:
                 uv.StatusCode
             :type filename:
-                unicode
+                unicode | bytes
             :type events:
                 int
 
@@ -227,7 +230,7 @@ class FSEvent(handle.Handle):
             (overrides the current callback if specified)
 
         :type path:
-            unicode
+            unicode | bytes
         :type flags:
             int
         :type on_event:
@@ -241,7 +244,7 @@ class FSEvent(handle.Handle):
         self.on_event = on_event or self.on_event
         if self.path is None:
             raise error.ArgumentError(message='no path has been specified')
-        c_path = self.path.encode()
+        c_path = self.path if isinstance(self.path, bytes) else self.path.encode()
         code = lib.uv_fs_event_start(self.uv_fs_event, uv_fs_event_cb, c_path, self.flags)
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
@@ -15,8 +15,15 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from .. import base, common, error, fs, handle
-from ..library import lib
+import collections
+import heapq
+import itertools
+import struct
+
+from .. import base, common, error, fs, handle, request
+from ..library import ffi, lib
+from ..loop import Loop
+from .timer import Timer
 
 
 @base.handle_callback('uv_fs_poll_cb')
@@ -182,7 +189,7 @@ class FSPoll(handle.Handle):
         self.on_change = on_change or self.on_change
         if self.path is None:
             raise error.ArgumentError(message='no path has been specified')
-        c_path = self.path.encode()
+        c_path = fs._c_path(self.path)
         code = lib.uv_fs_poll_start(self.uv_fs_poll, uv_fs_poll_cb, c_path, self.interval)
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
@@ -203,3 +210,255 @@ class FSPoll(handle.Handle):
         self.clear_pending()
 
     __call__ = start
+
+
+FSPollChange = collections.namedtuple('FSPollChange', ['path', 'status', 'ino', 'size',
+                                                       'mtime', 'ctime', 'mode'])
+
+_record = struct.Struct('=5q')
+
+
+@base.request_callback('uv_after_work_cb')
+def uv_stat_batch_cb(stat_batch_request, status):
+    """
+    :type stat_batch_request:
+        uv.handles.fs_poll.StatBatchRequest
+    :type status:
+        int
+    """
+    stat_batch_request.callback(stat_batch_request, status)
+
+
+class StatBatchRequest(request.Request):
+    """
+    Request to stat a batch of paths with a single work request on the
+    threadpool, the request's `uv_work_t` is queued itself and can be
+    canceled like any other work request. Instead of a :class:`uv.fs.Stat`
+    only a record of the fields changes are detected by is computed per
+    path.
+
+    .. warning::
+        Only for internal purposes!
+    """
+
+    __slots__ = ['uv_work', 'entries', 'c_paths', 'c_records', 'c_statuses', 'callback']
+
+    uv_request_type = 'uv_work_t*'
+
+    def __init__(self, entries, callback, loop):
+        self.entries = entries
+        self.c_paths = ffi.new('char*[]', [entry.c_path for entry in entries])
+        self.c_records = ffi.new('int64_t[]', _record.size // 8 * len(entries))
+        self.c_statuses = ffi.new('int[]', len(entries))
+        self.callback = callback
+        arguments = (self.c_paths, self.c_records, self.c_statuses, len(entries),
+                     uv_stat_batch_cb)
+        super(StatBatchRequest, self).__init__(loop, arguments,
+                                               request_init=lib.cross_stat_batch)
+        self.uv_work = self.base_request.uv_object
+
+
+class _PollEntry(object):
+    __slots__ = ['path', 'c_path', 'interval', 'code', 'record', 'active']
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.c_path = ffi.new('char[]', fs._c_path(path))
+        self.interval = interval
+        self.code = None
+        self.record = None
+        self.active = True
+
+
+class FSPollGroup(object):
+    """
+    Polls many paths for changes with a single timer. The paths are
+    stated in batches, each batch with a single work request on libuv's
+    threadpool and at most `concurrency` batches in flight. Each path
+    has its own interval: it starts at `interval`, is doubled whenever a
+    poll finds the path unchanged, up to `max_interval`, and reset once
+    a change is detected. Polls which are due close to each other are
+    issued together, so rarely changing paths cost few polls and wake
+    the loop only rarely. Unchanged paths never reach Python objects
+    beyond a comparison of their raw records.
+
+    Changes detected by one round of polls are passed to the callback
+    as a list of :class:`uv.FSPollChange` records, which contain the
+    path, the status of the stat and the inode, size, modification and
+    change time in nanoseconds and mode of the path, or `None` if the
+    stat failed, e.g. because the path has been removed.
+
+    :param interval:
+        initial polling interval in milliseconds
+    :param max_interval:
+        maximal polling interval in milliseconds
+    :param concurrency:
+        maximal number of batches in flight
+    :param batch_size:
+        maximal number of paths per batch
+    :param on_change:
+        callback which should be called with detected changes
+    :param loop:
+        event loop the group should run on
+
+    :type interval:
+        int
+    :type max_interval:
+        int
+    :type concurrency:
+        int
+    :type batch_size:
+        int
+    :type on_change:
+        ((uv.FSPollGroup, list[uv.FSPollChange]) -> None) | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'interval', 'max_interval', 'concurrency', 'batch_size',
+                 'on_change', 'entries', 'schedule', 'sequence', 'ready', 'changes',
+                 'pending', 'timer', 'closed', 'stats_issued']
+
+    def __init__(self, interval=1000, max_interval=30000, concurrency=4, batch_size=256,
+                 on_change=None, loop=None):
+        self.loop = loop or Loop.get_current()
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.on_change = on_change or common.dummy_callback
+        self.entries = {}
+        self.schedule = []
+        self.sequence = itertools.count()
+        self.ready = collections.deque()
+        self.changes = []
+        self.pending = 0
+        self.timer = Timer(loop=self.loop, on_timeout=self._on_timeout)
+        self.closed = False
+        self.stats_issued = 0
+        """
+        Number of paths stated so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def add(self, path):
+        """
+        Start polling a path. The first poll establishes the state
+        changes are detected against and is issued immediately.
+
+        :raises uv.ClosedStructureError:
+            group has already been closed
+
+        :type path:
+            unicode | bytes
+        """
+        if self.closed:
+            raise error.ClosedStructureError()
+        if path in self.entries:
+            return
+        entry = self.entries[path] = _PollEntry(path, self.interval)
+        self.ready.append(entry)
+        self._issue()
+
+    def remove(self, path):
+        """
+        Stop polling a path.
+
+        :type path:
+            unicode | bytes
+        """
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            entry.active = False
+            if not self.entries:
+                del self.schedule[:]
+                self.timer.stop()
+
+    def close(self):
+        """
+        Stop polling all paths and close the timer.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for entry in self.entries.values():
+            entry.active = False
+        self.entries.clear()
+        self.ready.clear()
+        del self.schedule[:]
+        self.timer.close()
+
+    def _on_timeout(self, timer):
+        # issue everything due within half an interval with this round
+        horizon = self.loop.now + self.interval // 2
+        while self.schedule and self.schedule[0][0] <= horizon:
+            entry = heapq.heappop(self.schedule)[2]
+            if entry.active:
+                self.ready.append(entry)
+        self._issue()
+
+    def _issue(self):
+        while self.ready and self.pending < self.concurrency:
+            batch = []
+            while self.ready and len(batch) < self.batch_size:
+                entry = self.ready.popleft()
+                if entry.active:
+                    batch.append(entry)
+            if batch:
+                self.pending += 1
+                self.stats_issued += len(batch)
+                StatBatchRequest(batch, self._on_batch, self.loop)
+        if not self.pending and not self.ready:
+            self._flush()
+
+    def _on_batch(self, stat_batch_request, status):
+        self.pending -= 1
+        if self.closed:
+            return
+        records = ffi.buffer(stat_batch_request.c_records)[:]
+        now, size = self.loop.now, _record.size
+        for index, entry in enumerate(stat_batch_request.entries):
+            if not entry.active:
+                continue
+            if status:
+                code, record = entry.code, entry.record
+            else:
+                code = stat_batch_request.c_statuses[index]
+                record = records[index * size:(index + 1) * size] if code == 0 else None
+            if entry.code is not None and (code != entry.code or record != entry.record):
+                fields = _record.unpack(record) if record else (None, ) * 5
+                status_code = error.StatusCodes.get(code)
+                self.changes.append(FSPollChange(entry.path, status_code, *fields))
+                entry.interval = self.interval
+            elif entry.code is not None:
+                entry.interval = min(self.max_interval, entry.interval * 2)
+            entry.code, entry.record = code, record
+            heapq.heappush(self.schedule,
+                           (now + entry.interval, next(self.sequence), entry))
+        self._issue()
+
+    def _flush(self):
+        if self.changes:
+            changes, self.changes = self.changes, []
+            try:
+                self.on_change(self, changes)
+            except Exception:
+                self.loop.handle_exception()
+        if self.closed or self.pending or self.ready:
+            return
+        while self.schedule and not self.schedule[0][2].active:
+            heapq.heappop(self.schedule)
+        if self.schedule:
+            self.timer.start(max(0, self.schedule[0][0] - self.loop.now))
+        else:
+            self.timer.stop()
@@ -15,12 +15,18 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import collections
+import functools
+import heapq
+import os
+import signal as std_signal
 import sys
 
 from .. import base, common, error, handle
 from ..library import ffi, lib
+from ..loop import Loop
 
-from . import pipe, signal, stream
+from . import pipe, signal, stream, timer
 
 
 def disable_stdio_inheritance():
@@ -186,7 +192,7 @@ def uv_exit_cb(process_handle, returncode, signum):
     process_handle.on_exit(process_handle, returncode, signum)
 
 
-def populate_stdio_container(uv_stdio, file_base=None):
+def populate_stdio_container(uv_stdio, file_base=None, loop=None):
     """
     Used internally to populate `uv_stdio_t` with data based on a given
     file like base object.
@@ -195,13 +201,15 @@ def populate_stdio_container(uv_stdio, file_base=None):
         ffi.CData[uv_stdio_t]
     :type file_base:
         uv.Stream | uv.CreatePipe | int | file-like
+    :type loop:
+        uv.Loop
     """
     fileobj = file_base
     if isinstance(file_base, stream.Stream):
         uv_stdio.data.stream = file_base.uv_stream
         uv_stdio.flags = StandardIOFlags.INHERIT_STREAM
     elif isinstance(file_base, CreatePipe):
-        fileobj = pipe.Pipe(ipc=file_base.ipc)
+        fileobj = pipe.Pipe(ipc=file_base.ipc, loop=loop)
         uv_stdio.data.stream = fileobj.uv_stream
         uv_stdio.flags = file_base.flags
     else:
@@ -218,6 +226,250 @@ def populate_stdio_container(uv_stdio, file_base=None):
     return fileobj
 
 
+def _compile_strings(strings):
+    c_strings = [ffi.new('char[]', string.encode()) for string in strings]
+    return c_strings, ffi.new('char*[]', c_strings + [ffi.NULL])
+
+
+def _compile_env(env):
+    keys = list(env.keys())
+    c_strings, c_env = _compile_strings(['%s=%s' % (key, env[key]) for key in keys])
+    return c_strings, c_env, dict(zip(keys, range(len(keys))))
+
+
+class ProcessSpec(object):
+    """
+    Precompiled options to spawn processes from. Arguments, environment
+    variables and standard IO containers are converted to C structures
+    once and reused by every process spawned from the specification,
+    which makes spawning the same program many times considerably
+    cheaper. Pipes requested with :class:`uv.CreatePipe` are created
+    anew for every process.
+
+    Processes are spawned with :func:`uv.ProcessSpec.spawn` or by
+    passing the specification as `arguments` to :class:`uv.Process`.
+
+    .. code-block:: python
+
+        spec = uv.ProcessSpec(['worker', '--quiet'], env=env, stdout=uv.PIPE)
+        for job in jobs:
+            process = spec.spawn(extra_env={'JOB': job}, on_exit=on_exit)
+
+    See :class:`uv.Process` for parameter descriptions.
+
+    :type arguments:
+        list[unicode]
+    :type uid:
+        int
+    :type gid:
+        int
+    :type cwd:
+        unicode
+    :type env:
+        dict[unicode,unicode]
+    :type stdin:
+        int | uv.Stream | uv.CreatePipe | file-like | None
+    :type stdout:
+        int | uv.Stream | uv.CreatePipe | file-like | None
+    :type stderr:
+        int | uv.Stream | uv.CreatePipe | file-like | None
+    :type stdio:
+        list[int | uv.Stream | uv.CreatePipe | file-like]
+    :type flags:
+        int
+    """
+
+    __slots__ = ['arguments', 'uid', 'gid', 'cwd', 'env', 'files', 'flags',
+                 'c_arguments', 'c_args', 'c_cwd', 'c_env_strings', 'c_env',
+                 'env_index', 'c_stdio', 'c_options', 'creates_pipes', 'inherited_env']
+
+    def __init__(self, arguments, uid=None, gid=None, cwd=None, env=None, stdin=None,
+                 stdout=None, stderr=None, stdio=None, flags=ProcessFlags.WINDOWS_HIDE):
+        self.arguments = list(arguments)
+        self.uid = uid
+        self.gid = gid
+        self.cwd = cwd
+        self.env = None if env is None else dict(env)
+        self.files = [stdin, stdout, stderr] + list(stdio or [])
+        if uid is not None:
+            flags |= ProcessFlags.SETUID
+        if gid is not None:
+            flags |= ProcessFlags.SETGID
+        self.flags = flags
+        self.inherited_env = None
+
+        self.c_arguments, self.c_args = _compile_strings(self.arguments)
+        self.c_cwd = ffi.NULL if cwd is None else ffi.new('char[]', cwd.encode())
+        if env is None:
+            self.c_env_strings, self.c_env, self.env_index = [], ffi.NULL, {}
+        else:
+            self.c_env_strings, self.c_env, self.env_index = _compile_env(self.env)
+
+        self.c_stdio = ffi.new('uv_stdio_container_t[]', len(self.files))
+        self.creates_pipes = False
+        for c_stdio, file_base in zip(self.c_stdio, self.files):
+            if isinstance(file_base, CreatePipe):
+                self.creates_pipes = True
+            else:
+                populate_stdio_container(c_stdio, file_base)
+
+        self.c_options = ffi.new('uv_process_options_t*')
+        self.c_options.file = self.c_arguments[0]
+        self.c_options.args = self.c_args
+        self.c_options.cwd = self.c_cwd
+        self.c_options.env = self.c_env
+        self.c_options.stdio_count = len(self.files)
+        self.c_options.stdio = self.c_stdio
+        self.c_options.flags = flags
+        self.c_options.exit_cb = uv_exit_cb
+        lib.cross_set_process_uid_gid(self.c_options, uid or 0, gid or 0)
+
+    def with_env(self, extra_env):
+        """
+        Derive a specification with additional or replaced environment
+        variables. Only the given variables are converted, all other
+        structures are shared with this specification. If this
+        specification inherits the environment of the current process,
+        the current environment is converted on the first call and
+        cached, later changes of :data:`os.environ` are not picked up
+        by derived specifications.
+
+        :param extra_env:
+            environment variables to add or replace
+
+        :type extra_env:
+            dict[unicode,unicode]
+
+        :rtype:
+            uv.ProcessSpec
+        """
+        derived = ProcessSpec.__new__(ProcessSpec)
+        for name in ProcessSpec.__slots__:
+            setattr(derived, name, getattr(self, name))
+        if self.env is None:
+            if self.inherited_env is None:
+                environ = dict(os.environ)
+                c_env_strings, _, env_index = _compile_env(environ)
+                self.inherited_env = environ, c_env_strings, env_index
+            base_env, c_env_strings, env_index = self.inherited_env
+        else:
+            base_env = self.env
+            c_env_strings, env_index = self.c_env_strings, self.env_index
+        derived.env = dict(base_env)
+        derived.env.update(extra_env)
+        c_env_strings, env_index = list(c_env_strings), dict(env_index)
+        for key, value in extra_env.items():
+            c_string = ffi.new('char[]', ('%s=%s' % (key, value)).encode())
+            if key in env_index:
+                c_env_strings[env_index[key]] = c_string
+            else:
+                env_index[key] = len(c_env_strings)
+                c_env_strings.append(c_string)
+        derived.c_env = ffi.new('char*[]', c_env_strings + [ffi.NULL])
+        derived.c_env_strings, derived.env_index = c_env_strings, env_index
+        derived.c_options = ffi.new('uv_process_options_t*')
+        derived.c_options[0] = self.c_options[0]
+        derived.c_options.env = derived.c_env
+        return derived
+
+    def spawn(self, extra_env=None, loop=None, on_exit=None, **overrides):
+        """
+        Spawn a process from the specification. The working directory,
+        the environment, the user and group ids and the standard IO
+        arguments of :class:`uv.Process` may be overridden for this
+        process only.
+
+        :raises uv.UVError:
+            error while spawning the process
+
+        :param extra_env:
+            environment variables to add or replace for this process
+        :param loop:
+            event loop the handle should run on
+        :param on_exit:
+            callback which should be called after process exited
+        :param overrides:
+            arguments of :class:`uv.Process` to override
+
+        :type extra_env:
+            dict[unicode,unicode] | None
+        :type loop:
+            uv.Loop
+        :type on_exit:
+            ((uv.Process, int, int) -> None) |
+            ((Any, uv.Process, int, int) -> None)
+        :type overrides:
+            dict
+
+        :rtype:
+            uv.Process
+        """
+        spec = self if extra_env is None else self.with_env(extra_env)
+        return Process(spec, loop=loop, on_exit=on_exit, **overrides)
+
+    def build(self, loop=None, uid=None, gid=None, cwd=None, env=None, stdin=None,
+              stdout=None, stderr=None, stdio=None):
+        """
+        Build the options for a single spawn. Structures which are not
+        overridden are shared with the specification.
+
+        .. warning::
+            Only for internal purposes!
+
+        :return:
+            options, standard IO objects and C data which has to be kept
+            alive until the process has been spawned
+        :rtype:
+            (ffi.CData[uv_process_options_t*], list, list)
+        """
+        uv_options, references = self.c_options, []
+        if any(value is not None for value in (uid, gid, cwd, env)):
+            uv_options = ffi.new('uv_process_options_t*')
+            uv_options[0] = self.c_options[0]
+            if cwd is not None:
+                c_cwd = ffi.new('char[]', cwd.encode())
+                references.append(c_cwd)
+                uv_options.cwd = c_cwd
+            if env is not None:
+                c_env_strings, c_env, _ = _compile_env(env)
+                references.extend((c_env_strings, c_env))
+                uv_options.env = c_env
+            if uid is not None or gid is not None:
+                flags = self.flags
+                if uid is not None:
+                    flags |= ProcessFlags.SETUID
+                if gid is not None:
+                    flags |= ProcessFlags.SETGID
+                uv_options.flags = flags
+                uid = self.uid if uid is None else uid
+                gid = self.gid if gid is None else gid
+                lib.cross_set_process_uid_gid(uv_options, uid or 0, gid or 0)
+        files = list(self.files)
+        overridden = set()
+        for index, file_base in enumerate((stdin, stdout, stderr)):
+            if file_base is not None:
+                files[index] = file_base
+                overridden.add(index)
+        if stdio is not None:
+            files[3:] = stdio
+            overridden.update(range(3, len(files)))
+        if not overridden and not self.creates_pipes:
+            return uv_options, files, references
+        if uv_options is self.c_options:
+            uv_options = ffi.new('uv_process_options_t*')
+            uv_options[0] = self.c_options[0]
+        c_stdio = ffi.new('uv_stdio_container_t[]', len(files))
+        references.append(c_stdio)
+        for index, file_base in enumerate(files):
+            if index in overridden or isinstance(file_base, CreatePipe):
+                files[index] = populate_stdio_container(c_stdio[index], file_base, loop)
+            else:
+                c_stdio[index] = self.c_stdio[index]
+        uv_options.stdio_count = len(files)
+        uv_options.stdio = c_stdio
+        return uv_options, files, references
+
+
 @handle.HandleTypes.PROCESS
 class Process(handle.Handle):
     """
@@ -228,6 +480,8 @@ class Process(handle.Handle):
 
     uv_handle_type = 'uv_process_t*'
     uv_handle_init = lib.uv_spawn
+    # uv_spawn registers the handle even if spawning fails
+    uv_handle_registered_on_error = True
 
     def __init__(self, arguments, uid=None, gid=None, cwd=None, env=None, stdin=None,
                  stdout=None, stderr=None, stdio=None, flags=ProcessFlags.WINDOWS_HIDE,
@@ -237,7 +491,9 @@ class Process(handle.Handle):
             error while initializing the handle
 
         :param arguments:
-            program path and command line arguments
+            program path and command line arguments or a specification,
+            in which case the other arguments which are not `None`
+            override the specification's and `flags` is ignored
         :param uid:
             spawn as user with user id `uid`
         :param gid:
@@ -262,7 +518,7 @@ class Process(handle.Handle):
             callback which should be called after process exited
 
         :type arguments:
-            list[unicode]
+            list[unicode] | uv.ProcessSpec
         :type uid:
             int
         :type gid:
@@ -288,23 +544,16 @@ class Process(handle.Handle):
             ((Any, uv.Process, int, int) -> None)
         """
 
-        uv_options = ffi.new('uv_process_options_t*')
-
-        c_file = ffi.new('char[]', arguments[0].encode())
-        uv_options.file = c_file
-
-        c_args_list = [ffi.new('char[]', argument.encode()) for argument in arguments]
-        c_args_list.append(ffi.NULL)
-        c_args = ffi.new('char*[]', c_args_list)
-        uv_options.args = c_args
+        if isinstance(arguments, ProcessSpec):
+            spec = arguments
+            uv_options, files, references = spec.build(loop, uid, gid, cwd, env, stdin,
+                                                       stdout, stderr, stdio)
+        else:
+            spec = ProcessSpec(arguments, uid, gid, cwd, env, stdin, stdout, stderr,
+                               stdio, flags)
+            uv_options, files, references = spec.build(loop)
 
-        stdio_count = 3
-        if stdio is not None:
-            stdio_count += len(stdio)
-        uv_options.stdio_count = stdio_count
-
-        c_stdio_containers = ffi.new('uv_stdio_container_t[]', stdio_count)
-        self.stdin = populate_stdio_container(c_stdio_containers[0], stdin)
+        self.stdin = files[0]
         """
         Standard input of the child process.
 
@@ -313,7 +562,7 @@ class Process(handle.Handle):
         :type:
             int | uv.Stream | file-like | None
         """
-        self.stdout = populate_stdio_container(c_stdio_containers[1], stdout)
+        self.stdout = files[1]
         """
         Standard output of the child process.
 
@@ -322,7 +571,7 @@ class Process(handle.Handle):
         :type:
             int | uv.Stream | file-like | None
         """
-        self.stderr = populate_stdio_container(c_stdio_containers[2], stderr)
+        self.stderr = files[2]
         """
         Standard error of the child process.
 
@@ -331,7 +580,7 @@ class Process(handle.Handle):
         :type:
             int | uv.Stream | file-like | None
         """
-        self.stdio = []
+        self.stdio = files[3:]
         """
         Other standard file descriptors of the child process.
 
@@ -340,33 +589,6 @@ class Process(handle.Handle):
         :type:
             list[int | uv.Stream | file-like]
         """
-        if stdio is not None:
-            for number in range(len(stdio)):
-                c_stdio = c_stdio_containers[3 + number]
-                fileobj = populate_stdio_container(c_stdio, stdio[number])
-                self.stdio.append(fileobj)
-        uv_options.stdio = c_stdio_containers
-
-        if cwd is not None:
-            c_cwd = ffi.new('char[]', cwd.encode())
-            uv_options.cwd = c_cwd
-
-        if env is not None:
-            c_env_list = [ffi.new('char[]', ('%s=%s' % item).encode())
-                          for item in env.items()]
-            c_env_list.append(ffi.NULL)
-            c_env = ffi.new('char*[]', c_env_list)
-            uv_options.env = c_env
-
-        if uid is not None:
-            flags |= ProcessFlags.SETUID
-        if gid is not None:
-            flags |= ProcessFlags.SETGID
-
-        lib.cross_set_process_uid_gid(uv_options, uid or 0, gid or 0)
-
-        uv_options.flags = flags
-        uv_options.exit_cb = uv_exit_cb
 
         self.on_exit = on_exit or common.dummy_callback
         """
@@ -397,7 +619,16 @@ class Process(handle.Handle):
             ((uv.Process, int, int) -> None) |
             ((Any, uv.Process, int, int) -> None)
         """
-        super(Process, self).__init__(loop, (uv_options, ))
+        try:
+            super(Process, self).__init__(loop, (uv_options, ))
+        except error.UVError:
+            # pipes created for the process would stay open and attached
+            # to the loop although there is no process to talk to
+            given = list(spec.files) + [stdin, stdout, stderr] + list(stdio or [])
+            for fileobj in files:
+                if isinstance(fileobj, pipe.Pipe) and fileobj not in given:
+                    fileobj.close()
+            raise
         self.uv_process = self.base_handle.uv_object
         self.set_pending()
 
@@ -436,3 +667,415 @@ class Process(handle.Handle):
         code = lib.uv_process_kill(self.uv_process, signum)
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
+
+
+class OutputBuffer(object):
+    """
+    Bounded buffer collecting the output of a child process. Only the
+    last `limit` bytes are kept, older output is dropped. If `split` is
+    true the output is split into lines and incomplete lines at the
+    start of the buffer are dropped along with older output.
+
+    :param limit:
+        maximal number of bytes to keep, `None` for no limit
+    :param split:
+        split the output into lines
+
+    :type limit:
+        int | None
+    :type split:
+        bool
+    """
+
+    __slots__ = ['limit', 'split', 'data', 'dropped']
+
+    def __init__(self, limit=65536, split=False):
+        self.limit = limit
+        self.split = split
+        self.data = bytearray()
+        self.dropped = 0
+        """
+        Number of bytes which have been dropped.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+
+    def __len__(self):
+        return len(self.data)
+
+    def append(self, data):
+        """
+        Append output to the buffer.
+
+        :param data:
+            output of the child process
+
+        :type data:
+            bytes
+        """
+        self.data.extend(data)
+        if self.limit is None or len(self.data) <= self.limit:
+            return
+        excess = len(self.data) - self.limit
+        if self.split:
+            newline = self.data.find(b'\n', excess - 1)
+            excess = len(self.data) if newline < 0 else newline + 1
+        del self.data[:excess]
+        self.dropped += excess
+
+    @property
+    def value(self):
+        """
+        Output kept in the buffer, a list of lines if the buffer splits
+        the output into lines.
+
+        :readonly:
+            True
+        :rtype:
+            bytes | list[bytes]
+        """
+        if self.split:
+            return bytes(self.data).splitlines()
+        return bytes(self.data)
+
+
+class CommandResult(object):
+    """
+    Outcome of a command run by :class:`uv.process.ProcessBatch`.
+
+    .. note::
+        This class must not be instantiated directly.
+    """
+
+    __slots__ = ['index', 'arguments', 'keywords', 'timeout', 'process', 'stdout',
+                 'stderr', 'returncode', 'signum', 'error', 'timed_out', 'started',
+                 'finished', 'pending']
+
+    def __init__(self, index, command, timeout, limit, split_lines):
+        if isinstance(command, dict):
+            command = dict(command)
+            self.arguments = list(command.pop('arguments'))
+            self.timeout = command.pop('timeout', timeout)
+            self.keywords = command
+        else:
+            self.arguments = list(command)
+            self.timeout = timeout
+            self.keywords = {}
+        self.index = index
+        """
+        Index of the command in the batch.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.process = None
+        self.stdout = OutputBuffer(limit, split_lines)
+        """
+        Standard output of the command.
+
+        :readonly:
+            True
+        :type:
+            uv.process.OutputBuffer
+        """
+        self.stderr = OutputBuffer(limit, split_lines)
+        """
+        Standard error of the command.
+
+        :readonly:
+            True
+        :type:
+            uv.process.OutputBuffer
+        """
+        self.returncode = None
+        self.signum = None
+        self.error = None
+        """
+        Error raised while spawning the command or `None`.
+
+        :readonly:
+            True
+        :type:
+            uv.UVError | None
+        """
+        self.timed_out = False
+        self.started = None
+        """
+        Loop timestamp in milliseconds when the command has been spawned.
+
+        :readonly:
+            True
+        :type:
+            int | None
+        """
+        self.finished = None
+        """
+        Loop timestamp in milliseconds when the command has exited and
+        its output has been collected.
+
+        :readonly:
+            True
+        :type:
+            int | None
+        """
+        self.pending = 0
+
+    @property
+    def duration(self):
+        """
+        Run time of the command in milliseconds or `None` if it has not
+        finished yet.
+
+        :readonly:
+            True
+        :rtype:
+            int | None
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def success(self):
+        """
+        Command has been spawned and exited with a return code of zero.
+
+        :readonly:
+            True
+        :rtype:
+            bool
+        """
+        return self.error is None and self.returncode == 0 and not self.signum
+
+
+KILL_SIGNAL = getattr(std_signal, 'SIGKILL', 9)
+
+
+class ProcessBatch(object):
+    """
+    Runs many commands with at most `concurrency` child processes at
+    once. Standard output and standard error of every command are
+    collected through pipes into bounded :class:`uv.process.OutputBuffer`
+    objects. Commands running longer than their timeout are killed, all
+    deadlines share a single timer. Once a killed command has exited its
+    pipes are closed, even if descendants of it still hold them open.
+
+    Commands are either lists of arguments or dictionaries with an
+    `arguments` entry, an optional `timeout` entry overriding the timeout
+    of the batch and further keyword arguments for :class:`uv.Process`,
+    e.g. `cwd` or `env`.
+
+    Commands which could not be spawned do not abort the batch, their
+    error is stored in :attr:`uv.process.CommandResult.error` instead.
+
+    :param commands:
+        commands which should be run
+    :param concurrency:
+        maximal number of child processes at once
+    :param timeout:
+        default timeout of the commands in milliseconds, `None` for none
+    :param limit:
+        maximal number of bytes kept per output buffer
+    :param split_lines:
+        split the collected output into lines
+    :param on_result:
+        callback which should be called after each command has finished
+    :param on_done:
+        callback which should be called after all commands have finished
+        or the batch has been canceled
+    :param loop:
+        event loop the processes should run on
+
+    :type commands:
+        list[list[unicode] | dict]
+    :type concurrency:
+        int
+    :type timeout:
+        int | None
+    :type limit:
+        int | None
+    :type split_lines:
+        bool
+    :type on_result:
+        ((uv.process.ProcessBatch, uv.process.CommandResult) -> None) | None
+    :type on_done:
+        ((uv.process.ProcessBatch) -> None) | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'concurrency', 'results', 'queue', 'running', 'deadlines',
+                 'timer', 'on_result', 'on_done', 'canceled', 'done']
+
+    def __init__(self, commands, concurrency=16, timeout=None, limit=65536,
+                 split_lines=False, on_result=None, on_done=None, loop=None):
+        self.loop = loop or Loop.get_current()
+        self.concurrency = max(1, concurrency)
+        self.results = [CommandResult(index, command, timeout, limit, split_lines)
+                        for index, command in enumerate(commands)]
+        """
+        Results of the commands in the order of the commands.
+
+        :readonly:
+            True
+        :type:
+            list[uv.process.CommandResult]
+        """
+        self.queue = collections.deque(self.results)
+        self.running = 0
+        self.deadlines = []
+        self.timer = None
+        self.on_result = on_result or common.dummy_callback
+        self.on_done = on_done or common.dummy_callback
+        self.canceled = False
+        self.done = False
+        self._schedule()
+
+    def cancel(self):
+        """
+        Cancel the batch. Commands which have not been spawned yet are
+        skipped and running commands are killed.
+        """
+        if self.done:
+            return
+        self.canceled = True
+        self.queue.clear()
+        for result in self.results:
+            if result.process is not None and result.returncode is None:
+                self._kill(result)
+        if not self.running:
+            self._finish()
+
+    def _schedule(self):
+        while self.running < self.concurrency and self.queue:
+            self._spawn(self.queue.popleft())
+        if not self.running and not self.queue:
+            self._finish()
+
+    def _spawn(self, result):
+        self.loop.update_time()
+        result.started = self.loop.now
+        keywords = dict(result.keywords)
+        keywords.update(stdout=CreatePipe(readable=True, writable=True),
+                        stderr=CreatePipe(readable=True, writable=True),
+                        on_exit=functools.partial(self._on_exit, result), loop=self.loop)
+        try:
+            result.process = Process(result.arguments, **keywords)
+        except error.UVError as uv_error:
+            result.error = uv_error
+            result.finished = result.started
+            self.on_result(self, result)
+            return
+        self.running += 1
+        result.pending = 3
+        for output, buffer in ((result.process.stdout, result.stdout),
+                               (result.process.stderr, result.stderr)):
+            output.read_start(functools.partial(self._on_read, result, buffer))
+        if result.timeout is not None:
+            deadline = result.started + result.timeout
+            heapq.heappush(self.deadlines, (deadline, result.index))
+            if self.deadlines[0][1] == result.index:
+                self._arm(deadline)
+
+    def _arm(self, deadline):
+        if self.timer is None:
+            self.timer = timer.Timer(loop=self.loop, on_timeout=self._on_timeout)
+        self.timer.start(max(0, deadline - self.loop.now))
+
+    def _kill(self, result):
+        try:
+            result.process.kill(KILL_SIGNAL)
+        except error.UVError:
+            pass
+
+    def _on_timeout(self, timer_handle):
+        now = self.loop.now
+        while self.deadlines and self.deadlines[0][0] <= now:
+            result = self.results[heapq.heappop(self.deadlines)[1]]
+            if result.returncode is None:
+                result.timed_out = True
+                self._kill(result)
+        if self.deadlines:
+            self._arm(self.deadlines[0][0])
+
+    def _on_read(self, result, buffer, pipe_handle, status, data):
+        if status == error.StatusCodes.SUCCESS:
+            buffer.append(data)
+        else:
+            pipe_handle.close()
+            self._release(result)
+
+    def _on_exit(self, result, process_handle, returncode, signum):
+        process_handle.close()
+        result.returncode = returncode
+        result.signum = signum
+        if result.timed_out or self.canceled:
+            # descendants of a killed command might still hold the pipes open
+            for output in (process_handle.stdout, process_handle.stderr):
+                if not output.closing:
+                    output.close()
+                    self._release(result)
+        self._release(result)
+
+    def _release(self, result):
+        result.pending -= 1
+        if result.pending:
+            return
+        self.loop.update_time()
+        result.finished = self.loop.now
+        self.running -= 1
+        self.on_result(self, result)
+        if not self.done:
+            self._schedule()
+
+    def _finish(self):
+        if self.done:
+            return
+        self.done = True
+        if self.timer is not None:
+            self.timer.close()
+        self.on_done(self)
+
+
+def run_many(commands, concurrency=16, timeout=None, limit=65536, split_lines=False,
+             on_result=None, on_done=None, loop=None):
+    """
+    Run many commands with a bounded number of child processes. See
+    :class:`uv.process.ProcessBatch` for parameter descriptions.
+
+    .. code-block:: python
+
+        def on_done(batch):
+            for result in batch.results:
+                print(result.arguments, result.returncode, result.duration)
+
+        commands = [['ssh', host, 'uptime'] for host in hosts]
+        uv.process.run_many(commands, concurrency=64, timeout=10000, on_done=on_done)
+
+    :type commands:
+        list[list[unicode] | dict]
+    :type concurrency:
+        int
+    :type timeout:
+        int | None
+    :type limit:
+        int | None
+    :type split_lines:
+        bool
+    :type on_result:
+        ((uv.process.ProcessBatch, uv.process.CommandResult) -> None) | None
+    :type on_done:
+        ((uv.process.ProcessBatch) -> None) | None
+    :type loop:
+        uv.Loop
+
+    :rtype:
+        uv.process.ProcessBatch
+    """
+    return ProcessBatch(commands, concurrency, timeout, limit, split_lines, on_result,
+                        on_done, loop)
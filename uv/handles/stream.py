@@ -15,7 +15,9 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from .. import base, common, error, handle, library, request
+import functools
+
+from .. import base, common, error, fs, handle, library, request
 from ..library import ffi, lib
 
 
@@ -282,6 +284,179 @@ class ConnectRequest(request.Request):
         """
 
 
+class Sendfile(object):
+    """
+    Operation copying a file to a stream with `sendfile()` on libuv's
+    threadpool, without passing the data through Python. The file is
+    sent in chunks, each chunk is one filesystem request. If the
+    stream's socket buffer is full a single page is read and written
+    through the stream instead, whose completion signals that the stream
+    is writable again.
+
+    .. note::
+        Nothing else should be written to the stream until the
+        operation has been completed.
+
+    :param stream:
+        stream to send the file to
+    :param fd:
+        file descriptor of the file to send
+    :param offset:
+        position in the file to start sending at
+    :param count:
+        number of bytes to send, `None` sends until the end of the file
+    :param on_done:
+        callback which should run after the file has been sent, on
+        error or after the operation has been canceled
+    :param on_progress:
+        callback which should run after each chunk with the number of
+        bytes sent so far
+    :param chunk_size:
+        maximal number of bytes sent by one filesystem request
+
+    :type stream:
+        uv.Stream
+    :type fd:
+        int
+    :type offset:
+        int
+    :type count:
+        int | None
+    :type on_done:
+        ((uv.Sendfile, uv.StatusCodes) -> None) | None
+    :type on_progress:
+        ((uv.Sendfile, int) -> None) | None
+    :type chunk_size:
+        int
+    """
+
+    __slots__ = ['stream', 'fd', 'offset', 'count', 'sent', 'chunk_size', 'on_done',
+                 'on_progress', 'fs_request', 'canceled', 'done']
+
+    # bytes read and written through the stream if the socket buffer is full
+    fallback_size = 4096
+
+    def __init__(self, stream, fd, offset=0, count=None, on_done=None, on_progress=None,
+                 chunk_size=2**20):
+        if stream.closing:
+            raise error.ClosedHandleError()
+        self.stream = stream
+        self.fd = fd
+        self.offset = offset
+        self.count = count
+        self.sent = 0
+        """
+        Number of bytes sent so far.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.chunk_size = chunk_size
+        self.on_done = on_done or common.dummy_callback
+        self.on_progress = on_progress or common.dummy_callback
+        self.fs_request = None
+        self.canceled = False
+        self.done = False
+        """
+        Operation has been completed.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        if stream.uv_stream.write_queue_size:
+            # start sending after the pending writes have been completed
+            stream.write(b'', on_write=self._on_written)
+        else:
+            self._send()
+
+    def cancel(self):
+        """
+        Cancel the operation. The done callback is called with
+        :attr:`uv.StatusCodes.ECANCELED` once the chunk which is
+        currently being sent has been completed.
+        """
+        if self.done or self.canceled:
+            return
+        self.canceled = True
+        if self.fs_request is not None:
+            try:
+                self.fs_request.cancel()
+            except error.UVError:
+                pass
+
+    def _finish(self, status):
+        self.done = True
+        self.fs_request = None
+        self.on_done(self, status)
+
+    def _remaining(self):
+        if self.count is None:
+            return self.chunk_size
+        return min(self.chunk_size, self.count - self.sent)
+
+    def _send(self):
+        if self.canceled or self.stream.closing:
+            self._finish(error.StatusCodes.ECANCELED)
+        elif not self._remaining():
+            self._finish(error.StatusCodes.SUCCESS)
+        else:
+            self.fs_request = fs.sendfile(self.stream.fileno(), self.fd,
+                                          self.offset + self.sent, self._remaining(),
+                                          callback=self._on_sent, loop=self.stream.loop)
+
+    def _advance(self, length):
+        self.sent += length
+        self.on_progress(self, self.sent)
+        self._send()
+
+    def _on_end(self):
+        if self.count is None:
+            self._finish(error.StatusCodes.SUCCESS)
+        else:
+            self._finish(error.StatusCodes.EOF)
+
+    def _on_sent(self, request, status, length):
+        self.fs_request = None
+        if status == error.StatusCodes.EAGAIN and not self.canceled:
+            length = min(self.fallback_size, self._remaining())
+            self.fs_request = fs.read(self.fd, length, self.offset + self.sent,
+                                      callback=self._on_read, loop=self.stream.loop)
+        elif status != error.StatusCodes.SUCCESS:
+            self._finish(error.StatusCodes.ECANCELED if self.canceled else status)
+        elif not length:
+            self._on_end()
+        else:
+            self._advance(length)
+
+    def _on_read(self, request, status, data):
+        self.fs_request = None
+        if status != error.StatusCodes.SUCCESS:
+            self._finish(status)
+        elif not data:
+            self._on_end()
+        elif self.canceled or self.stream.closing:
+            self._finish(error.StatusCodes.ECANCELED)
+        else:
+            self.stream.write(data, on_write=functools.partial(self._on_fallback_written,
+                                                               len(data)))
+
+    def _on_fallback_written(self, length, request, status):
+        if status != error.StatusCodes.SUCCESS:
+            self._finish(status)
+        else:
+            self._advance(length)
+
+    def _on_written(self, request, status):
+        if status != error.StatusCodes.SUCCESS:
+            self._finish(status)
+        else:
+            self._send()
+
+
 @base.handle_callback('uv_connection_cb')
 def uv_connection_cb(stream_handle, status):
     """
@@ -609,6 +784,53 @@ class Stream(handle.Handle):
             raise error.UVError(code)
         return code
 
+    def sendfile(self, file_or_fd, offset=0, count=None, on_done=None, on_progress=None,
+                 chunk_size=2**20):
+        """
+        Send a file to the stream with `sendfile()` on libuv's
+        threadpool without copying it through Python. The file is sent
+        in chunks, after the pending writes have been completed. See
+        :class:`uv.Sendfile` for details.
+
+        :raises uv.ClosedHandleError:
+            handle has already been closed or is closing
+
+        :param file_or_fd:
+            file descriptor or object with a `fileno()` method
+        :param offset:
+            position in the file to start sending at
+        :param count:
+            number of bytes to send, `None` sends until the end of the file
+        :param on_done:
+            callback which should run after the file has been sent, on
+            error or after the operation has been canceled
+        :param on_progress:
+            callback which should run after each chunk with the number
+            of bytes sent so far
+        :param chunk_size:
+            maximal number of bytes sent by one filesystem request
+
+        :type file_or_fd:
+            int | uv.fs.File | io.IOBase
+        :type offset:
+            int
+        :type count:
+            int | None
+        :type on_done:
+            ((uv.Sendfile, uv.StatusCodes) -> None) | None
+        :type on_progress:
+            ((uv.Sendfile, int) -> None) | None
+        :type chunk_size:
+            int
+
+        :returns:
+            sendfile operation which can be canceled
+        :rtype:
+            uv.Sendfile
+        """
+        fd = file_or_fd if isinstance(file_or_fd, int) else file_or_fd.fileno()
+        return Sendfile(self, fd, offset, count, on_done, on_progress, chunk_size)
+
     def accept(self, cls=None, *arguments, **keywords):
         """
         Accept a new stream. This might be a new client connection or a
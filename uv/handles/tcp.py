@@ -15,9 +15,11 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
 import socket
 
 from .. import common, dns, error, handle
+from ..helpers.sockets import make_reuse_port_socket
 from ..library import ffi, lib
 
 from . import stream
@@ -126,7 +128,7 @@ class TCP(stream.Stream):
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
 
-    def bind(self, address, flags=0):
+    def bind(self, address, flags=0, reuse_port=False):
         """
         Bind the handle to an address. When the port is already taken,
         you can expect to see an :class:`uv.StatusCode.EADDRINUSE`
@@ -134,6 +136,12 @@ class TCP(stream.Stream):
         a successful call to this function does not guarantee that the
         call to `listen()` or `connect()` will succeed as well.
 
+        If `reuse_port` is true the socket is created with `SO_REUSEPORT`
+        set, so several handles, typically in different processes, can
+        listen on the same address and the kernel distributes incoming
+        connections among them. This requires a handle created without
+        an address family.
+
         :raises uv.UVError:
             error while binding to `address`
         :raises uv.ClosedHandleError:
@@ -143,14 +151,28 @@ class TCP(stream.Stream):
             address to bind to `(ip, port, flowinfo=0, scope_id=0)`
         :param flags:
             bind flags to be used (mask of :class:`uv.TCPFlags`)
+        :param reuse_port:
+            bind with `SO_REUSEPORT`
 
         :type address:
             uv.Address4 | uv.Address6 | tuple
         :type flags:
             int
+        :type reuse_port:
+            bool
         """
         if self.closing:
             raise error.ClosedHandleError()
+        if reuse_port:
+            # like libuv's own bind, which sets SO_REUSEADDR on Unix
+            ipv6_only = bool(flags & TCPFlags.IPV6ONLY)
+            fd = make_reuse_port_socket(address, socket.SOCK_STREAM, ipv6_only, True)
+            try:
+                self.open(fd)
+            except error.UVError:
+                os.close(fd)
+                raise
+            return
         code = lib.uv_tcp_bind(self.uv_tcp, dns.make_c_sockaddr(*address), flags)
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
@@ -15,7 +15,11 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import socket
+
 from .. import base, common, dns, error, handle, library, request
+from ..helpers.sockets import make_reuse_port_socket
 from ..library import ffi, lib
 
 
@@ -281,10 +285,16 @@ class UDP(handle.Handle):
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
 
-    def bind(self, address, flags=0):
+    def bind(self, address, flags=0, reuse_port=False):
         """
         Bind the socket to the specified address.
 
+        If `reuse_port` is true the socket is created with `SO_REUSEPORT`
+        set, so several handles, typically in different processes, can
+        be bound to the same address and the kernel distributes incoming
+        datagrams among them. This requires a handle created without an
+        address family.
+
         :raises uv.UVError:
             error while binding to `address`
         :raises uv.ClosedHandleError:
@@ -294,14 +304,28 @@ class UDP(handle.Handle):
             address to bind to `(ip, port, flowinfo=0, scope_id=0)`
         :param flags
             bind flags to be used (mask of :class:`uv.UDPFlags`)
+        :param reuse_port:
+            bind with `SO_REUSEPORT`
 
         :type address:
             uv.Address4 | uv.Address6 | tuple
         :type flags:
             int
+        :type reuse_port:
+            bool
         """
         if self.closing:
             raise error.ClosedHandleError()
+        if reuse_port:
+            fd = make_reuse_port_socket(address, socket.SOCK_DGRAM,
+                                        bool(flags & UDPFlags.IPV6ONLY),
+                                        bool(flags & UDPFlags.REUSEADDR))
+            try:
+                self.open(fd)
+            except error.UVError:
+                os.close(fd)
+                raise
+            return
         code = lib.uv_udp_bind(self.uv_udp, dns.make_c_sockaddr(*address), flags)
         if code != error.StatusCodes.SUCCESS:
             raise error.UVError(code)
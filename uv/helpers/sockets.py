@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Plain sockets for the cases libuv's own bind does not cover.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import socket
+
+from .. import error
+
+
+def make_reuse_port_socket(address, socket_type, ipv6_only=False, reuse_address=False):
+    """
+    Create a socket bound to the given address with `SO_REUSEPORT` set,
+    so several sockets, e.g. one per process, can be bound to the same
+    address and the kernel distributes incoming connections or
+    datagrams among them.
+
+    :raises uv.UVError:
+        error while creating or binding the socket, or
+        :attr:`uv.StatusCodes.ENOTSUP` if the platform does not
+        support `SO_REUSEPORT`
+
+    :param address:
+        address to bind to `(ip, port, flowinfo=0, scope_id=0)`
+    :param socket_type:
+        type of the socket, e.g. :data:`socket.SOCK_STREAM`
+    :param ipv6_only:
+        disable dual-stack support for IPv6 addresses
+    :param reuse_address:
+        additionally set `SO_REUSEADDR`
+
+    :type address:
+        uv.Address4 | uv.Address6 | tuple
+    :type socket_type:
+        int
+    :type ipv6_only:
+        bool
+    :type reuse_address:
+        bool
+
+    :return:
+        file descriptor of the bound socket
+    :rtype:
+        int
+    """
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise error.UVError(error.StatusCodes.ENOTSUP)
+    family = socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+    try:
+        sock = socket.socket(family, socket_type)
+    except socket.error as socket_error:
+        raise error.UVError(error.StatusCodes.from_error_number(socket_error.errno))
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if reuse_address:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_INET6:
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, int(ipv6_only))
+        sock.bind(tuple(address))
+    except socket.error as socket_error:
+        sock.close()
+        raise error.UVError(error.StatusCodes.from_error_number(socket_error.errno))
+    try:
+        return sock.detach()
+    except AttributeError:  # pragma: no cover
+        fd = os.dup(sock.fileno())
+        sock.close()
+        return fd
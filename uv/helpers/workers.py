@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Internals shared by the helper processes of :mod:`uv.processpool`,
+:mod:`uv.cluster` and :mod:`uv.zygote`: length prefixed framing, child
+processes talking over an additional pipe and restarting crashed children
+with exponential backoff.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import struct
+import sys
+
+from .. import error
+from ..handles.process import PIPE, Process
+from ..handles.timer import Timer
+
+
+header = struct.Struct('!I')
+
+WORKER_FD = 3
+
+RESTART_DELAY = 50
+RESTART_DELAY_MAX = 30000
+
+
+def read_exactly(fd, length):
+    chunks = []
+    while length:
+        chunk = os.read(fd, length)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        length -= len(chunk)
+    return b''.join(chunks)
+
+
+def write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def read_frame(fd):
+    """
+    Read a length prefixed frame from the file descriptor, blocking.
+
+    :rtype:
+        bytes | None
+    """
+    data = read_exactly(fd, header.size)
+    if data is None:
+        return None
+    return read_exactly(fd, *header.unpack(data))
+
+
+def write_frame(fd, payload):
+    write_all(fd, header.pack(len(payload)) + payload)
+
+
+def pack_frame(payload):
+    return [header.pack(len(payload)), payload]
+
+
+def unpack_frames(buffer):
+    """
+    Remove all complete length prefixed frames from the buffer.
+
+    :type buffer:
+        bytearray
+
+    :rtype:
+        list[bytes]
+    """
+    frames = []
+    while len(buffer) >= header.size:
+        end = header.size + header.unpack_from(buffer)[0]
+        if len(buffer) < end:
+            break
+        frames.append(bytes(buffer[header.size:end]))
+        del buffer[:end]
+    return frames
+
+
+def unpack_records(buffer, record):
+    """
+    Remove all complete fixed size records from the buffer.
+
+    :type buffer:
+        bytearray
+    :type record:
+        struct.Struct
+
+    :rtype:
+        list[tuple]
+    """
+    end = len(buffer) - len(buffer) % record.size
+    records = [record.unpack_from(buffer, offset)
+               for offset in range(0, end, record.size)]
+    del buffer[:end]
+    return records
+
+
+class ChildProcess(object):
+    """
+    Python child process running `code` with an inter process communication
+    pipe as file descriptor :data:`WORKER_FD`. The child is dead once it
+    has exited and the pipe has been closed, in whichever order.
+    Subclasses implement :func:`_on_data` and :func:`_on_dead`.
+    """
+
+    __slots__ = ['process', 'pipe', 'buffer', 'exited', 'eof', 'retiring']
+
+    def __init__(self, code, loop):
+        self.process = Process([sys.executable, '-c', code], stdout=1, stderr=2,
+                               stdio=[PIPE], loop=loop, on_exit=self._on_exit)
+        self.pipe = self.process.stdio[0]
+        self.buffer = bytearray()
+        self.exited = False
+        self.eof = False
+        self.retiring = False
+        self.pipe.read_start(self._on_read)
+
+    def retire(self):
+        self.retiring = True
+        self._close_pipe()
+
+    def _close_pipe(self):
+        self.eof = True
+        self.pipe.close()
+        if self.exited:
+            self._on_dead()
+
+    def _on_read(self, pipe, status, data):
+        if status != error.StatusCodes.SUCCESS:
+            self._close_pipe()
+            return
+        self.buffer.extend(data)
+        self._on_data(self.buffer)
+
+    def _on_exit(self, process, returncode, signum):
+        process.close()
+        self.exited = True
+        if self.eof:
+            self._on_dead()
+
+    def _on_data(self, buffer):
+        raise NotImplementedError()
+
+    def _on_dead(self):
+        raise NotImplementedError()
+
+
+class Restarter(object):
+    """
+    Schedule replacements for crashed children. Consecutive restarts are
+    delayed exponentially, starting with :data:`RESTART_DELAY` milliseconds
+    up to :data:`RESTART_DELAY_MAX`, until :func:`reset` is called once a
+    child is healthy again. After `max_restarts` consecutive restarts
+    `on_exhausted` is called instead of scheduling another one.
+    """
+
+    __slots__ = ['timer', 'on_restart', 'on_exhausted', 'max_restarts', 'restarts',
+                 'pending']
+
+    def __init__(self, loop, on_restart, on_exhausted, max_restarts=None):
+        self.timer = Timer(loop=loop, on_timeout=self._on_timeout)
+        self.on_restart = on_restart
+        self.on_exhausted = on_exhausted
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.pending = 0
+
+    def schedule(self):
+        if self.max_restarts is not None and self.restarts >= self.max_restarts:
+            self.on_exhausted()
+            return
+        delay = min(RESTART_DELAY_MAX, RESTART_DELAY << min(self.restarts, 16))
+        self.restarts += 1
+        self.pending += 1
+        if not self.timer.active:
+            self.timer.start(delay)
+
+    def reset(self):
+        self.restarts = 0
+
+    def close(self):
+        self.pending = 0
+        self.timer.close()
+
+    def _on_timeout(self, timer):
+        pending, self.pending = self.pending, 0
+        for _ in range(pending):
+            try:
+                self.on_restart()
+            except error.UVError:
+                self.schedule()
@@ -123,18 +123,57 @@ def c_require(structure, *requirements):
         _c_dependencies[structure] = [requirements]
 
 
+class PinnedBuffer(object):
+    """
+    Buffer which is passed to libuv without copying. The buffer object
+    and thereby its owner are kept alive until the request using it has
+    been completed, the memory must not be modified during that time.
+
+    :param c_base:
+        start of the buffer
+    :param length:
+        length of the buffer
+    :param owner:
+        object owning the buffer's memory
+
+    :type c_base:
+        ffi.CData[char*]
+    :type length:
+        int
+    :type owner:
+        Any
+    """
+
+    __slots__ = ['c_base', 'length', 'owner']
+
+    def __init__(self, c_base, length, owner=None):
+        self.c_base = c_base
+        self.length = length
+        self.owner = owner
+
+    def __len__(self):
+        return self.length
+
+
 def make_uv_buffers(iterable_or_bytes):
-    if isinstance(iterable_or_bytes, bytes):
+    if isinstance(iterable_or_bytes, (bytes, PinnedBuffer)):
         buffers = (iterable_or_bytes, )
     elif isinstance(iterable_or_bytes, (list, tuple)):
         buffers = iterable_or_bytes
     elif isinstance(iterable_or_bytes, collections.Iterable):
-        buffers = [bytes(item) for item in iterable_or_bytes]
+        buffers = [item if isinstance(item, PinnedBuffer) else bytes(item)
+                   for item in iterable_or_bytes]
     else:
         raise Exception('fix me')
-    c_buffers = [ffi.new('char[]', item) for item in buffers]
     uv_buffers = ffi.new('uv_buf_t[]', len(buffers))
+    c_buffers = []
+    for index, item in enumerate(buffers):
+        if isinstance(item, PinnedBuffer):
+            c_buffers.append(item)
+            lib.py_uv_buf_set(uv_buffers + index, item.c_base, item.length)
+        else:
+            c_base = ffi.new('char[]', item)
+            c_buffers.append(c_base)
+            lib.py_uv_buf_set(uv_buffers + index, c_base, len(c_base) - 1)
     c_require(uv_buffers, c_buffers)
-    for index, c_base in enumerate(c_buffers):
-        lib.py_uv_buf_set(uv_buffers + index, c_base, len(c_base) - 1)
     return uv_buffers
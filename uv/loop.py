@@ -16,6 +16,7 @@
 from __future__ import print_function, unicode_literals, division, absolute_import
 
 import abc
+import bisect
 import collections
 import sys
 import threading
@@ -62,6 +63,113 @@ class RunModes(common.Enumeration):
     """
 
 
+class IterationPhases(common.Enumeration):
+    """
+    Phases of a loop iteration iteration hooks might be attached to
+    using :func:`uv.Loop.add_iteration_hook`.
+    """
+
+    BEFORE_POLL = 0
+    """
+    Run once per loop iteration right before polling for IO. This is
+    the phase :class:`uv.Prepare` handles run in.
+
+    :type: uv.IterationPhases
+    """
+
+    AFTER_POLL = 1
+    """
+    Run once per loop iteration right after polling for IO. This is
+    the phase :class:`uv.Check` handles run in.
+
+    :type: uv.IterationPhases
+    """
+
+
+class IterationHook(object):
+    """
+    Callback attached to a specific phase of every loop iteration. All
+    hooks of a phase are dispatched from one internal handle, so there
+    is only one crossing between libuv and Python per phase no matter
+    how many hooks are registered. Hooks are created with
+    :func:`uv.Loop.add_iteration_hook`.
+
+    .. note::
+        Unlike :class:`uv.Prepare` and :class:`uv.Check` handles hooks
+        do not keep the event loop alive.
+    """
+
+    __slots__ = ['loop', 'phase', 'priority', 'callback', 'active', 'sequence']
+
+    def __init__(self, loop, phase, callback, priority, sequence):
+        self.loop = loop
+        """
+        Loop the hook is attached to.
+
+        :readonly:
+            True
+        :type:
+            uv.Loop
+        """
+        self.phase = phase
+        """
+        Phase of the loop iteration the hook runs in.
+
+        :readonly:
+            True
+        :type:
+            uv.IterationPhases
+        """
+        self.priority = priority
+        """
+        Hooks with lower priority values run first. Hooks with equal
+        priority run in the order they have been added.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.callback = callback
+        """
+        Callback which should run once per loop iteration.
+
+
+        .. function:: callback(loop)
+
+            :param loop:
+                loop the hook is attached to
+
+            :type loop:
+                uv.Loop
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.Loop) -> None) | ((Any, uv.Loop) -> None)
+        """
+        self.active = True
+        """
+        Hook is attached to the loop and runs once per iteration.
+
+        :readonly:
+            True
+        :type:
+            bool
+        """
+        self.sequence = sequence
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    def remove(self):
+        """
+        Remove the hook from the loop. This method is idempotent.
+        """
+        self.loop.remove_iteration_hook(self)
+
+
 def default_excepthook(loop, exc_type, exc_value, exc_traceback):  # pragma: no cover
     """
     Default excepthook. Prints a traceback and stops the event loop to
@@ -356,6 +464,37 @@ class Loop(object):
             traceback
         """
 
+        self.iteration_hooks = {IterationPhases.BEFORE_POLL: [],
+                                IterationPhases.AFTER_POLL: []}
+        self.iteration_hooks_sequence = 0
+        self.before_poll_hooks = ()
+        self.after_poll_hooks = ()
+
+        self.activity = 0
+        """
+        Number of callbacks dispatched by the loop while activity has
+        been tracked. Used to detect activity in
+        :func:`uv.Loop.run_low_latency`.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.track_activity = False
+        """
+        Count dispatched callbacks in :attr:`uv.Loop.activity`. Only
+        enabled while :func:`uv.Loop.run_low_latency` runs, so other
+        run modes do not pay for the bookkeeping.
+
+        :readonly:
+            False
+        :type:
+            bool
+        """
+        self.stop_requested = False
+        self.after_run_callbacks = collections.deque()
+
         self.make_current()
         self.pending_structures = set()
         self.pending_callbacks = collections.deque()
@@ -500,7 +639,77 @@ class Loop(object):
         if self.closed:
             raise error.ClosedLoopError()
         self.make_current()
-        return bool(lib.uv_run(self.uv_loop, mode))
+        result = bool(lib.uv_run(self.uv_loop, mode))
+        self.stop_requested = False
+        self.on_after_run()
+        return result
+
+    def run_low_latency(self, spin_us=50, adaptive=True):
+        """
+        Run the loop until there are no more active and referenced
+        handles or requests, trading CPU time for latency. After any
+        activity the loop busy-polls for IO without blocking for up to
+        `spin_us` microseconds before it falls back to blocking in the
+        backend (e.g. epoll). This avoids the wakeup latency of the
+        backend for request/response traffic that arrives in quick
+        succession.
+
+        If `adaptive` is true the spin window follows the observed
+        inter-arrival time of callbacks: it is twice the average gap
+        between two callbacks, bounded by `spin_us`, and shrinks to
+        zero if callbacks arrive less frequently than `spin_us`.
+
+        :raises uv.ClosedLoopError:
+            loop has already been closed
+
+        :param spin_us:
+            maximal busy-poll window in microseconds
+        :param adaptive:
+            adapt the spin window to the observed inter-arrival time
+
+        :type spin_us:
+            int
+        :type adaptive:
+            bool
+
+        :returns:
+            `True` if :func:`uv.Loop.stop` was called and there are
+            still active handles or requests and `False` otherwise
+        :rtype:
+            bool
+        """
+        if self.closed:
+            raise error.ClosedLoopError()
+        self.make_current()
+        uv_loop = self.uv_loop
+        spin_max = spin_us * 1000
+        window = spin_max
+        average_gap = spin_max
+        last_activity = lib.uv_hrtime()
+        alive = True
+        tracked = self.track_activity
+        self.track_activity = True
+        try:
+            while alive and not self.stop_requested:
+                activity = self.activity
+                if lib.uv_hrtime() - last_activity < window:
+                    alive = lib.uv_run(uv_loop, lib.UV_RUN_NOWAIT)
+                else:
+                    alive = lib.uv_run(uv_loop, lib.UV_RUN_ONCE)
+                if self.activity != activity:
+                    now = lib.uv_hrtime()
+                    if adaptive:
+                        average_gap += (now - last_activity - average_gap) // 8
+                        window = min(spin_max, 2 * average_gap)
+                        if average_gap > spin_max:
+                            window = 0
+                    last_activity = now
+            result = bool(alive) and self.stop_requested
+        finally:
+            self.track_activity = tracked
+            self.stop_requested = False
+        self.on_after_run()
+        return result
 
     def stop(self):
         """
@@ -511,8 +720,34 @@ class Loop(object):
         """
         if self.closed:
             return
+        self.stop_requested = True
         lib.uv_stop(self.uv_loop)
 
+    def fork(self):
+        """
+        Reinitialize the loop in a child process after :func:`os.fork`.
+        This has to be called in the child before the loop runs again.
+        Handles keep working in the child, e.g. listening sockets created
+        before the fork, except for :class:`uv.FSEvent` handles which
+        have to be closed and created anew.
+
+        :raises uv.UVError:
+            error while reinitializing the loop, :attr:`uv.StatusCodes.ENOSYS`
+            if the platform or libuv version does not support it
+        :raises uv.ClosedLoopError:
+            loop has already been closed
+        """
+        if self.closed:
+            raise error.ClosedLoopError()
+        code = lib.cross_uv_loop_fork(self.uv_loop)
+        if code != error.StatusCodes.SUCCESS:
+            raise error.UVError(code)
+        # the lock may have been held by another thread of the parent
+        self.pending_callbacks_lock = threading.RLock()
+        self.stop_requested = False
+        if self.pending_callbacks:
+            self.base_loop.wakeup()
+
     def close(self):
         """
         Closes all internal loop resources. This method must only be
@@ -574,6 +809,126 @@ class Loop(object):
             self.base_loop.wakeup()
             self.base_loop.reference_internal_async()
 
+    def call_after_run(self, callback, *arguments, **keywords):
+        """
+        Schedule a callback to run once the current run of the loop has
+        returned, outside of any callback. This does not stop the loop,
+        use :func:`uv.Loop.stop` for that.
+
+        :param callback:
+            callback which should run after the current run
+        :param arguments:
+            arguments that should be passed to the callback
+        :param keywords:
+            keyword arguments that should be passed to the callback
+
+        :type callback:
+            callable
+        :type arguments:
+            tuple
+        :type keywords:
+            dict
+        """
+        self.after_run_callbacks.append((callback, arguments, keywords))
+
+    def run_in_threadpool(self, function, *arguments, **keywords):
+        """
+        Run a function on libuv's threadpool and call `on_done`, which
+        has to be passed as keyword argument, on the loop's thread once
+        the function has returned. All other arguments are passed to the
+        function. See :class:`uv.WorkRequest` for details.
+
+        :param function:
+            function which should run on the threadpool
+        :param arguments:
+            arguments that should be passed to the function
+        :param keywords:
+            keyword arguments that should be passed to the function
+
+        :type function:
+            callable
+        :type arguments:
+            tuple
+        :type keywords:
+            dict
+
+        :rtype:
+            uv.WorkRequest
+        """
+        # imported here as the threadpool module depends on this module
+        from .threadpool import WorkRequest
+        on_done = keywords.pop('on_done', None)
+        return WorkRequest(function, arguments, keywords, on_done, self)
+
+    def add_iteration_hook(self, phase, callback, priority=0):
+        """
+        Attach a callback to a phase of every loop iteration. This is a
+        cheap alternative to one :class:`uv.Prepare` or :class:`uv.Check`
+        handle per callback for things like write coalescing, deferred
+        callbacks or metrics. Hooks added or removed during dispatch
+        take effect in the next iteration, except for removed hooks
+        which never run after they have been removed.
+
+        :raises uv.ClosedLoopError:
+            loop has already been closed
+
+        :param phase:
+            phase of the loop iteration the callback should run in
+        :param callback:
+            callback which should run once per loop iteration
+        :param priority:
+            hooks with lower priority values run first
+
+        :type phase:
+            uv.IterationPhases
+        :type callback:
+            ((uv.Loop) -> None) | ((Any, uv.Loop) -> None)
+        :type priority:
+            int
+
+        :returns:
+            handle to remove the hook again
+        :rtype:
+            uv.loop.IterationHook
+        """
+        if self.closed:
+            raise error.ClosedLoopError()
+        phase = IterationPhases(phase)
+        self.iteration_hooks_sequence += 1
+        hook = IterationHook(self, phase, callback, priority,
+                             self.iteration_hooks_sequence)
+        bisect.insort(self.iteration_hooks[phase], hook)
+        self._update_iteration_hooks(phase)
+        return hook
+
+    def remove_iteration_hook(self, hook):
+        """
+        Remove a hook added with :func:`uv.Loop.add_iteration_hook`. This
+        method is idempotent.
+
+        :param hook:
+            hook which should be removed
+
+        :type hook:
+            uv.loop.IterationHook
+        """
+        if not hook.active:
+            return
+        hook.active = False
+        self.iteration_hooks[hook.phase].remove(hook)
+        self._update_iteration_hooks(hook.phase)
+
+    def _update_iteration_hooks(self, phase):
+        hooks = tuple(self.iteration_hooks[phase])
+        if phase == IterationPhases.BEFORE_POLL:
+            self.before_poll_hooks = hooks
+        else:
+            if hooks and not self.after_poll_hooks:
+                self.base_loop.start_internal_check()
+            elif not hooks and self.after_poll_hooks and not self.closed:
+                self.base_loop.stop_internal_check()
+            self.after_poll_hooks = hooks
+
     def reset_exception(self):
         self.exc_type = None
         self.exc_value = None
@@ -591,6 +946,8 @@ class Loop(object):
             while True:
                 with self.pending_callbacks_lock:
                     callback, arguments, keywords = self.pending_callbacks.popleft()
+                if self.track_activity:
+                    self.activity += 1
                 try:
                     callback(*arguments, **keywords)
                 except Exception:
@@ -601,6 +958,48 @@ class Loop(object):
             if not self.pending_callbacks:
                 self.base_loop.dereference_internal_async()
 
+    def on_after_run(self):
+        """
+        Called after a run of the loop has returned.
+
+         .. warning::
+            This method is only for internal purposes and is not part
+            of the official API. You should never call it directly!
+        """
+        while self.after_run_callbacks:
+            callback, arguments, keywords = self.after_run_callbacks.popleft()
+            callback(*arguments, **keywords)
+
+    def on_prepare(self):
+        """
+        Called once per loop iteration right before polling for IO.
+
+         .. warning::
+            This method is only for internal purposes and is not part
+            of the official API. You should never call it directly!
+        """
+        for hook in self.before_poll_hooks:
+            if hook.active:
+                try:
+                    hook.callback(self)
+                except Exception:
+                    self.handle_exception()
+
+    def on_check(self):
+        """
+        Called once per loop iteration right after polling for IO.
+
+         .. warning::
+            This method is only for internal purposes and is not part
+            of the official API. You should never call it directly!
+        """
+        for hook in self.after_poll_hooks:
+            if hook.active:
+                try:
+                    hook.callback(self)
+                except Exception:
+                    self.handle_exception()
+
     def handle_exception(self):
         """
         Handle the current exception using the excepthook.
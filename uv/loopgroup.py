@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Groups of event loops, each running on its own thread. Loops are not
+thread safe, so every handle belongs to exactly one loop of the group
+and work is handed between loops with :func:`uv.Loop.call_later`.
+"""
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import itertools
+import multiprocessing
+import os
+import threading
+
+from . import common, error
+from .loop import Loop
+from .handles.async import Async
+
+
+class LoopGroup(object):
+    """
+    Runs `size` event loops on `size` threads. Callables are submitted
+    to a specific loop or to the loops in turn and run on the loop's
+    thread, where :func:`uv.Loop.get_current` returns that loop. Accepted
+    connections are moved between loops with :func:`uv.LoopGroup.transfer`,
+    e.g. to accept on one loop and serve on all of them.
+
+    Threads only run in parallel while the GIL is released, e.g. during
+    large writes, dns lookups and filesystem operations, or on Python
+    builds without a GIL.
+
+    :raises uv.UVError:
+        error while initializing the loops, :attr:`uv.StatusCodes.ENOTSUP`
+        if pinning has been requested but the platform does not support it
+
+    :param size:
+        number of loops, defaults to the number of CPUs
+    :param pin:
+        pin each thread to one of the CPUs available to the process
+    :param cpus:
+        CPUs the threads should be pinned to in turn, implies `pin`
+
+    :type size:
+        int | None
+    :type pin:
+        bool
+    :type cpus:
+        list[int] | None
+    """
+
+    __slots__ = ['loops', 'threads', 'keepalives', 'cpus', 'counter', 'closed']
+
+    def __init__(self, size=None, pin=False, cpus=None):
+        size = size or multiprocessing.cpu_count()
+        if pin or cpus:
+            if not hasattr(os, 'sched_setaffinity'):
+                raise error.UVError(error.StatusCodes.ENOTSUP)
+            cpus = list(cpus or sorted(os.sched_getaffinity(0)))
+        self.cpus = cpus
+        """
+        CPUs the threads are pinned to or `None`.
+
+        :readonly:
+            True
+        :type:
+            list[int] | None
+        """
+        self.loops = [None] * size
+        """
+        Loops of the group.
+
+        :readonly:
+            True
+        :type:
+            list[uv.Loop]
+        """
+        self.keepalives = [None] * size
+        self.threads = []
+        self.counter = itertools.count()
+        self.closed = False
+        ready = threading.Semaphore(0)
+        errors = []
+        for index in range(size):
+            thread = threading.Thread(target=self._run, args=(index, ready, errors),
+                                      name='uv-loop-%d' % index)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        for _ in range(size):
+            ready.acquire()
+        if errors:
+            self.loops = [loop for loop in self.loops if loop is not None]
+            self.close()
+            raise errors[0]
+
+    def __len__(self):
+        return len(self.loops)
+
+    def next_loop(self):
+        """
+        Next loop in turn.
+
+        :rtype:
+            uv.Loop
+        """
+        return self.loops[next(self.counter) % len(self.loops)]
+
+    def submit(self, function, *arguments, **keywords):
+        """
+        Run a function on the next loop in turn. This method is thread
+        safe.
+
+        :raises RuntimeError:
+            group has already been closed
+
+        :param function:
+            function which should run on the loop's thread
+        :param arguments:
+            arguments that should be passed to the function
+        :param keywords:
+            keyword arguments that should be passed to the function
+
+        :type function:
+            callable
+        :type arguments:
+            tuple
+        :type keywords:
+            dict
+
+        :return:
+            loop the function runs on
+        :rtype:
+            uv.Loop
+        """
+        return self.submit_to(self.next_loop(), function, *arguments, **keywords)
+
+    def submit_to(self, loop, function, *arguments, **keywords):
+        """
+        Run a function on a specific loop of the group. This method is
+        thread safe.
+
+        :raises RuntimeError:
+            group has already been closed
+
+        :param loop:
+            loop or index of the loop the function should run on
+        :param function:
+            function which should run on the loop's thread
+        :param arguments:
+            arguments that should be passed to the function
+        :param keywords:
+            keyword arguments that should be passed to the function
+
+        :type loop:
+            uv.Loop | int
+        :type function:
+            callable
+        :type arguments:
+            tuple
+        :type keywords:
+            dict
+
+        :return:
+            loop the function runs on
+        :rtype:
+            uv.Loop
+        """
+        if self.closed:
+            raise RuntimeError('loop group has already been closed')
+        if isinstance(loop, int):
+            loop = self.loops[loop]
+        loop.call_later(function, *arguments, **keywords)
+        return loop
+
+    def transfer(self, connection, loop=None, on_transferred=None):
+        """
+        Move a stream, e.g. an accepted connection, to another loop of
+        the group. Has to be called on the thread of the stream's loop.
+        The stream is closed and a new stream of the same type is opened
+        on a duplicate of its file descriptor on the target loop, data
+        which has already been read is not transferred. The new stream
+        is passed to `on_transferred` on the target loop's thread.
+
+        :raises uv.UVError:
+            error while duplicating the file descriptor
+        :raises RuntimeError:
+            group has already been closed
+
+        :param connection:
+            stream which should be moved
+        :param loop:
+            target loop or its index, defaults to the next loop in turn
+        :param on_transferred:
+            callback which should be called with the new stream
+
+        :type connection:
+            uv.Stream
+        :type loop:
+            uv.Loop | int | None
+        :type on_transferred:
+            ((uv.Stream) -> None) | None
+
+        :return:
+            loop the stream is moved to
+        :rtype:
+            uv.Loop
+        """
+        loop = self.next_loop() if loop is None else loop
+        fd = connection.fileno()
+        try:
+            fd = os.dup(fd)
+        except OSError as os_error:
+            raise error.UVError(error.StatusCodes.from_error_number(os_error.errno))
+        connection.close()
+        try:
+            return self.submit_to(loop, self._adopt, type(connection), connection.ipc, fd,
+                                  on_transferred or common.dummy_callback)
+        except RuntimeError:
+            os.close(fd)
+            raise
+
+    def close(self, wait=True):
+        """
+        Close all handles of all loops and end their threads once the
+        handles have been closed.
+
+        :param wait:
+            wait for the threads to end, ignored on the group's threads
+
+        :type wait:
+            bool
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for loop in self.loops:
+            loop.call_later(loop.close_all_handles)
+        if wait:
+            current = threading.current_thread()
+            for thread in self.threads:
+                if thread is not current:
+                    thread.join()
+
+    def _adopt(self, cls, ipc, fd, on_transferred):
+        # only pipes support inter process communication
+        keywords = {'ipc': True} if ipc else {}
+        stream = cls(loop=Loop.get_current(), **keywords)
+        try:
+            stream.open(fd)
+        except error.UVError:
+            stream.close()
+            os.close(fd)
+            raise
+        on_transferred(stream)
+
+    def _run(self, index, ready, errors):
+        try:
+            if self.cpus:
+                os.sched_setaffinity(0, {self.cpus[index % len(self.cpus)]})
+            loop = Loop()
+            self.loops[index] = loop
+            self.keepalives[index] = Async(loop=loop)
+        except Exception as exception:
+            errors.append(exception)
+            if self.loops[index] is not None:
+                self.loops[index].close_all_handles()
+            else:
+                return
+        finally:
+            ready.release()
+        loop.run()
+        try:
+            loop.close()
+        except error.UVError:
+            pass
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Pool of long-running worker processes for CPU-bound functions. Workers
+are spawned as :class:`uv.Process` handles with an additional inter
+process communication pipe, tasks and results are exchanged as length
+prefixed pickles over that pipe and results are delivered by callbacks
+on the loop, without any helper threads in the parent process.
+"""
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections
+import multiprocessing
+import pickle
+import sys
+import traceback
+
+from . import common, error
+from .loop import Loop
+from .helpers.workers import (WORKER_FD, ChildProcess, Restarter, pack_frame, read_frame,
+                              unpack_frames, write_frame)
+
+
+WORKER_CODE = ('import sys; sys.path[:] = {path!r}; '
+               'from uv.processpool import run_worker; run_worker({fd})')
+
+
+def run_worker(fd=WORKER_FD):
+    """
+    Main function of a worker process. Reads tasks from the pipe with
+    the given file descriptor and writes their results back until the
+    parent closes the pipe.
+
+    .. warning::
+        Only for internal purposes!
+
+    :param fd:
+        file descriptor of the pipe to the parent process
+
+    :type fd:
+        int
+    """
+    while True:
+        payload = read_frame(fd)
+        if payload is None:
+            break
+        function, arguments, keywords = pickle.loads(payload)
+        try:
+            result = True, function(*arguments, **keywords)
+        except BaseException:
+            result = False, sys.exc_info()[1]
+        try:
+            payload = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            message = traceback.format_exc() if result[0] else repr(result[1])
+            result = False, RuntimeError(message)
+            payload = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        write_frame(fd, payload)
+
+
+class ProcessTask(object):
+    """
+    Function submitted to a :class:`uv.ProcessPool`.
+
+    .. note::
+        This class must not be instantiated directly. Please use
+        :func:`uv.ProcessPool.submit` instead.
+    """
+
+    __slots__ = ['payload', 'on_done', 'result', 'exception']
+
+    def __init__(self, payload, on_done=None):
+        self.payload = payload
+        self.on_done = on_done or common.dummy_callback
+        """
+        Callback which should be called after the function has returned
+        in a worker or the task has been canceled.
+
+
+        .. function:: on_done(task, status, result)
+
+            :param task:
+                task the call originates from
+            :param status:
+                status of the task, :attr:`uv.StatusCodes.ECANCELED` if
+                the pool has been closed before the task was started and
+                :attr:`uv.StatusCodes.EPIPE` if the worker running the
+                task has died
+            :param result:
+                result of the function or `None`
+
+            :type task:
+                uv.ProcessTask
+            :type status:
+                uv.StatusCodes
+            :type result:
+                Any
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.ProcessTask, uv.StatusCodes, Any) -> None)
+        """
+        self.result = None
+        """
+        Result of the function, `None` as long as it has not returned or
+        if it has raised an exception.
+
+        :readonly:
+            True
+        :type:
+            Any
+        """
+        self.exception = None
+        """
+        Exception raised by the function or `None`. Exceptions which can
+        not be pickled are replaced by a :class:`RuntimeError` containing
+        their representation.
+
+        :readonly:
+            True
+        :type:
+            BaseException | None
+        """
+
+    def finish(self, status, success=True, value=None):
+        self.payload = None
+        if success:
+            self.result = value
+        else:
+            self.exception = value
+        self.on_done(self, status, self.result)
+
+
+class _Worker(ChildProcess):
+    __slots__ = ['pool', 'task', 'completed']
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.task = None
+        self.completed = 0
+        code = WORKER_CODE.format(path=sys.path, fd=WORKER_FD)
+        super(_Worker, self).__init__(code, pool.loop)
+
+    def dispatch(self, task):
+        self.task = task
+        self.pipe.write(pack_frame(task.payload))
+
+    def _on_data(self, buffer):
+        for payload in unpack_frames(buffer):
+            task, self.task = self.task, None
+            self.completed += 1
+            try:
+                success, value = pickle.loads(payload)
+            except Exception:
+                success, value = False, sys.exc_info()[1]
+            try:
+                task.finish(error.StatusCodes.SUCCESS, success, value)
+            finally:
+                self.pool._on_worker_idle(self)
+
+    def _on_dead(self):
+        self.pool._on_worker_dead(self)
+
+
+class ProcessPool(object):
+    """
+    Pool of worker processes running submitted functions in parallel to
+    the loop. Each worker runs one task at a time, further tasks are
+    queued until a worker becomes idle. Functions, their arguments and
+    results are pickled, so functions have to be importable by their
+    module name in the workers, which start with the `sys.path` of the
+    parent process. Workers inherit the standard output and error of
+    the parent process, their standard input is closed.
+
+    Workers are replaced after `max_tasks` tasks, which bounds leaks in
+    long running workers, and whenever they die, e.g. because of a
+    crash. Tasks running in a dying worker fail with the status
+    :attr:`uv.StatusCodes.EPIPE`. Dead workers are replaced after an
+    exponentially growing delay, which is reset once a worker completes
+    a task. After `max_restarts` consecutive replacements dead workers
+    are no longer replaced, once the last one has died queued tasks fail
+    with :attr:`uv.StatusCodes.EPIPE` and the pool is closed. Workers
+    keep the loop alive until the pool is closed.
+
+    .. note::
+        The workers communicate over a Unix domain socket inherited as
+        file descriptor 3, so pools are only supported on POSIX systems.
+
+    :raises uv.UVError:
+        error while spawning the workers
+
+    :param workers:
+        number of worker processes, defaults to the number of CPUs
+    :param max_tasks:
+        number of tasks after which a worker is replaced or `None`
+    :param max_restarts:
+        number of consecutive replacements of dead workers or `None`
+    :param loop:
+        event loop the results should be delivered on
+
+    :type workers:
+        int | None
+    :type max_tasks:
+        int | None
+    :type max_restarts:
+        int | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'size', 'max_tasks', 'workers', 'idle', 'pending', 'closed',
+                 'spawned', 'restarter']
+
+    def __init__(self, workers=None, max_tasks=None, max_restarts=None, loop=None):
+        self.loop = loop or Loop.get_current()
+        self.size = workers or multiprocessing.cpu_count()
+        self.max_tasks = max_tasks
+        self.workers = set()
+        self.idle = collections.deque()
+        self.pending = collections.deque()
+        self.closed = False
+        self.spawned = 0
+        """
+        Number of worker processes spawned so far, including the ones
+        replacing recycled and dead workers.
+
+        :readonly:
+            True
+        :type:
+            int
+        """
+        self.restarter = Restarter(self.loop, self._spawn, self._on_exhausted,
+                                   max_restarts)
+        for _ in range(self.size):
+            self._spawn()
+
+    def __len__(self):
+        return len(self.workers)
+
+    def submit(self, function, *arguments, **keywords):
+        """
+        Run a function in one of the workers and call `on_done`, which
+        has to be passed as keyword argument, on the loop once the
+        function has returned. All other arguments are passed to the
+        function.
+
+        :raises RuntimeError:
+            pool has already been closed
+        :raises pickle.PicklingError:
+            function or arguments can not be pickled
+
+        :param function:
+            function which should run in a worker
+        :param arguments:
+            arguments that should be passed to the function
+        :param keywords:
+            keyword arguments that should be passed to the function
+
+        :type function:
+            callable
+        :type arguments:
+            tuple
+        :type keywords:
+            dict
+
+        :rtype:
+            uv.ProcessTask
+        """
+        if self.closed:
+            raise RuntimeError('process pool has already been closed')
+        on_done = keywords.pop('on_done', None)
+        payload = pickle.dumps((function, arguments, keywords), pickle.HIGHEST_PROTOCOL)
+        task = ProcessTask(payload, on_done)
+        if self.idle:
+            self.idle.popleft().dispatch(task)
+        else:
+            self.pending.append(task)
+        return task
+
+    def close(self):
+        """
+        Close the pool. Queued tasks are canceled, running tasks are
+        finished and the workers exit afterwards.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.restarter.close()
+        while self.pending:
+            self.pending.popleft().finish(error.StatusCodes.ECANCELED)
+        while self.idle:
+            worker = self.idle.popleft()
+            self.workers.discard(worker)
+            worker.retire()
+
+    def _spawn(self):
+        worker = _Worker(self)
+        self.spawned += 1
+        self.workers.add(worker)
+        self._on_worker_idle(worker)
+
+    def _on_worker_idle(self, worker):
+        if worker.completed:
+            self.restarter.reset()
+        if self.closed or (self.max_tasks and worker.completed >= self.max_tasks):
+            self.workers.discard(worker)
+            worker.retire()
+            if not self.closed:
+                self._spawn()
+        elif self.pending:
+            worker.dispatch(self.pending.popleft())
+        else:
+            self.idle.append(worker)
+
+    def _on_worker_dead(self, worker):
+        if worker.retiring:
+            return
+        self.workers.discard(worker)
+        try:
+            self.idle.remove(worker)
+        except ValueError:
+            pass
+        if worker.task is not None:
+            worker.task.finish(error.StatusCodes.EPIPE)
+            worker.task = None
+        if not self.closed:
+            self.restarter.schedule()
+
+    def _on_exhausted(self):
+        if self.workers or self.restarter.pending:
+            return
+        while self.pending:
+            self.pending.popleft().finish(error.StatusCodes.EPIPE)
+        self.close()
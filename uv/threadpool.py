@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Work scheduling on libuv's threadpool, the same pool filesystem operations
+and dns lookups run on. Functions run on one of the pool's threads while
+their results are delivered on the loop's thread by libuv's after-work
+callback, without any additional wakeup of the loop.
+"""
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os
+import sys
+import threading
+
+from . import base, common, error, request
+from .library import ffi, lib
+from .loop import Loop, RunModes
+
+try:
+    from concurrent import futures
+except ImportError:  # pragma: no cover
+    futures = None
+
+
+MAX_THREADPOOL_SIZE = 128
+
+
+def set_threadpool_size(size):
+    """
+    Set the number of threads of libuv's threadpool. The pool is created
+    with the first operation using it, e.g. a filesystem operation, a
+    dns lookup or work scheduled by :func:`uv.Loop.run_in_threadpool`,
+    and its size can not be changed afterwards. The size is passed to
+    libuv by the `UV_THREADPOOL_SIZE` environment variable.
+
+    :raises ValueError:
+        size is out of the range supported by libuv
+
+    :param size:
+        number of threads
+
+    :type size:
+        int
+    """
+    if not 1 <= size <= MAX_THREADPOOL_SIZE:
+        raise ValueError('threadpool size has to be between 1 and %d'
+                         % MAX_THREADPOOL_SIZE)
+    os.environ['UV_THREADPOOL_SIZE'] = str(size)
+
+
+@ffi.callback('uv_work_cb')
+def uv_work_cb(uv_work):
+    """
+    Runs on one of the threadpool's threads.
+
+    :type uv_work:
+        ffi.CData[uv_work_t*]
+    """
+    work_request = ffi.from_handle(uv_work.data).user_request
+    if work_request is not None:
+        work_request.run()
+
+
+@base.request_callback('uv_after_work_cb')
+def uv_after_work_cb(work_request, status):
+    """
+    :type work_request:
+        uv.WorkRequest
+    :type status:
+        int
+    """
+    work_request.function = work_request.arguments = work_request.keywords = None
+    work_request.on_done(work_request, error.StatusCodes.get(status), work_request.result)
+
+
+@request.RequestType.WORK
+class WorkRequest(request.Request):
+    """
+    Request to run a function on libuv's threadpool. The function runs
+    on a thread of the pool, so it should release the GIL for most of
+    its work, e.g. by hashing, compressing or decoding large buffers, to
+    run in parallel to the loop. If the function raises an exception the
+    exception is stored in :attr:`uv.WorkRequest.exception`.
+
+    :raises uv.UVError:
+        error while queuing the work
+
+    :param function:
+        function which should run on the threadpool
+    :param arguments:
+        positional arguments for the function
+    :param keywords:
+        keyword arguments for the function
+    :param on_done:
+        callback which should be called on the loop's thread after the
+        function has returned or the request has been canceled
+    :param loop:
+        event loop the callback should run on
+
+    :type function:
+        callable
+    :type arguments:
+        tuple
+    :type keywords:
+        dict
+    :type on_done:
+        ((uv.WorkRequest, uv.StatusCodes, Any) -> None) | None
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['uv_work', 'function', 'arguments', 'keywords', 'on_done', 'result',
+                 'exception']
+
+    uv_request_type = 'uv_work_t*'
+    uv_request_init = lib.uv_queue_work
+
+    def __init__(self, function, arguments=(), keywords=None, on_done=None, loop=None):
+        self.function = function
+        self.arguments = arguments
+        self.keywords = keywords or {}
+        self.on_done = on_done or common.dummy_callback
+        """
+        Callback which should be called after the function has returned
+        or the request has been canceled.
+
+
+        .. function:: on_done(request, status, result)
+
+            :param request:
+                request the call originates from
+            :param status:
+                status of the request, :attr:`uv.StatusCodes.ECANCELED`
+                if the request has been canceled
+            :param result:
+                result of the function or `None`
+
+            :type request:
+                uv.WorkRequest
+            :type status:
+                uv.StatusCodes
+            :type result:
+                Any
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.WorkRequest, uv.StatusCodes, Any) -> None)
+        """
+        self.result = None
+        """
+        Result of the function, `None` as long as it has not returned or
+        if it has raised an exception.
+
+        :readonly:
+            True
+        :type:
+            Any
+        """
+        self.exception = None
+        """
+        Exception raised by the function or `None`.
+
+        :readonly:
+            True
+        :type:
+            BaseException | None
+        """
+        super(WorkRequest, self).__init__(loop, (uv_work_cb, uv_after_work_cb))
+        self.uv_work = self.base_request.uv_object
+
+    def run(self):
+        """
+        Run the function and store its result.
+
+        .. warning::
+            Only for internal purposes!
+        """
+        try:
+            self.result = self.function(*self.arguments, **self.keywords)
+        except BaseException:
+            self.exception = sys.exc_info()[1]
+
+
+if futures is not None:
+    class Executor(futures.Executor):
+        """
+        Executor running the submitted functions on libuv's threadpool.
+        The futures are resolved on the loop's thread, so the loop has
+        to run for them to complete. Functions may be submitted from any
+        thread, functions submitted from other threads than the one the
+        executor has been created on are handed over to the loop first.
+        Waiting for a future on the loop's thread blocks forever as the
+        loop can not resolve it while it waits.
+
+        :param loop:
+            event loop the futures should be resolved on
+
+        :type loop:
+            uv.Loop
+        """
+
+        def __init__(self, loop=None):
+            self.loop = loop or Loop.get_current()
+            self.thread = threading.current_thread()
+            self.pending = set()
+            self.lock = threading.Lock()
+            self.closed = False
+
+        def submit(self, function, *arguments, **keywords):
+            """
+            Submit a function to run on the threadpool.
+
+            :raises RuntimeError:
+                executor has already been shut down
+
+            :rtype:
+                concurrent.futures.Future
+            """
+            future = futures.Future()
+            with self.lock:
+                if self.closed:
+                    raise RuntimeError('cannot schedule new futures after shutdown')
+                self.pending.add(future)
+            if threading.current_thread() is self.thread:
+                self._queue(future, function, arguments, keywords)
+            else:
+                self.loop.call_later(self._queue, future, function, arguments, keywords)
+            return future
+
+        def shutdown(self, wait=True):
+            """
+            Shut down the executor. If called on the loop's thread and
+            `wait` is true the loop runs until all submitted functions
+            have returned.
+
+            :type wait:
+                bool
+            """
+            with self.lock:
+                self.closed = True
+            if not wait:
+                return
+            if threading.current_thread() is self.thread:
+                while self.pending:
+                    self.loop.run(RunModes.ONCE)
+            else:
+                with self.lock:
+                    pending = list(self.pending)
+                futures.wait(pending)
+
+        def _queue(self, future, function, arguments, keywords):
+            def run():
+                if future.set_running_or_notify_cancel():
+                    return function(*arguments, **keywords)
+
+            def on_done(work_request, status, result):
+                with self.lock:
+                    self.pending.discard(future)
+                if status != error.StatusCodes.SUCCESS:
+                    future.cancel()
+                    future.set_running_or_notify_cancel()
+                elif work_request.exception is not None:
+                    future.set_exception(work_request.exception)
+                elif not future.cancelled():
+                    future.set_result(result)
+
+            try:
+                WorkRequest(run, on_done=on_done, loop=self.loop)
+            except error.UVError as uv_error:
+                with self.lock:
+                    self.pending.discard(future)
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(uv_error)
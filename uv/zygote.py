@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016, Maximilian Köhl <mail@koehlma.de>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License along
+# with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Spawning processes from a small helper process, the zygote. Forking a
+process with a large resident set copies its page tables, which makes
+every spawn of :class:`uv.Process` from such a process slow. A zygote is
+started early, while the process is still small, and forks the children
+on behalf of the parent. Standard IO file descriptors are passed to the
+zygote with each spawn request and exit statuses are relayed back.
+"""
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import collections
+import errno
+import os
+import pickle
+import select
+import signal
+import socket
+import struct
+import sys
+
+from . import common, error
+from .loop import Loop
+from .handles.pipe import Pipe
+from .handles.poll import Poll, PollEvent
+from .handles.process import CreatePipe, Process, ProcessFlags
+from .handles.signal import Signals
+from .handles.stream import Stream
+from .helpers.workers import header, pack_frame, read_exactly, unpack_records
+
+
+_event = struct.Struct('!Biii')
+
+EVENT_SPAWNED = 1
+EVENT_EXITED = 2
+
+MAX_FDS = 64
+
+ZYGOTE_CODE = ('import sys; sys.path[:] = {path!r}; '
+               'from uv.zygote import run_zygote; run_zygote(3, 4)')
+
+
+def _set_flag(fd, get_command, set_command, flag):
+    import fcntl
+    fcntl.fcntl(fd, set_command, fcntl.fcntl(fd, get_command) | flag)
+
+
+def _set_cloexec(fd):
+    import fcntl
+    _set_flag(fd, fcntl.F_GETFD, fcntl.F_SETFD, fcntl.FD_CLOEXEC)
+
+
+def _set_nonblocking(fd):
+    import fcntl
+    _set_flag(fd, fcntl.F_GETFL, fcntl.F_SETFL, os.O_NONBLOCK)
+
+
+def _dup_above(fd, minimum):
+    import fcntl
+    return fcntl.fcntl(fd, getattr(fcntl, 'F_DUPFD_CLOEXEC', fcntl.F_DUPFD), minimum)
+
+
+def _receive_request(sock):
+    fds = []
+    flags = getattr(socket, 'MSG_CMSG_CLOEXEC', 0)
+    size = socket.CMSG_SPACE(MAX_FDS * 4)
+    data, ancillary, _, _ = sock.recvmsg(header.size, size, flags)
+    for level, kind, payload in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.extend(struct.unpack('%di' % (len(payload) // 4), payload))
+    if data:
+        data += read_exactly(sock.fileno(), header.size - len(data)) or b''
+    if len(data) < header.size:
+        return None, fds
+    payload = read_exactly(sock.fileno(), *header.unpack(data))
+    if payload is None:
+        return None, fds
+    return pickle.loads(payload), fds
+
+
+def _reset_signals():
+    # children of uv.Process start with default dispositions and an empty
+    # signal mask, the zygote ignores some signals and Python others
+    signal.set_wakeup_fd(-1)
+    for signum in range(1, signal.NSIG):
+        try:
+            signal.signal(signum, signal.SIG_DFL)
+        except (OSError, RuntimeError, ValueError):
+            pass
+    if hasattr(signal, 'pthread_sigmask'):
+        signal.pthread_sigmask(signal.SIG_SETMASK, [])
+
+
+def _exec_child(request, fds, report):
+    try:
+        _reset_signals()
+        if request['detached']:
+            os.setsid()
+        targets = request['stdio']
+        # move all sources above the highest target before placing them, so
+        # placing one target never overwrites the source of another one
+        sources = []
+        for index in targets:
+            fd = os.open(os.devnull, os.O_RDWR) if index is None else fds[index]
+            sources.append(_dup_above(fd, len(targets)))
+        for target, source in enumerate(sources):
+            os.dup2(source, target)
+        if request['cwd'] is not None:
+            os.chdir(request['cwd'])
+        if request['gid'] is not None:
+            os.setgid(request['gid'])
+        if request['uid'] is not None:
+            os.setuid(request['uid'])
+        arguments = request['arguments']
+        if request['env'] is None:
+            os.execvp(arguments[0], arguments)
+        else:
+            os.execvpe(arguments[0], arguments, request['env'])
+    except OSError as os_error:
+        os.write(report, struct.pack('!i', os_error.errno or errno.EINVAL))
+    except BaseException:
+        os.write(report, struct.pack('!i', errno.EINVAL))
+    finally:
+        os._exit(127)
+
+
+def _spawn(request, fds):
+    report_read, report_write = os.pipe()
+    _set_cloexec(report_write)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            os.close(report_read)
+            _exec_child(request, fds, report_write)
+        os.close(report_write)
+        report_write = None
+        data = os.read(report_read, 4)
+        if data:
+            os.waitpid(pid, 0)
+            return 0, struct.unpack('!i', data)[0]
+        return pid, 0
+    finally:
+        os.close(report_read)
+        if report_write is not None:
+            os.close(report_write)
+
+
+def run_zygote(request_fd, event_fd):
+    """
+    Main function of a zygote process. Spawns processes as requested
+    over the socket with the file descriptor `request_fd` and reports
+    the results and exit statuses over the socket with the file
+    descriptor `event_fd` until the parent closes the request socket.
+
+    .. warning::
+        Only for internal purposes!
+
+    :type request_fd:
+        int
+    :type event_fd:
+        int
+    """
+    _set_cloexec(request_fd)
+    _set_cloexec(event_fd)
+    requests = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM, fileno=request_fd)
+    events = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM, fileno=event_fd)
+    wakeup_read, wakeup_write = os.pipe()
+    _set_cloexec(wakeup_read)
+    _set_cloexec(wakeup_write)
+    _set_nonblocking(wakeup_write)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    children = set()
+    try:
+        while True:
+            try:
+                readable = select.select([requests, wakeup_read], [], [])[0]
+            except (OSError, select.error):
+                continue
+            if wakeup_read in readable:
+                os.read(wakeup_read, 4096)
+                for pid in list(children):
+                    reaped, status = os.waitpid(pid, os.WNOHANG)
+                    if reaped:
+                        children.discard(pid)
+                        if os.WIFSIGNALED(status):
+                            returncode, signum = 0, os.WTERMSIG(status)
+                        else:
+                            returncode, signum = os.WEXITSTATUS(status), 0
+                        events.sendall(_event.pack(EVENT_EXITED, pid, returncode,
+                                                   signum))
+            if requests in readable:
+                request, fds = _receive_request(requests)
+                if request is None:
+                    break
+                try:
+                    pid, code = _spawn(request, fds)
+                finally:
+                    for fd in fds:
+                        os.close(fd)
+                if pid:
+                    children.add(pid)
+                events.sendall(_event.pack(EVENT_SPAWNED, pid, code, 0))
+    except socket.error as socket_error:
+        # the parent has gone away
+        if socket_error.errno != errno.EPIPE:
+            raise
+
+
+def _make_stdio(file_base, loop, fds, stdio):
+    """
+    Translate a standard IO argument of :class:`uv.Process` into a file
+    descriptor for the child and the object exposed to the parent.
+    """
+    if file_base is None:
+        stdio.append(None)
+        return None
+    if isinstance(file_base, CreatePipe):
+        parent, child = socket.socketpair()
+        fileobj = Pipe(ipc=file_base.ipc, loop=loop)
+        fileobj.open(parent.detach())
+        fd = child.detach()
+    elif isinstance(file_base, Stream):
+        fileobj, fd = file_base, os.dup(file_base.fileno())
+    elif isinstance(file_base, int):
+        fileobj, fd = file_base, os.dup(file_base)
+    else:
+        try:
+            fileobj, fd = file_base, os.dup(file_base.fileno())
+        except AttributeError:
+            raise error.ArgumentError(message='unknown file object type')
+    stdio.append(len(fds))
+    fds.append(fd)
+    return fileobj
+
+
+class ZygoteProcess(object):
+    """
+    Process spawned by a :class:`uv.Zygote`. It provides the same
+    interface as :class:`uv.Process`. The process is spawned
+    asynchronously, its PID is known once `on_spawn` has been called.
+
+    .. note::
+        This class must not be instantiated directly. Please use
+        :func:`uv.Zygote.spawn` instead.
+    """
+
+    __slots__ = ['zygote', 'loop', 'process_id', 'stdin', 'stdout', 'stderr', 'stdio',
+                 'pipes', 'signals', 'on_spawn', 'on_exit', 'exited', 'closing',
+                 'closed']
+
+    def __init__(self, zygote, stdio, pipes, on_spawn=None, on_exit=None):
+        self.zygote = zygote
+        self.loop = zygote.loop
+        self.process_id = None
+        self.stdin, self.stdout, self.stderr = stdio[:3]
+        self.stdio = stdio[3:]
+        self.pipes = pipes
+        self.signals = []
+        self.on_spawn = on_spawn or common.dummy_callback
+        """
+        Callback which should be called after the zygote has spawned the
+        process or failed to do so.
+
+
+        .. function:: on_spawn(process, status)
+
+            :param process:
+                process the call originates from
+            :param status:
+                status of the spawn, pipes created for the process are
+                closed if spawning failed
+
+            :type process:
+                uv.ZygoteProcess
+            :type status:
+                uv.StatusCodes
+
+
+        :readonly:
+            False
+        :type:
+            ((uv.ZygoteProcess, uv.StatusCodes) -> None)
+        """
+        self.on_exit = on_exit or common.dummy_callback
+        """
+        Callback which should be called after the process exited, with
+        the same signature as :attr:`uv.Process.on_exit`.
+
+        :readonly:
+            False
+        :type:
+            ((uv.ZygoteProcess, int, int) -> None)
+        """
+        self.exited = False
+        self.closing = False
+        self.closed = False
+
+    @property
+    def pid(self):
+        """
+        PID of the spawned process, `None` as long as it has not been
+        spawned.
+
+        :raises uv.ClosedHandleError:
+            process has already been closed
+
+        :readonly:
+            True
+        :rtype:
+            int | None
+        """
+        if self.closing:
+            raise error.ClosedHandleError()
+        return self.process_id
+
+    def kill(self, signum=Signals.SIGINT):
+        """
+        Send the specified signal to the process. Signals for a process
+        which has not been spawned yet are sent once it has been spawned.
+
+        :raises uv.ClosedHandleError:
+            process has already been closed
+
+        :param signum:
+            signal number
+
+        :type signum:
+            int
+        """
+        if self.closing:
+            raise error.ClosedHandleError()
+        if self.exited:
+            raise error.UVError(error.StatusCodes.ESRCH)
+        if self.process_id is None:
+            self.signals.append(signum)
+            return
+        try:
+            os.kill(self.process_id, signum)
+        except OSError as os_error:
+            raise error.UVError(error.StatusCodes.from_error_number(os_error.errno))
+
+    def close(self, on_closed=None):
+        """
+        Close the process object. The callbacks are not called after
+        the process object has been closed, the process itself keeps
+        running.
+
+        :param on_closed:
+            callback which should run after the process has been closed
+
+        :type on_closed:
+            ((uv.ZygoteProcess) -> None) | None
+        """
+        if self.closing:
+            return
+        self.closing = self.closed = True
+        self.zygote._release(self)
+        if on_closed is not None:
+            self.loop.call_later(on_closed, self)
+
+    def _spawned(self, pid, code):
+        if pid:
+            self.process_id = pid
+            status = error.StatusCodes.SUCCESS
+            for signum in self.signals:
+                try:
+                    os.kill(pid, signum)
+                except OSError:
+                    pass
+        else:
+            self.exited = True
+            status = error.StatusCodes.from_error_number(code)
+            for pipe in self.pipes:
+                pipe.close()
+        self.signals = None
+        if not self.closing:
+            self.on_spawn(self, status)
+
+    def _exit(self, returncode, signum):
+        self.exited = True
+        if not self.closing:
+            self.on_exit(self, returncode, signum)
+
+
+class Zygote(object):
+    """
+    Helper process spawning processes on behalf of the current process.
+    Start it early, while the current process is small, and spawn
+    processes with :func:`uv.Zygote.spawn`, which takes the same
+    arguments as :class:`uv.Process`. Spawns are asynchronous, the
+    request is handed to the zygote and its result is delivered to the
+    `on_spawn` callback on the loop, so the loop never waits for the
+    zygote.
+
+    Zygotes require Python 3.3 or newer on a POSIX system, as standard
+    IO file descriptors are passed with `SCM_RIGHTS`.
+
+    :raises uv.UVError:
+        error while spawning the zygote, :attr:`uv.StatusCodes.ENOSYS`
+        if the platform is not supported
+
+    :param loop:
+        event loop the callbacks should run on
+
+    :type loop:
+        uv.Loop
+    """
+
+    __slots__ = ['loop', 'process', 'requests', 'writer', 'outbox', 'events', 'buffer',
+                 'pending', 'processes', 'closed']
+
+    def __init__(self, loop=None):
+        if not hasattr(socket.socket, 'sendmsg') or not hasattr(socket, 'AF_UNIX'):
+            raise error.UVError(error.StatusCodes.ENOSYS)
+        self.loop = loop or Loop.get_current()
+        self.pending = collections.deque()
+        self.outbox = collections.deque()
+        self.processes = {}
+        self.buffer = bytearray()
+        self.closed = False
+        self.requests, zygote_requests = socket.socketpair()
+        events, zygote_events = socket.socketpair()
+        try:
+            code = ZYGOTE_CODE.format(path=sys.path)
+            self.process = Process([sys.executable, '-c', code], stdout=1, stderr=2,
+                                   stdio=[zygote_requests, zygote_events], loop=self.loop,
+                                   on_exit=self._on_exit)
+        except error.UVError:
+            self.requests.close()
+            events.close()
+            raise
+        finally:
+            zygote_requests.close()
+            zygote_events.close()
+        self.process.dereference()
+        self.requests.setblocking(False)
+        self.writer = Poll(self.requests.fileno(), loop=self.loop,
+                           on_event=self._on_writable)
+        self.events = Pipe(loop=self.loop)
+        self.events.open(events.detach())
+        self.events.read_start(self._on_event)
+        self.events.dereference()
+
+    def spawn(self, arguments, uid=None, gid=None, cwd=None, env=None, stdin=None,
+              stdout=None, stderr=None, stdio=None, flags=ProcessFlags.WINDOWS_HIDE,
+              on_spawn=None, on_exit=None):
+        """
+        Spawn a process from the zygote. See :class:`uv.Process` for
+        the arguments and :attr:`uv.ZygoteProcess.on_spawn` for the
+        `on_spawn` callback.
+
+        :raises uv.UVError:
+            error while handing the request to the zygote,
+            :attr:`uv.StatusCodes.EPIPE` if the zygote has exited
+        :raises RuntimeError:
+            zygote has already been closed
+
+        :rtype:
+            uv.ZygoteProcess
+        """
+        if self.closed:
+            raise RuntimeError('zygote has already been closed')
+        file_bases = [stdin, stdout, stderr] + list(stdio or [])
+        fds, indices, fileobjs = [], [], []
+        try:
+            for file_base in file_bases:
+                fileobjs.append(_make_stdio(file_base, self.loop, fds, indices))
+            request = {'arguments': list(arguments), 'cwd': cwd, 'uid': uid, 'gid': gid,
+                       'env': None if env is None else dict(env), 'stdio': indices,
+                       'detached': bool(flags & ProcessFlags.DETACHED)}
+            payload = pickle.dumps(request, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            for fd in fds:
+                os.close(fd)
+            for file_base, fileobj in zip(file_bases, fileobjs):
+                if isinstance(file_base, CreatePipe):
+                    fileobj.close()
+            raise
+        pipes = [fileobj for file_base, fileobj in zip(file_bases, fileobjs)
+                 if isinstance(file_base, CreatePipe)]
+        # the file descriptors are closed once they have been sent
+        self.outbox.append((b''.join(pack_frame(payload)), fds))
+        if len(self.outbox) == 1:
+            try:
+                self._send()
+            except error.UVError:
+                self._drop_outbox()
+                for pipe in pipes:
+                    pipe.close()
+                raise
+        process = ZygoteProcess(self, fileobjs, pipes, on_spawn, on_exit)
+        self.pending.append(process)
+        self._update_reference()
+        return process
+
+    def close(self):
+        """
+        Close the zygote. Pending spawns are still carried out and
+        processes spawned before keep running, but their exit callbacks
+        are called with a return code of `-1` once the zygote has exited.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if not self.outbox:
+            self._close_requests()
+
+    def _send(self):
+        # the socket is non-blocking, requests which do not fit into its
+        # buffer are sent once the zygote has caught up
+        while self.outbox:
+            data, fds = self.outbox[0]
+            ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                          struct.pack('%di' % len(fds), *fds))] if fds else []
+            try:
+                sent = self.requests.sendmsg([data], ancillary)
+            except socket.error as socket_error:
+                if socket_error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                code = socket_error.errno or errno.EPIPE
+                raise error.UVError(error.StatusCodes.from_error_number(code))
+            for fd in fds:
+                os.close(fd)
+            if sent < len(data):
+                self.outbox[0] = data[sent:], []
+            else:
+                self.outbox.popleft()
+        if self.outbox:
+            self.writer.start(PollEvent.WRITABLE)
+        else:
+            self.writer.stop()
+            if self.closed:
+                self._close_requests()
+
+    def _drop_outbox(self):
+        while self.outbox:
+            for fd in self.outbox.popleft()[1]:
+                os.close(fd)
+
+    def _close_requests(self):
+        if not self.writer.closing:
+            self.writer.close()
+            self.requests.close()
+
+    def _on_writable(self, writer, status, events):
+        try:
+            if status != error.StatusCodes.SUCCESS:
+                raise error.UVError(status)
+            self._send()
+        except error.UVError:
+            # requests which have not been sent fail once the zygote exits
+            self._drop_outbox()
+            self.close()
+
+    def _update_reference(self):
+        if self.events.closing:
+            return
+        if self.pending or self.processes:
+            self.events.reference()
+        else:
+            self.events.dereference()
+
+    def _release(self, process):
+        if process.process_id is not None:
+            if self.processes.pop(process.process_id, None) is not None:
+                self._update_reference()
+
+    def _on_event(self, events, status, data):
+        if status != error.StatusCodes.SUCCESS:
+            events.close()
+            self._drop_outbox()
+            self.close()
+            # the zygote has exited, every outstanding spawn is lost
+            while self.pending:
+                self.pending.popleft()._spawned(0, errno.EPIPE)
+            for process in list(self.processes.values()):
+                self._release(process)
+                process._exit(-1, 0)
+            return
+        self.buffer.extend(data)
+        for kind, pid, first, second in unpack_records(self.buffer, _event):
+            if kind == EVENT_SPAWNED:
+                process = self.pending.popleft()
+                if pid and not process.closing:
+                    self.processes[pid] = process
+                process._spawned(pid, first)
+            else:
+                process = self.processes.pop(pid, None)
+                if process is not None:
+                    process._exit(first, second)
+        self._update_reference()
+
+    def _on_exit(self, zygote_process, returncode, signum):
+        zygote_process.close()
+        self._drop_outbox()
+        self.close()